@@ -0,0 +1,87 @@
+"""
+Logging
+Structured logging on top of loguru. Every sink is queue-backed (enqueue=True),
+so a request handler only pushes a record onto a queue; stdout and file I/O
+happen on loguru's writer thread and never block the event loop.
+
+  LOG_FORMAT=json (default)     one JSON object per line
+  LOG_FORMAT=text               human-readable lines for local development
+  LOG_LEVEL=INFO                stdout level (logs/app.log always keeps DEBUG)
+  LOG_HOT_PATH_DEBUG=false      drop per-request debug output (resume previews,
+                                raw LLM output) entirely
+  LOG_DEBUG_SAMPLE_RATE=0.05    fraction of that output kept when it is enabled
+"""
+import json
+import os
+import random
+import sys
+
+from loguru import logger
+
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+LOG_HOT_PATH_DEBUG = os.getenv("LOG_HOT_PATH_DEBUG", "false").lower() == "true"
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.05"))
+
+TEXT_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message} {extra}"
+
+
+def _json_format(record) -> str:
+    payload = {
+        "ts": record["time"].isoformat(),
+        "level": record["level"].name,
+        "msg": record["message"],
+        "module": record["name"],
+    }
+    payload.update((k, v) for k, v in record["extra"].items() if not k.startswith("_"))
+    record["extra"]["_json"] = json.dumps(payload, default=str, ensure_ascii=False)
+    return "{extra[_json]}\n{exception}"
+
+
+def configure_logging():
+    logger.remove()  # Remove default handler
+    log_format = _json_format if LOG_FORMAT == "json" else TEXT_FORMAT
+    logger.add(sys.stdout, format=log_format, level=LOG_LEVEL, enqueue=True)
+    logger.add(
+        LOG_FILE,
+        format=log_format,
+        level="DEBUG",
+        rotation="1 day",
+        retention="7 days",
+        enqueue=True,
+    )
+
+
+def log_request(method: str, path: str, route: str, status_code: int, duration_ms: float):
+    """The single access-log record for a request"""
+    logger.bind(
+        event="request",
+        method=method,
+        path=path,
+        route=route,
+        status=status_code,
+        duration_ms=round(duration_ms, 2),
+    ).opt(depth=1).info(f"{method} {path} {status_code}")
+
+
+def log_sql_profile(method: str, path: str, profile):
+    """Per-request SQL profile (SQL_PROFILER=true): debug summary, warning on N+1 suspects"""
+    summary = profile.summary()
+    if summary["nplus1_suspects"]:
+        logger.bind(event="sql_nplus1", method=method, path=path, **summary).opt(depth=1).warning(
+            f"Possible N+1 queries in {method} {path}"
+        )
+    else:
+        logger.bind(event="sql_profile", method=method, path=path, **summary).opt(depth=1).debug(
+            f"SQL profile for {method} {path}"
+        )
+
+
+def debug_sample(message: str, **fields):
+    """High-volume debug output from request handlers: off by default, sampled when on"""
+    if not LOG_HOT_PATH_DEBUG:
+        return
+    if LOG_DEBUG_SAMPLE_RATE < 1.0 and random.random() >= LOG_DEBUG_SAMPLE_RATE:
+        return
+    logger.bind(sampled=True, **fields).opt(depth=1).debug(message)
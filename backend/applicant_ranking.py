@@ -0,0 +1,124 @@
+"""
+Applicant Ranking
+Ranks every applicant of a job by a combined score of
+  - the stored ATS score (LLM or local pre-scorer),
+  - local resume-vs-JD similarity (hashed TF vectors, cosine),
+  - experience fit against job.experience_required,
+computed in one batched NumPy pass. Resume similarities are cached per job and
+only computed for applications the cache has not seen yet.
+"""
+import os
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ats_scoring import hash_vector, hash_vectors
+from job_index import job_document
+from models import Application, Job
+from application_archive import load_archived
+
+ATS_WEIGHT = float(os.getenv("RANK_WEIGHT_ATS", "0.5"))
+SIMILARITY_WEIGHT = float(os.getenv("RANK_WEIGHT_SIMILARITY", "0.35"))
+EXPERIENCE_WEIGHT = float(os.getenv("RANK_WEIGHT_EXPERIENCE", "0.15"))
+MAX_CACHED_JOBS = int(os.getenv("RANK_CACHE_MAX_JOBS", "256"))
+
+
+class _JobRankState:
+    __slots__ = ("signature", "job_vector", "similarities")
+
+    def __init__(self, signature: tuple, job_vector: np.ndarray):
+        self.signature = signature
+        self.job_vector = job_vector
+        self.similarities: Dict[int, float] = {}
+
+
+class ApplicantRanker:
+    def __init__(self):
+        self._jobs: "OrderedDict[int, _JobRankState]" = OrderedDict()
+
+    def _state(self, job: Job) -> _JobRankState:
+        """Per-job cache entry, rebuilt if the posting text has changed"""
+        signature = (job.title, job.description)
+        state = self._jobs.get(job.id)
+        if state is None or state.signature != signature:
+            vector = hash_vector(job_document(job.title, job.description))
+            norm = np.linalg.norm(vector)
+            state = _JobRankState(signature, vector / norm if norm else vector)
+            self._jobs[job.id] = state
+            if len(self._jobs) > MAX_CACHED_JOBS:
+                self._jobs.popitem(last=False)
+        self._jobs.move_to_end(job.id)
+        return state
+
+    def _similarities(self, state: _JobRankState, resume_texts: List[str]) -> np.ndarray:
+        """Cosine similarity of a batch of resumes against the job in one matmul"""
+        matrix = hash_vectors(resume_texts)
+        norms = np.linalg.norm(matrix, axis=1)
+        return (matrix @ state.job_vector) / np.maximum(norms, 1e-9)
+
+    def add_application(self, job: Job, application_id: int, resume_text: str):
+        """Score a new application eagerly so the next ranking request is a cache hit"""
+        state = self._state(job)
+        state.similarities[application_id] = float(self._similarities(state, [resume_text or ""])[0])
+
+    def forget_job(self, job_id: int):
+        self._jobs.pop(job_id, None)
+
+    async def similarities(self, session: AsyncSession, job: Job, application_ids: List[int]) -> np.ndarray:
+        """Similarity for each application id, loading resume_text only for uncached ones"""
+        state = self._state(job)
+        missing = [app_id for app_id in application_ids if app_id not in state.similarities]
+
+        if missing:
+            result = await session.execute(
+                select(Application.id, Application.resume_text, Application.archived_at).where(Application.id.in_(missing))
+            )
+            rows = result.all()
+            # Archived applications keep their resume text in cold storage
+            archived = await load_archived(session, [app_id for app_id, text, archived_at in rows if archived_at and text is None])
+            rows = [
+                (app_id, archived[app_id].get("resume_text") if app_id in archived else text)
+                for app_id, text, _ in rows
+            ]
+            if rows:
+                scores = self._similarities(state, [text or "" for _, text in rows])
+                for (app_id, _), score in zip(rows, scores):
+                    state.similarities[app_id] = float(score)
+
+        return np.fromiter(
+            (state.similarities.get(app_id, 0.0) for app_id in application_ids),
+            dtype=np.float32,
+            count=len(application_ids),
+        )
+
+
+def experience_fit(experience_years: np.ndarray, experience_required: int) -> np.ndarray:
+    """1.0 when the candidate meets the requirement, scaled down linearly below it"""
+    if experience_required <= 0:
+        return np.ones(len(experience_years), dtype=np.float32)
+    return np.clip(experience_years / float(experience_required), 0.0, 1.0).astype(np.float32)
+
+
+def combined_scores(
+    ats_scores: np.ndarray,
+    similarities: np.ndarray,
+    experience_years: np.ndarray,
+    experience_required: int,
+    disqualified: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Vectorized score components (all 0..1); disqualified applicants score 0"""
+    ats = np.clip(ats_scores / 100.0, 0.0, 1.0).astype(np.float32)
+    similarity = np.clip(similarities, 0.0, 1.0)
+    experience = experience_fit(experience_years, experience_required)
+
+    total_weight = ATS_WEIGHT + SIMILARITY_WEIGHT + EXPERIENCE_WEIGHT
+    combined = (ATS_WEIGHT * ats + SIMILARITY_WEIGHT * similarity + EXPERIENCE_WEIGHT * experience) / total_weight
+    combined[disqualified] = 0.0
+
+    return {"ats": ats, "similarity": similarity, "experience": experience, "combined": combined}
+
+
+applicant_ranker = ApplicantRanker()
@@ -0,0 +1,236 @@
+"""
+Applicant Full-Text Search
+Lets HR find applicants across their jobs by what their resumes, profile
+details and ATS keyword matches say ("kubernetes", "\"data pipelines\" -intern").
+Interview answers are not indexed.
+
+Indexed per application, weighted for ranking:
+  A  ATS matched_keywords            (ats_report -> matched_keywords)
+  B  candidate_info                  (name, college, previous institution, role, skills)
+  D  resume_text
+
+- Postgres: a stored generated tsvector column (application.search_vector)
+  with a GIN index; the database keeps it current on every INSERT/UPDATE.
+  Queries use websearch_to_tsquery and ts_rank_cd
+- SQLite (local runs): an FTS5 table (application_fts, porter stemming) kept
+  in sync by triggers on application, ranked with bm25
+- Neither the column nor the FTS table is part of the SQLModel models; both
+  are created by install() from init_db, and rows that predate the index are
+  backfilled once. On any other database, or when install() fails, search
+  raises SearchUnavailable (the endpoint answers 501)
+- Results are scoped to the HR user's jobs, ranked, paginated, and carry a
+  short snippet with highlight offsets (same shape as resume previews)
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SNIPPET_START, SNIPPET_END = "\x02", "\x03"
+SNIPPET_WORDS = 16
+# Dialect whose index install() created in this process; None until then or if it failed
+_installed: Optional[str] = None
+
+
+class SearchUnavailable(Exception):
+    pass
+
+
+_PG_HEADLINE_OPTIONS = (
+    f'StartSel="{SNIPPET_START}", StopSel="{SNIPPET_END}", '
+    f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}, MaxFragments=1"
+)
+
+# Postgres: everything in the generated column must be IMMUTABLE (no concat_ws)
+_PG_CANDIDATE_INFO = " || ' ' || ".join(
+    f"coalesce(candidate_info->>'{field}', '')"
+    for field in ("name", "college", "previous_institution", "role_details", "skills")
+)
+_PG_SEARCH_VECTOR = f"""
+    setweight(to_tsvector('english', coalesce((ats_report->'matched_keywords')::text, '')), 'A') ||
+    setweight(to_tsvector('english', {_PG_CANDIDATE_INFO}), 'B') ||
+    setweight(to_tsvector('english', coalesce(resume_text, '')), 'D')
+"""
+
+# SQLite: trigger bodies see NEW.* / OLD.*; malformed JSON must never break a write
+def _sqlite_columns(row: str) -> str:
+    candidate_info = " || ' ' || ".join(
+        f"coalesce(json_extract({row}.candidate_info, '$.{field}'), '')"
+        for field in ("name", "college", "previous_institution", "role_details", "skills")
+    )
+    return f"""
+        {row}.id,
+        CASE WHEN json_valid({row}.ats_report) THEN
+            (SELECT group_concat(value, ' ') FROM json_each({row}.ats_report, '$.matched_keywords'))
+        END,
+        CASE WHEN json_valid({row}.candidate_info) THEN {candidate_info} END,
+        {row}.resume_text
+    """
+
+_SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS application_fts
+       USING fts5(keywords, candidate_info, resume_text, tokenize = 'porter unicode61')""",
+    f"""CREATE TRIGGER IF NOT EXISTS application_fts_insert AFTER INSERT ON application BEGIN
+        INSERT INTO application_fts (rowid, keywords, candidate_info, resume_text) VALUES ({_sqlite_columns('NEW')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS application_fts_update
+        AFTER UPDATE OF resume_text, candidate_info, ats_report ON application BEGIN
+        DELETE FROM application_fts WHERE rowid = OLD.id;
+        INSERT INTO application_fts (rowid, keywords, candidate_info, resume_text) VALUES ({_sqlite_columns('NEW')});
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS application_fts_delete AFTER DELETE ON application BEGIN
+        DELETE FROM application_fts WHERE rowid = OLD.id;
+    END""",
+]
+
+# bm25 column weights, mirroring the Postgres A/B/D weights
+_SQLITE_RANK = "bm25(application_fts, 10.0, 4.0, 1.0)"
+
+
+async def install(conn):
+    """Create the search index for the connected database (idempotent; called from init_db)"""
+    global _installed
+    _installed = None
+    try:
+        if conn.dialect.name == "postgresql":
+            # Adding a stored generated column rewrites the table once, on first deploy
+            await conn.execute(text(
+                f"ALTER TABLE application ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({_PG_SEARCH_VECTOR}) STORED"
+            ))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_application_search_vector ON application USING GIN (search_vector)"
+            ))
+        elif conn.dialect.name == "sqlite":
+            for statement in _SQLITE_SETUP:
+                await conn.execute(text(statement))
+            # Backfill applications created before the FTS table existed
+            result = await conn.execute(text(
+                f"INSERT INTO application_fts (rowid, keywords, candidate_info, resume_text) "
+                f"SELECT {_sqlite_columns('application')} FROM application "
+                f"WHERE application.id NOT IN (SELECT rowid FROM application_fts)"
+            ))
+            if result.rowcount:
+                print(f"🔎 Indexed {result.rowcount} existing applications for search")
+        else:
+            print(f"⚠️ Applicant search is not supported on {conn.dialect.name}")
+            return
+        _installed = conn.dialect.name
+    except Exception as e:
+        print(f"❌ Error installing applicant search index: {e}")
+
+
+_TOKEN = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+
+
+def to_fts5_query(query: str) -> Optional[str]:
+    """
+    websearch-style input -> FTS5 MATCH expression: words and "quoted phrases"
+    are ANDed, OR is kept, -term excludes. Every term is quoted so user input
+    can never be parsed as FTS5 syntax. None when nothing searchable is left.
+    """
+    positive, negative = [], []
+    for match in _TOKEN.finditer(query):
+        negated, term = (match.group(1), match.group(2)) if match.group(2) is not None else (match.group(3), match.group(4))
+        if term.upper() == "OR" and not negated:
+            if positive and positive[-1] != "OR":
+                positive.append("OR")
+            continue
+        words = re.findall(r"\w+", term)
+        if words:
+            (negative if negated else positive).append('"' + " ".join(words) + '"')
+    while positive and positive[-1] == "OR":
+        positive.pop()
+    if not positive:
+        return None
+    return " ".join(positive + [f"NOT {phrase}" for phrase in negative])
+
+
+def split_snippet(snippet: Optional[str]) -> Tuple[str, List[dict]]:
+    """Marked-up snippet -> (plain text, [{start, end}] highlight offsets)"""
+    plain, spans, start, length = [], [], None, 0
+    for part in re.split(f"([{SNIPPET_START}{SNIPPET_END}])", snippet or ""):
+        if part == SNIPPET_START:
+            start = length
+        elif part == SNIPPET_END:
+            if start is not None and length > start:
+                spans.append({"start": start, "end": length})
+            start = None
+        else:
+            plain.append(part)
+            length += len(part)
+    return "".join(plain), spans
+
+
+_SELECT_HIT = """
+    a.id AS application_id, a.job_id, j.title AS job_title, a.status, a.ats_score, a.created_at,
+    u.full_name AS candidate_name, u.email AS candidate_email
+"""
+
+
+async def search_applicants(session: AsyncSession, hr_id: int, query: str, job_id: Optional[int] = None,
+                            page: int = 1, page_size: int = 20) -> Tuple[int, List[dict]]:
+    """(total matches, one page of ranked hits) among applications to `hr_id`'s jobs"""
+    dialect = session.bind.dialect.name
+    if dialect != _installed:
+        raise SearchUnavailable(f"Applicant search is not available on {dialect}")
+    params = {"hr_id": hr_id, "limit": page_size, "offset": (page - 1) * page_size}
+    job_filter = ""
+    if job_id is not None:
+        job_filter = "AND a.job_id = :job_id"
+        params["job_id"] = job_id
+
+    if dialect == "postgresql":
+        params["query"] = query
+        matches = f"""
+            FROM application a JOIN job j ON j.id = a.job_id
+            WHERE j.hr_id = :hr_id {job_filter}
+              AND a.search_vector @@ websearch_to_tsquery('english', :query)
+        """
+        total = (await session.execute(text(f"SELECT count(*) {matches}"), params)).scalar_one()
+        # Rank + page first; ts_headline re-parses the resume, so only run it for this page
+        stmt = f"""
+            SELECT {_SELECT_HIT}, hits.rank,
+                   ts_headline('english', coalesce(a.resume_text, ''), websearch_to_tsquery('english', :query),
+                               '{_PG_HEADLINE_OPTIONS}') AS snippet
+            FROM (
+                SELECT a.id, ts_rank_cd(a.search_vector, websearch_to_tsquery('english', :query)) AS rank
+                {matches}
+                ORDER BY rank DESC, a.id DESC
+                LIMIT :limit OFFSET :offset
+            ) hits
+            JOIN application a ON a.id = hits.id
+            JOIN job j ON j.id = a.job_id
+            JOIN "user" u ON u.id = a.student_id
+            ORDER BY hits.rank DESC, a.id DESC
+        """
+    else:
+        fts_query = to_fts5_query(query)
+        if fts_query is None:
+            return 0, []
+        params["query"] = fts_query
+        matches = f"""
+            FROM application_fts
+            JOIN application a ON a.id = application_fts.rowid
+            JOIN job j ON j.id = a.job_id
+            JOIN "user" u ON u.id = a.student_id
+            WHERE application_fts MATCH :query AND j.hr_id = :hr_id {job_filter}
+        """
+        total = (await session.execute(text(f"SELECT count(*) {matches}"), params)).scalar_one()
+        # bm25 is "lower is better"; negate so both backends rank descending
+        stmt = f"""
+            SELECT {_SELECT_HIT}, -{_SQLITE_RANK} AS rank,
+                   snippet(application_fts, -1, '{SNIPPET_START}', '{SNIPPET_END}', '…', {SNIPPET_WORDS}) AS snippet
+            {matches}
+            ORDER BY {_SQLITE_RANK}, a.id DESC
+            LIMIT :limit OFFSET :offset
+        """
+
+    hits = []
+    for row in (await session.execute(text(stmt), params)).mappings():
+        hit = dict(row)
+        hit["snippet"], hit["highlights"] = split_snippet(hit["snippet"])
+        hit["rank"] = round(float(hit["rank"] or 0), 6)
+        hits.append(hit)
+    return total, hits
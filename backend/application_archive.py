@@ -0,0 +1,232 @@
+"""
+Application Archive
+Cold storage for the heavy columns of finished applications, so the hot
+application table stays small: list queries, index scans and sequential scans
+stop dragging months-old resumes and transcripts through the cache.
+
+- Applications in a terminal status (ARCHIVE_STATUSES) created more than
+  ARCHIVE_AFTER_DAYS ago have resume_text, chat_history, generated_questions
+  and the full ats_report moved into ApplicationArchive as one zlib-compressed
+  JSON payload. The hot row keeps only ats_report.matched_keywords (resume
+  preview highlights, applicant search) and gets archived_at set
+- The archiver runs in the background, ARCHIVE_BATCH_SIZE applications per
+  step, each step one short transaction. A step first claims its batch with
+  one UPDATE that sets archived_at, re-checking the status and archived_at IS
+  NULL, on rows picked with FOR UPDATE SKIP LOCKED (Postgres), so a row is
+  archived once and a concurrent write is never cleared unseen
+- One worker archives at a time (the "application_archiver" lease, leases.py)
+- Reads are transparent: rehydrate() loads the archived values into the
+  instance without marking it dirty, so a later commit doesn't write them
+  back. Code that modifies an archived application calls
+  rehydrate(restore=True) first, which moves the values back into the hot
+  row and drops the archive entry
+- Values written to the hot row after archiving win over the archived ones,
+  so a write racing the archiver is never overwritten by stale data
+- Archived resumes are still found by applicant search through their ATS
+  keywords and candidate info, but no longer by the resume body
+
+  ARCHIVE_ENABLED=true, ARCHIVE_AFTER_DAYS=90,
+  ARCHIVE_STATUSES=Rejected,Accepted,Offer, ARCHIVE_BATCH_SIZE=200,
+  ARCHIVE_BATCH_INTERVAL=1 (seconds between steps), ARCHIVE_PASS_INTERVAL=3600
+"""
+import asyncio
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm.attributes import set_committed_value
+
+from database import async_session_maker
+from leases import LEASE_TTL, acquire
+from models import Application, ApplicationArchive
+
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_STATUSES = [s.strip() for s in os.getenv("ARCHIVE_STATUSES", "Rejected,Accepted,Offer").split(",") if s.strip()]
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "200"))
+ARCHIVE_BATCH_INTERVAL = float(os.getenv("ARCHIVE_BATCH_INTERVAL", "1"))
+ARCHIVE_PASS_INTERVAL = float(os.getenv("ARCHIVE_PASS_INTERVAL", "3600"))
+
+ARCHIVED_FIELDS = ("resume_text", "chat_history", "generated_questions", "ats_report")
+LEASE_NAME = "application_archiver"
+
+
+def encode_payload(values: dict) -> Tuple[bytes, int]:
+    """(compressed payload, uncompressed size)"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return zlib.compress(raw, 6), len(raw)
+
+
+def decode_payload(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def hot_ats_report(report: Optional[dict]) -> Optional[dict]:
+    """What stays inline of an archived ATS report: the keywords search and previews highlight"""
+    if not report:
+        return report
+    return {"matched_keywords": report.get("matched_keywords", [])}
+
+
+def merge_archived(hot: dict, archived: dict) -> dict:
+    """Archived values, overridden by anything written to the hot row since"""
+    merged = {}
+    for field in ARCHIVED_FIELDS:
+        value = hot.get(field)
+        if field == "ats_report":
+            merged[field] = {**(archived.get(field) or {}), **(value or {})} or archived.get(field)
+        else:
+            merged[field] = value if value is not None else archived.get(field)
+    return merged
+
+
+async def load_archived(session: AsyncSession, application_ids: Iterable[int]) -> Dict[int, dict]:
+    """application id -> archived column values, for the ids that have an archive entry"""
+    application_ids = list(application_ids)
+    if not application_ids:
+        return {}
+    result = await session.execute(
+        select(ApplicationArchive.application_id, ApplicationArchive.payload)
+        .where(ApplicationArchive.application_id.in_(application_ids))
+    )
+    return {app_id: decode_payload(payload) for app_id, payload in result.all()}
+
+
+async def rehydrate(session: AsyncSession, app: Application, restore: bool = False) -> Application:
+    """
+    Make an archived application look whole again. Read-only by default;
+    restore=True moves the data back into the hot row (caller commits).
+    """
+    if app.archived_at is None:
+        return app
+    archived = (await load_archived(session, [app.id])).get(app.id, {})
+    values = merge_archived({field: getattr(app, field) for field in ARCHIVED_FIELDS}, archived)
+
+    if restore:
+        for field, value in values.items():
+            setattr(app, field, value)
+        app.archived_at = None
+        session.add(app)
+        await session.execute(delete(ApplicationArchive).where(ApplicationArchive.application_id == app.id))
+    else:
+        for field, value in values.items():
+            set_committed_value(app, field, value)
+    return app
+
+
+class ApplicationArchiver:
+    def __init__(self, batch_size: int = ARCHIVE_BATCH_SIZE, after: timedelta = timedelta(days=ARCHIVE_AFTER_DAYS),
+                 statuses: List[str] = ARCHIVE_STATUSES):
+        self.batch_size = batch_size
+        self.after = after
+        self.statuses = statuses
+        self.passes = 0
+        self.archived = 0
+        self.last_pass: Optional[str] = None
+
+    async def step(self) -> int:
+        """Archive one batch of due applications; returns how many were archived"""
+        cutoff = datetime.utcnow() - self.after
+        due = (
+            Application.status.in_(self.statuses),
+            Application.archived_at.is_(None),
+            Application.created_at < cutoff,
+        )
+        async with async_session_maker() as session:
+            now = datetime.utcnow()
+            # Claim the batch: the row locks (or SQLite's write lock) keep writers out until commit,
+            # and rows another transaction holds are skipped rather than waited for
+            candidates = select(Application.id).where(*due).limit(self.batch_size).with_for_update(skip_locked=True)
+            result = await session.execute(
+                update(Application)
+                .where(Application.id.in_(candidates.scalar_subquery()), *due)
+                .values(archived_at=now)
+                .returning(Application.id, *(getattr(Application, field) for field in ARCHIVED_FIELDS)),
+                execution_options={"synchronize_session": False},
+            )
+            rows = result.all()
+            if not rows:
+                return 0
+
+            encoded = await asyncio.to_thread(
+                lambda: [encode_payload(dict(zip(ARCHIVED_FIELDS, row[1:]))) for row in rows]
+            )
+            await session.execute(insert(ApplicationArchive), [
+                {"application_id": row[0], "payload": payload, "raw_size": raw_size, "archived_at": now}
+                for row, (payload, raw_size) in zip(rows, encoded)
+            ])
+            # Bulk UPDATE by primary key of the claimed rows; JSON columns get JSON null
+            await session.execute(update(Application), [
+                {"id": row[0], "resume_text": None, "chat_history": None, "generated_questions": None,
+                 "ats_report": hot_ats_report(row[ARCHIVED_FIELDS.index("ats_report") + 1])}
+                for row in rows
+            ])
+            await session.commit()
+
+        self.archived += len(rows)
+        return len(rows)
+
+    async def run_pass(self) -> int:
+        """Archive everything due now (tests / manual runs)"""
+        total = 0
+        while True:
+            archived = await self.step()
+            total += archived
+            if archived < self.batch_size:
+                break
+        self._finish_pass(total)
+        return total
+
+    def _finish_pass(self, total: int):
+        self.passes += 1
+        self.last_pass = datetime.utcnow().isoformat()
+        if total:
+            print(f"🗄️ Archived {total} finished applications")
+
+    async def snapshot(self) -> dict:
+        async with async_session_maker() as session:
+            archived_rows, raw, compressed = (await session.execute(
+                select(func.count(), func.coalesce(func.sum(ApplicationArchive.raw_size), 0),
+                       func.coalesce(func.sum(func.length(ApplicationArchive.payload)), 0))
+            )).one()
+        return {
+            "enabled": ARCHIVE_ENABLED,
+            "after_days": self.after.total_seconds() / 86400,
+            "statuses": self.statuses,
+            "passes": self.passes,
+            "last_pass": self.last_pass,
+            "archived_this_worker": self.archived,
+            "archived_total": archived_rows,
+            "raw_bytes": int(raw),
+            "compressed_bytes": int(compressed),
+        }
+
+    async def run_forever(self):
+        total = 0
+        while True:
+            try:
+                if not await acquire(LEASE_NAME):
+                    await asyncio.sleep(LEASE_TTL)  # another worker archives
+                    continue
+                archived = await self.step()
+                if archived < self.batch_size:
+                    await acquire(LEASE_NAME, ARCHIVE_PASS_INTERVAL + LEASE_TTL)  # keep it through the pause
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Application archiver error: {e}")
+                archived = 0
+            total += archived
+            finished = archived < self.batch_size
+            if finished:
+                self._finish_pass(total)
+                total = 0
+            await asyncio.sleep(ARCHIVE_PASS_INTERVAL if finished else ARCHIVE_BATCH_INTERVAL)
+
+
+application_archiver = ApplicationArchiver()
@@ -0,0 +1,255 @@
+"""
+Local ATS Pre-Scorer
+Deterministic keyword / TF-IDF style matching between a resume and a job posting.
+Runs in a few milliseconds with NumPy, so it can be used as an instant preliminary
+score or as a gate in front of the (slow) LLM analysis.
+"""
+import math
+import os
+import re
+import zlib
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+from utils import validate_document_is_resume
+
+# Resumes scoring below this locally skip the LLM entirely (0 = gate disabled)
+ATS_LLM_GATE_THRESHOLD = int(os.getenv("ATS_LLM_GATE_THRESHOLD", "0"))
+
+MAX_PROFILE_TERMS = 40
+MAX_CRITICAL_TERMS = 12
+TITLE_WEIGHT = 2.0
+SKILL_BOOST = 1.5
+CRITICAL_BOOST = 2.0
+
+# Keeps tech tokens like "c++", "c#", "node.js" and "asp.net" intact
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a about above across after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc every few for from
+further had has have having he her here hers him his how i if in into is it its itself just least less
+like made make many may me might more most much must my no nor not now of off on once one only or other
+our ours out over own per same she should so some such than that the their them then there these they
+this those through to too under until up upon us very via was we well were what when where which while
+who whom why will with within without would yet you your yours
+ability able activities applicant applicants apply based basic best candidate candidates closely company
+demonstrated desired develop developing duties environment excellent experience experienced familiar
+familiarity good great help ideal including join key knowledge looking new nice opportunity plus position
+preferred proficiency proficient proven related required requirement requirements responsibilities
+responsible role skills solid strong team teams understanding using work working year years
+build building ensure need needs seeking want
+""".split())
+
+# Terms that are almost always hard requirements when they appear in a posting
+SKILL_LEXICON = frozenset("""
+python java javascript typescript go golang rust ruby php kotlin swift scala c c++ c# r matlab perl bash
+html css sass tailwind react angular vue svelte next.js node.js express django flask fastapi spring
+laravel rails asp.net .net graphql rest api apis microservices
+sql mysql postgresql postgres sqlite mongodb redis cassandra elasticsearch dynamodb oracle firebase
+aws azure gcp docker kubernetes terraform ansible jenkins git github gitlab linux nginx kafka rabbitmq
+spark hadoop airflow pandas numpy tensorflow pytorch keras scikit-learn nlp llm opencv tableau powerbi excel
+figma selenium cypress jest pytest junit agile scrum jira android ios flutter
+""".split())
+
+# Multi-word skills that would be lost by unigram tokenization
+SKILL_PHRASES = (
+    "machine learning", "deep learning", "data science", "data analysis", "computer vision",
+    "natural language processing", "spring boot", "react native", "rest api", "system design",
+    "unit testing", "power bi", "google cloud", "project management", "data structures", "ci/cd",
+)
+
+# Fallback expectations when a posting has no description (e.g. /ats/analyze with title only)
+ROLE_SKILLS = {
+    "frontend": ["javascript", "typescript", "react", "html", "css"],
+    "backend": ["python", "java", "sql", "rest api", "docker"],
+    "full stack": ["javascript", "react", "node.js", "sql", "rest api"],
+    "fullstack": ["javascript", "react", "node.js", "sql", "rest api"],
+    "software": ["data structures", "git", "sql", "rest api", "unit testing"],
+    "data scientist": ["python", "machine learning", "pandas", "sql", "statistics"],
+    "data analyst": ["sql", "excel", "python", "tableau", "data analysis"],
+    "data engineer": ["python", "sql", "spark", "airflow", "kafka"],
+    "machine learning": ["python", "machine learning", "pytorch", "tensorflow", "numpy"],
+    "ai": ["python", "machine learning", "deep learning", "nlp", "llm"],
+    "devops": ["docker", "kubernetes", "aws", "terraform", "ci/cd", "linux"],
+    "cloud": ["aws", "azure", "gcp", "docker", "kubernetes"],
+    "android": ["kotlin", "java", "android"],
+    "ios": ["swift", "ios"],
+    "mobile": ["flutter", "react native", "kotlin", "swift"],
+    "qa": ["selenium", "cypress", "unit testing", "jira"],
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed (order and duplicates preserved)"""
+    if not text:
+        return []
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    return [t for t in tokens if t not in STOPWORDS and (len(t) > 1 or t in SKILL_LEXICON)]
+
+
+def extract_terms(text: str) -> List[str]:
+    """Tokens plus any multi-word skill phrases found in the text"""
+    lowered = (text or "").lower()
+    terms = tokenize(lowered)
+    terms.extend(phrase for phrase in SKILL_PHRASES if phrase in lowered)
+    return terms
+
+
+class JobProfile:
+    """Weighted term profile for a single job posting"""
+
+    __slots__ = ("terms", "weights", "critical")
+
+    def __init__(self, terms: np.ndarray, weights: np.ndarray, critical: np.ndarray):
+        self.terms = terms
+        self.weights = weights
+        self.critical = critical
+
+
+@lru_cache(maxsize=512)
+def build_job_profile(job_title: str, job_description: str = "") -> JobProfile:
+    """
+    Build a weighted term profile from the job title and description.
+
+    Description terms get a sublinear TF weight (1 + log tf), title terms and
+    known skills are boosted. The top-weighted skill/title terms are flagged as critical.
+    """
+    title_terms = set(extract_terms(job_title))
+    description_terms = extract_terms(job_description)
+
+    if not description_terms:
+        title_lower = (job_title or "").lower()
+        for role, skills in ROLE_SKILLS.items():
+            if role in title_lower:
+                description_terms.extend(skills)
+
+    counts = {}
+    for term in description_terms:
+        counts[term] = counts.get(term, 0) + 1
+    for term in title_terms:
+        counts.setdefault(term, 1)
+
+    if not counts:
+        return JobProfile(np.array([], dtype=object), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=bool))
+
+    terms = np.array(list(counts.keys()), dtype=object)
+    tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    is_title = np.fromiter((t in title_terms for t in terms), dtype=bool, count=len(terms))
+    is_skill = np.fromiter(
+        (t in SKILL_LEXICON or t in SKILL_PHRASES for t in terms), dtype=bool, count=len(terms)
+    )
+
+    weights = 1.0 + np.log(tf)
+    weights += TITLE_WEIGHT * is_title
+    weights *= np.where(is_skill, SKILL_BOOST, 1.0).astype(np.float32)
+
+    # Keep the strongest terms only so long postings don't dilute the score
+    order = np.argsort(-weights, kind="stable")[:MAX_PROFILE_TERMS]
+    terms, weights = terms[order], weights[order].astype(np.float32)
+    is_title, is_skill = is_title[order], is_skill[order]
+
+    critical = np.zeros(len(terms), dtype=bool)
+    candidates = np.flatnonzero(is_skill | is_title)[:MAX_CRITICAL_TERMS]
+    critical[candidates] = True
+
+    return JobProfile(terms, weights, critical)
+
+
+def match_profile(resume_text: str, profile: JobProfile) -> Tuple[np.ndarray, float]:
+    """Returns (matched mask, weighted coverage 0..1) of a resume against a profile"""
+    if len(profile.terms) == 0:
+        return np.zeros(0, dtype=bool), 0.0
+
+    resume_terms = np.array(list(set(extract_terms(resume_text))), dtype=object)
+    matched = np.isin(profile.terms, resume_terms)
+
+    weights = profile.weights * np.where(profile.critical, CRITICAL_BOOST, 1.0)
+    coverage = float(weights[matched].sum() / weights.sum())
+    return matched, coverage
+
+
+def score_resume_locally(resume_text: str, job_title: str, job_description: str = "") -> dict:
+    """
+    Instant, deterministic ATS score.
+    Returns a dict in the same shape as the LLM analysis (ATSAnalysisResponse).
+    """
+    is_valid, validation_error = validate_document_is_resume(resume_text or "")
+    if not is_valid:
+        return {
+            "score": 0,
+            "matched_keywords": [],
+            "missing_critical_keywords": ["This is not a resume"],
+            "missing_bonus_keywords": [],
+            "formatting_issues": [],
+            "feedback": validation_error,
+            "strengths": [],
+            "engine": "local",
+        }
+
+    profile = build_job_profile(job_title or "", job_description or "")
+    matched, coverage = match_profile(resume_text, profile)
+
+    matched_terms = profile.terms[matched].tolist()
+    missing_critical = profile.terms[~matched & profile.critical].tolist()
+    missing_bonus = profile.terms[~matched & ~profile.critical].tolist()
+    matched_critical = profile.terms[matched & profile.critical].tolist()
+
+    # sqrt curve: covering half the weighted profile is already a decent match
+    score = int(round(100 * math.sqrt(coverage)))
+
+    formatting_issues = []
+    if len(resume_text) < 800:
+        formatting_issues.append("Resume is very short; add more detail about projects and experience")
+    if len(profile.terms) and not matched.any():
+        formatting_issues.append("No job-specific keywords found; tailor the resume to the role")
+
+    return {
+        "score": score,
+        "matched_keywords": matched_terms,
+        "missing_critical_keywords": missing_critical,
+        "missing_bonus_keywords": missing_bonus[:10],
+        "formatting_issues": formatting_issues,
+        "feedback": (
+            f"Keyword pre-screen for '{job_title}': matched {len(matched_terms)} of "
+            f"{len(profile.terms)} key terms ({len(matched_critical)} of {int(profile.critical.sum())} critical)."
+        ),
+        "strengths": [f"Mentions {term}" for term in matched_critical[:5]],
+        "engine": "local",
+    }
+
+
+def passes_llm_gate(local_result: dict) -> bool:
+    """True if the resume scored high enough locally to be worth an LLM analysis"""
+    return local_result.get("score", 0) >= ATS_LLM_GATE_THRESHOLD
+
+
+# ---------------------------------------------------------
+# Hashed term vectors (shared by job recommendations / applicant ranking)
+# ---------------------------------------------------------
+VECTOR_DIM = int(os.getenv("TEXT_VECTOR_DIM", "4096"))
+
+
+def hash_vector(text: str, dim: int = VECTOR_DIM) -> np.ndarray:
+    """
+    Sublinear term-frequency vector using the hashing trick.
+    crc32 keeps bucket assignment stable across processes and restarts.
+    """
+    terms = extract_terms(text)
+    if not terms:
+        return np.zeros(dim, dtype=np.float32)
+    buckets = np.fromiter((zlib.crc32(t.encode()) % dim for t in terms), dtype=np.int64, count=len(terms))
+    tf = np.bincount(buckets, minlength=dim).astype(np.float32)
+    nonzero = tf > 0
+    tf[nonzero] = 1.0 + np.log(tf[nonzero])
+    return tf
+
+
+def hash_vectors(texts: List[str], dim: int = VECTOR_DIM) -> np.ndarray:
+    """Stack hash_vector() for a batch of texts into an (n, dim) matrix"""
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, text in enumerate(texts):
+        matrix[i] = hash_vector(text, dim)
+    return matrix
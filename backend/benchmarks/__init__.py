@@ -0,0 +1 @@
+"""In-process benchmark suite; see benchmarks/run.py"""
@@ -0,0 +1,200 @@
+"""
+Storage size and read / write latency of the compressed column types
+(compressed_columns.py) against the current plain Text / JSON layout.
+
+Generates realistic documents per column family (resume text built from the
+bundled sample resume plus generated sections, interview chat histories with
+proctoring alerts, LLM-style ATS analyses), then for each layout
+
+  plain      Column(Text) / Column(JSON), the layout before compression
+  zlib       CompressedText / CompressedJSON with COLUMN_COMPRESSION=zlib
+  zstd       zstd without a dictionary           (needs zstandard)
+  zstd+dict  zstd with a dictionary trained on a separate sample (needs zstandard)
+
+writes the documents into a scratch SQLite table through SQLAlchemy and
+reports stored bytes, write time per row (executemany, 100 rows per
+transaction) and read time per row (point lookups by id, and a full scan).
+
+    cd backend
+    python -m benchmarks.column_compression --rows 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SKILLS = (
+    "Python Java Go TypeScript JavaScript React Node.js FastAPI Django Flask Spring PostgreSQL MySQL MongoDB "
+    "Redis Kafka RabbitMQ Docker Kubernetes Terraform AWS GCP Azure Linux Git CI/CD GraphQL REST gRPC Spark "
+    "Airflow Pandas NumPy PyTorch TensorFlow scikit-learn Tableau Figma Jira Agile Scrum"
+).split()
+ROLES = ("Software Engineer", "Backend Developer", "Data Engineer", "Full Stack Developer", "ML Engineer",
+         "DevOps Engineer", "Frontend Developer", "SDE Intern")
+COMPANIES = ("Infosys", "TCS", "Wipro", "Zoho", "Freshworks", "Razorpay", "Swiggy", "Flipkart", "Accenture", "SayOne")
+COLLEGES = ("IIT Madras", "NIT Trichy", "VIT Vellore", "Anna University", "BITS Pilani", "SRM University", "CET Trivandrum")
+VERBS = ("Designed", "Built", "Implemented", "Optimized", "Led", "Migrated", "Automated", "Developed", "Maintained")
+THINGS = ("a REST API", "the payments service", "an ETL pipeline", "a recommendation engine", "the CI/CD pipeline",
+          "a real-time chat feature", "the analytics dashboard", "a microservice", "the search backend")
+OUTCOMES = ("reducing latency by {n}%", "serving {n}k daily users", "cutting costs by {n}%",
+            "improving test coverage to {n}%", "handling {n}k requests per minute")
+
+
+def _sentence(rng: random.Random) -> str:
+    return (f"{rng.choice(VERBS)} {rng.choice(THINGS)} using {rng.choice(SKILLS)} and {rng.choice(SKILLS)}, "
+            f"{rng.choice(OUTCOMES).format(n=rng.randint(10, 90))}.")
+
+
+def make_resume(rng: random.Random, base: str) -> str:
+    name = f"Candidate {rng.randint(1000, 9999)}"
+    lines = [name, f"{name.lower().replace(' ', '.')}@example.com | +91 9{rng.randint(100000000, 999999999)}",
+             "SUMMARY", f"{rng.choice(ROLES)} with {rng.randint(0, 8)} years of experience. " + _sentence(rng), "EXPERIENCE"]
+    for _ in range(rng.randint(1, 4)):
+        lines.append(f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({rng.randint(2015, 2024)} - Present)")
+        lines.extend(f"• {_sentence(rng)}" for _ in range(rng.randint(2, 5)))
+    lines.append("PROJECTS")
+    for _ in range(rng.randint(1, 3)):
+        lines.append(f"{rng.choice(THINGS).split()[-1].title()} Project: {_sentence(rng)}")
+    lines += ["SKILLS", ", ".join(rng.sample(SKILLS, rng.randint(6, 16))),
+              "EDUCATION", f"B.Tech Computer Science, {rng.choice(COLLEGES)}, CGPA {rng.uniform(6.5, 9.8):.2f}"]
+    # Mix in sections of the bundled sample resume so the text has real-world structure
+    base_lines = [line for line in base.splitlines() if line.strip()]
+    if base_lines:
+        start = rng.randrange(len(base_lines))
+        lines += base_lines[start:start + rng.randint(5, 20)]
+    return "\n".join(lines)
+
+
+def make_chat_history(rng: random.Random, resume: str) -> list:
+    sentences = [line.strip("• ") for line in resume.splitlines() if len(line) > 40]
+    history = []
+    for step in ("name", "college", "experience", "cgpa", "role_details", "skills"):
+        history.append({"role": "assistant", "content": f"Could you tell me your {step.replace('_', ' ')}?"})
+        history.append({"role": "user", "content": rng.choice(sentences) if sentences else step})
+    for i in range(1, 4):
+        answer = " ".join(rng.choice(sentences) for _ in range(rng.randint(3, 8))) if sentences else ""
+        history.append({"role": f"assistant_q{i}", "question": f"How did you approach {rng.choice(THINGS)}?", "answer": answer})
+    for _ in range(rng.randint(0, 3)):
+        history.append({"role": "system_alert",
+                        "content": f"⚠️ [PROCTORING ALERT] Candidate switched tabs or moved focus away at "
+                                   f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} UTC."})
+    return history
+
+
+def make_ats_analysis(rng: random.Random, resume: str) -> dict:
+    present = [skill for skill in SKILLS if skill in resume]
+    return {
+        "score": rng.randint(20, 95),
+        "matched_keywords": present[:12],
+        "missing_critical_keywords": rng.sample(SKILLS, 4),
+        "missing_bonus_keywords": rng.sample(SKILLS, 3),
+        "formatting_issues": ["Use consistent date formats", "Add a links section"][: rng.randint(0, 2)],
+        "feedback": " ".join(_sentence(rng) for _ in range(rng.randint(3, 6))),
+        "strengths": [_sentence(rng) for _ in range(3)],
+        "engine": "llm",
+    }
+
+
+def generate(rows: int, seed: int) -> dict:
+    from utils import extract_text_from_pdf
+
+    with open(os.path.join(BACKEND_DIR, "uploads", "harlinmartin_resume.pdf"), "rb") as f:
+        base = extract_text_from_pdf(f.read()) or ""
+    rng = random.Random(seed)
+    resumes = [make_resume(rng, base) for _ in range(rows)]
+    return {
+        "resume": resumes,
+        "chat_history": [make_chat_history(rng, resume) for resume in resumes],
+        "ats_analysis": [make_ats_analysis(rng, resume) for resume in resumes],
+    }
+
+
+def run_layout(engine, table_name: str, column_type, documents: list, lookups: int, rng: random.Random) -> dict:
+    from sqlalchemy import Column, Integer, MetaData, Table, func, insert, select, type_coerce
+    from sqlalchemy.types import LargeBinary
+
+    metadata = MetaData()
+    table = Table(table_name, metadata, Column("id", Integer, primary_key=True), Column("value", column_type))
+    metadata.create_all(engine)
+
+    start = time.perf_counter()
+    for offset in range(0, len(documents), 100):
+        with engine.begin() as conn:
+            conn.execute(insert(table), [{"id": offset + i + 1, "value": doc}
+                                         for i, doc in enumerate(documents[offset:offset + 100])])
+    write_us = (time.perf_counter() - start) / len(documents) * 1e6
+
+    with engine.connect() as conn:
+        stored = conn.execute(select(func.sum(func.length(type_coerce(table.c.value, LargeBinary))))).scalar()
+        ids = [rng.randint(1, len(documents)) for _ in range(lookups)]
+        start = time.perf_counter()
+        for row_id in ids:
+            conn.execute(select(table.c.value).where(table.c.id == row_id)).scalar_one()
+        point_us = (time.perf_counter() - start) / lookups * 1e6
+        start = time.perf_counter()
+        scanned = conn.execute(select(table.c.value)).scalars().all()
+        scan_us = (time.perf_counter() - start) / len(scanned) * 1e6
+    return {"bytes": int(stored or 0), "write_us": write_us, "point_us": point_us, "scan_us": scan_us}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--train-rows", type=int, default=1000, help="separate sample the dictionary is trained on")
+    parser.add_argument("--dict-size", type=int, default=64 * 1024)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="hiremind-compression-bench-")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["LOG_FILE"] = os.path.join(workdir, "app.log")
+    sys.path.insert(0, BACKEND_DIR)
+
+    from sqlalchemy import JSON, Text, create_engine
+
+    import compressed_columns
+    from compressed_columns import CompressedJSON, CompressedText, dictionaries, zstandard
+
+    data = generate(args.rows, args.seed)
+    training = generate(args.train_rows, args.seed + 1) if zstandard is not None else None
+    plain_types = {"resume": Text(), "chat_history": JSON(), "ats_analysis": JSON()}
+    compressed_types = {"resume": CompressedText, "chat_history": CompressedJSON, "ats_analysis": CompressedJSON}
+
+    layouts = [("plain", None), ("zlib", "zlib")]
+    if zstandard is not None:
+        layouts += [("zstd", "zstd"), ("zstd+dict", "zstd")]
+        for dictionary_id, (family, documents) in enumerate(training.items(), start=1):
+            type_ = compressed_types[family]()
+            samples = [type_.serialize(doc) for doc in documents]
+            dictionaries.register(dictionary_id, family, zstandard.train_dictionary(args.dict_size, samples).as_bytes())
+    else:
+        print("zstandard is not installed: zstd layouts skipped (pip install zstandard)")
+
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    rng = random.Random(args.seed)
+    print(f"\n{'column':<14}{'layout':<11}{'bytes/row':>10}{'ratio':>8}{'write us':>10}{'point us':>10}{'scan us':>9}")
+    for family, documents in data.items():
+        baseline = None
+        for layout, codec in layouts:
+            if codec is None:
+                column_type = plain_types[family]
+            else:
+                compressed_columns.COLUMN_COMPRESSION = codec
+                column_type = compressed_types[family](dictionary=family if layout == "zstd+dict" else None)
+            table_name = f"{family}_{layout.replace('+', '_')}"
+            result = run_layout(engine, table_name, column_type, documents, args.lookups, rng)
+            baseline = baseline or result["bytes"]
+            print(f"{family:<14}{layout:<11}{result['bytes'] / len(documents):>10.0f}{baseline / result['bytes']:>7.2f}x"
+                  f"{result['write_us']:>10.1f}{result['point_us']:>10.1f}{result['scan_us']:>9.1f}")
+    print(f"\nSample sizes: resume {sum(map(len, data['resume'])) / args.rows:.0f} chars, "
+          f"chat_history {sum(len(json.dumps(h)) for h in data['chat_history']) / args.rows:.0f} bytes JSON")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Deterministic stand-ins for the Groq and Brevo SDKs.
+
+Both block their calling thread for a configurable latency, like the real SDKs
+do: Groq calls already run in a worker thread (llm.py), while Brevo sends run
+wherever email_utils calls them, so any event-loop blocking shows up in results.
+"""
+import json
+import random
+import threading
+import time
+import types
+
+
+class _Latency:
+    def __init__(self, mean_ms: float, jitter: float, seed: int):
+        self.mean_ms = mean_ms
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        if self.mean_ms <= 0:
+            return
+        with self._lock:
+            factor = 1.0 + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(self.mean_ms * factor / 1000.0)
+
+
+def _groq_reply(prompt: str) -> str:
+    """Canned response shaped like what each call site parses"""
+    if "hiring_recommendation" in prompt:
+        return json.dumps({
+            "strengths": ["Clear explanations", "Solid backend fundamentals"],
+            "weaknesses": ["Limited testing experience"],
+            "project_understanding_score": 72,
+            "hiring_recommendation": "Hire",
+            "summary_text": "Candidate explained their projects well.",
+        })
+    if "JSON array" in prompt:
+        return json.dumps([
+            "How did you structure the API layer in your main project?",
+            "What trade-offs did you make when choosing your database?",
+            "How would you scale the system you built to 10x traffic?",
+        ])
+    if "relevance" in prompt.lower() and "depth" in prompt.lower():
+        return json.dumps({"relevance": 7, "depth": 6, "specificity": 6, "notes": "Reasonable answer."})
+    if "Candidate Question" in prompt:
+        return "According to the company policy, employees get 24 days of paid leave per year."
+    return json.dumps({
+        "score": 68,
+        "matched_keywords": ["python", "fastapi", "sql"],
+        "missing_critical_keywords": ["kubernetes"],
+        "missing_bonus_keywords": ["graphql"],
+        "formatting_issues": [],
+        "feedback": "Good match for the core stack.",
+        "strengths": ["Backend experience"],
+    })
+
+
+class FakeGroqClient:
+    """Replaces llm.client; counts calls and approximates token usage"""
+
+    def __init__(self, latency_ms: float = 400, jitter: float = 0.25, seed: int = 7):
+        self.latency = _Latency(latency_ms, jitter, seed)
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+
+    def _create(self, messages, model, temperature=None, **kwargs):
+        self.calls += 1
+        self.latency.sleep()
+        prompt = messages[-1]["content"]
+        content = _groq_reply(prompt)
+        usage = types.SimpleNamespace(
+            prompt_tokens=sum(len(m["content"]) for m in messages) // 4,
+            completion_tokens=len(content) // 4,
+        )
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))],
+            usage=usage,
+        )
+
+
+class FakeBrevoApi:
+    """Replaces sib_api_v3_sdk.TransactionalEmailsApi"""
+
+    latency = _Latency(0, 0, 11)
+    sent = 0
+
+    def __init__(self, api_client=None):
+        pass
+
+    def send_transac_email(self, send_smtp_email):
+        FakeBrevoApi.latency.sleep()
+        FakeBrevoApi.sent += 1
+        return types.SimpleNamespace(message_id=f"<bench-{FakeBrevoApi.sent}@brevo>")
+
+
+def install_fakes(llm_latency_ms: float, email_latency_ms: float, jitter: float, seed: int) -> FakeGroqClient:
+    """Swap the real transports for fakes (call after the app modules are imported)"""
+    import email_utils
+    import llm
+
+    groq = FakeGroqClient(llm_latency_ms, jitter, seed)
+    llm.client = groq
+
+    FakeBrevoApi.latency = _Latency(email_latency_ms, jitter, seed + 1)
+    email_utils.sib_api_v3_sdk.TransactionalEmailsApi = FakeBrevoApi
+    email_utils.configuration.api_key["api-key"] = "bench-fake-key"
+    return groq
@@ -0,0 +1,205 @@
+"""
+Per-request middleware overhead on a trivial GET /.
+
+Builds three otherwise identical apps (GET / + CORS) and drives them directly
+through the ASGI interface, no HTTP client in the loop:
+
+  none    no custom middleware
+  legacy  the previous pair of @app.middleware("http") functions
+          (BaseHTTPMiddleware: security headers + request logging)
+  asgi    middleware.RequestMiddleware
+
+then checks that the latency RequestMiddleware records for a route with a
+BackgroundTask (GET /background, the task sleeps --background-ms) covers the
+response only, not the task Starlette runs after it.
+
+    cd backend
+    python -m benchmarks.middleware_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_apps():
+    from fastapi import BackgroundTasks, FastAPI, Request
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from app_logging import log_request
+    from metrics import observe_request, start_request_db_stats, stop_request_db_stats
+    from middleware import RequestMiddleware
+
+    def base_app():
+        app = FastAPI()
+
+        @app.get("/")
+        def read_root():
+            return {"message": "Welcome to HireMind API"}
+
+        @app.get("/background")
+        def with_background(background_tasks: BackgroundTasks, ms: float = 50):
+            background_tasks.add_task(asyncio.sleep, ms / 1000)
+            return {"queued": True}
+
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=["http://localhost:5173"],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+        return app
+
+    legacy = base_app()
+
+    @legacy.middleware("http")
+    async def add_security_headers(request: Request, call_next):
+        response = await call_next(request)
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline';"
+        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+        return response
+
+    @legacy.middleware("http")
+    async def log_requests(request: Request, call_next):
+        start = time.perf_counter()
+        status_code = 500
+        db_stats, db_token = start_request_db_stats()
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            stop_request_db_stats(db_token)
+            elapsed = time.perf_counter() - start
+            route = request.scope.get("route")
+            route_template = route.path if route else "unmatched"
+            observe_request(request.method, route_template, status_code, elapsed, db_stats)
+            log_request(request.method, request.url.path, route_template, status_code, elapsed * 1000)
+
+    asgi = base_app()
+    asgi.add_middleware(RequestMiddleware)
+
+    return {"none": base_app(), "legacy": legacy, "asgi": asgi}
+
+
+def make_scope(path: str = "/", query_string: bytes = b""):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [(b"host", b"bench"), (b"origin", b"http://localhost:5173")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def drive(app, requests: int, concurrency: int) -> float:
+    """Microseconds per request"""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def worker(count: int):
+        for _ in range(count):
+            await app(make_scope(), receive, send)
+
+    await worker(200)  # warm up routing / middleware stack build
+    per_worker = requests // concurrency
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    return (time.perf_counter() - start) / (per_worker * concurrency) * 1e6
+
+
+async def background_latency(app, background_ms: float, requests: int = 20) -> tuple:
+    """(mean ms recorded by the middleware, mean ms of the whole app call) for GET /background"""
+    import middleware
+
+    recorded = []
+    observe = middleware.observe_request
+
+    def capture(method, route, status_code, seconds, db):
+        recorded.append(seconds)
+        observe(method, route, status_code, seconds, db)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    middleware.observe_request = capture
+    try:
+        total = 0.0
+        for _ in range(requests):
+            start = time.perf_counter()
+            await app(make_scope("/background", f"ms={background_ms}".encode()), receive, send)
+            total += time.perf_counter() - start
+    finally:
+        middleware.observe_request = observe
+    return sum(recorded) / len(recorded) * 1000, total / requests * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3, help="best of N rounds per variant")
+    parser.add_argument("--background-ms", type=float, default=50, help="BackgroundTask duration on GET /background")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="hiremind-mw-bench-")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["LOG_FILE"] = os.path.join(workdir, "app.log")
+    sys.path.insert(0, BACKEND_DIR)
+
+    from app_logging import configure_logging
+    configure_logging()
+
+    apps = build_apps()
+    results = {}
+    for name, app in apps.items():
+        results[name] = min(
+            asyncio.run(drive(app, args.requests, args.concurrency)) for _ in range(args.rounds)
+        )
+
+    baseline = results["none"]
+    print(f"\n{'variant':<10}{'us/request':>12}{'overhead us':>14}")
+    for name, micros in results.items():
+        print(f"{name:<10}{micros:>12.1f}{micros - baseline:>14.1f}")
+    legacy_overhead = results["legacy"] - baseline
+    asgi_overhead = results["asgi"] - baseline
+    if legacy_overhead > 0:
+        print(f"\nMiddleware overhead reduced by {(1 - asgi_overhead / legacy_overhead) * 100:.0f}% "
+              f"({legacy_overhead:.1f}us -> {asgi_overhead:.1f}us per request)")
+
+    recorded_ms, call_ms = asyncio.run(background_latency(apps["asgi"], args.background_ms))
+    print(f"\nGET /background ({args.background_ms:.0f} ms BackgroundTask): recorded latency {recorded_ms:.2f} ms, "
+          f"whole app call {call_ms:.2f} ms")
+    if recorded_ms >= args.background_ms:
+        print("❌ Request latency includes the background task")
+        return 1
+
+    from loguru import logger
+    logger.complete()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,388 @@
+"""
+Hermetic benchmark for the HireMind API.
+
+Boots the FastAPI app in-process (httpx ASGI transport, no network) against a
+throwaway SQLite database or a local Postgres, with fake Groq/Brevo transports
+that add configurable latency, then drives a weighted mix of realistic flows
+from concurrent virtual users and reports throughput and p50/p95/p99 per
+operation.
+
+    cd backend
+    python -m benchmarks.run                                  # default mix
+    python -m benchmarks.run --save-baseline bench.json       # record a baseline
+    python -m benchmarks.run --baseline bench.json            # exit 1 on regression
+    python -m benchmarks.run --mix root=1 --llm-latency-ms 0  # single endpoint
+
+Scenarios: auth (signup -> verify OTP -> login), browse (job listing),
+interview (/interview/start with the sample PDFs in uploads/ + a full chat),
+hr (job list, applicants, ranking, detail, summary, status change), root (GET /).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UPLOADS_DIR = os.path.join(BACKEND_DIR, "uploads")
+SAMPLE_RESUMES = ["harlinmartin_resume.pdf", "1_1_harlinmartin_resume.pdf", "2_1_harlinmartin_resume.pdf"]
+POLICY_PDF = "SayOne_Technologies_Company_Details_and_Policies.pdf"
+PASSWORD = "Bench@12345"
+
+DEFAULT_MIX = "browse=40,interview=25,hr=20,auth=15"
+
+CHAT_SCRIPT = [
+    "Alex Bench",
+    "State Technical University",
+    "fresher",
+    "8.4",
+    "Python, FastAPI, PostgreSQL",
+    "I split the API into routers per domain and kept business logic in service modules.",
+    "I chose PostgreSQL for transactional integrity and JSON columns for flexible data.",
+    "I would add caching, move heavy work to background workers and shard by tenant.",
+    "What is the leave policy?",
+    "no",
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="default: a throwaway SQLite file")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=10, help="scenarios per virtual user")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights, e.g. browse=40,hr=20")
+    parser.add_argument("--seed-hr", type=int, default=3, help="HR accounts created before the run")
+    parser.add_argument("--seed-jobs", type=int, default=10, help="jobs per seeded HR account")
+    parser.add_argument("--seed-students", type=int, default=20, help="students created before the run")
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--email-latency-ms", type=float, default=150)
+    parser.add_argument("--jitter", type=float, default=0.25, help="+/- fraction applied to fake latencies")
+    parser.add_argument("--llm-cache", action="store_true", help="keep the LLM result cache on")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="write results to this file")
+    parser.add_argument("--save-baseline", help="write results as a baseline file")
+    parser.add_argument("--baseline", help="compare against this baseline and exit 1 on regression")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed relative slowdown of p95 / drop in throughput (default 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="ignore p95 regressions smaller than this (noise floor)")
+    return parser.parse_args(argv)
+
+
+def prepare_environment(args) -> str:
+    """Isolated working directory + env; must run before any app module is imported"""
+    workdir = tempfile.mkdtemp(prefix="hiremind-bench-")
+    os.makedirs(os.path.join(workdir, "uploads"))
+    shutil.copy(os.path.join(UPLOADS_DIR, POLICY_PDF), os.path.join(workdir, "uploads", POLICY_PDF))
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{workdir}/bench.db"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    os.environ["RATE_LIMIT_BACKEND"] = "memory"
+    os.environ["RATE_LIMIT_LOGIN"] = "100000/second"
+    os.environ["LLM_QUOTA"] = "100000/second"
+    os.environ["LLM_QUOTA_BURST"] = "100000"
+    os.environ["LLM_CACHE_ENABLED"] = "true" if args.llm_cache else "false"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["LOG_FILE"] = os.path.join(workdir, "logs", "app.log")
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(workdir)
+    return workdir
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client, op: str, method: str, url: str, expect=(200,), **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[op].append((time.perf_counter() - start) * 1000)
+        if response.status_code not in expect:
+            self.errors[op] += 1
+            if self.errors[op] <= 3:
+                print(f"⚠️ {op} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    def report(self, wall_seconds: float) -> dict:
+        operations = {}
+        for op, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            operations[op] = {
+                "count": len(ordered),
+                "errors": self.errors.get(op, 0),
+                "p50_ms": round(percentile(ordered, 50), 2),
+                "p95_ms": round(percentile(ordered, 95), 2),
+                "p99_ms": round(percentile(ordered, 99), 2),
+                "mean_ms": round(sum(ordered) / len(ordered), 2),
+            }
+        total = sum(op["count"] for op in operations.values())
+        return {
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "wall_seconds": round(wall_seconds, 3),
+            "throughput_rps": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+            "operations": operations,
+        }
+
+
+class Fixture:
+    """Accounts and jobs created before the timed run"""
+
+    def __init__(self):
+        self.hr_headers: List[dict] = []
+        self.student_headers: List[dict] = []
+        self.jobs_by_hr: Dict[int, List[int]] = defaultdict(list)
+        self.job_ids: List[int] = []
+        self.resumes = [
+            (name, open(os.path.join(UPLOADS_DIR, name), "rb").read())
+            for name in SAMPLE_RESUMES if os.path.exists(os.path.join(UPLOADS_DIR, name))
+        ]
+
+
+_account_ids = itertools.count(1)
+
+
+async def signup_and_login(client, recorder: Recorder, role: str) -> dict:
+    n = next(_account_ids)
+    email = f"bench-{role}-{n}-{os.getpid()}@example.com"
+    await recorder.call(client, "POST /auth/signup", "POST", "/auth/signup", json={
+        "email": email, "password": PASSWORD, "full_name": f"Bench {role.title()} {n}",
+        "role": role, "university_or_company": "Bench Corp",
+    })
+    await recorder.call(client, "POST /auth/verify-otp", "POST", "/auth/verify-otp", json={
+        "email_or_phone": email, "otp": "000000", "verification_type": "email",
+    })
+    response = await recorder.call(client, "POST /auth/login", "POST", "/auth/login", json={
+        "email": email, "password": PASSWORD, "role": role,
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def seed(client, args, rng: random.Random) -> Fixture:
+    fixture = Fixture()
+    setup = Recorder()
+    titles = ["Backend Developer", "Data Engineer", "Frontend Engineer", "ML Engineer", "DevOps Engineer"]
+    for hr_index in range(args.seed_hr):
+        headers = await signup_and_login(client, setup, "hr")
+        fixture.hr_headers.append(headers)
+        for job_index in range(args.seed_jobs):
+            title = rng.choice(titles)
+            response = await setup.call(client, "seed job", "POST", "/jobs/", headers=headers, data={
+                "title": title,
+                "company": "Bench Corp",
+                "location": "Remote",
+                "salary_range": "10-20 LPA",
+                "job_type": "Full-time",
+                "description": f"{title} working with Python, FastAPI, SQL, Docker and REST APIs.",
+            })
+            job_id = response.json()["id"]
+            fixture.jobs_by_hr[hr_index].append(job_id)
+            fixture.job_ids.append(job_id)
+    for _ in range(args.seed_students):
+        fixture.student_headers.append(await signup_and_login(client, setup, "student"))
+    if setup.errors:
+        raise SystemExit(f"❌ Seeding failed: {dict(setup.errors)}")
+    return fixture
+
+
+# ---------------------------------------------------------
+# Scenarios
+# ---------------------------------------------------------
+async def scenario_root(client, recorder, fixture, rng):
+    await recorder.call(client, "GET /", "GET", "/")
+
+
+async def scenario_auth(client, recorder, fixture, rng):
+    await signup_and_login(client, recorder, "student")
+
+
+async def scenario_browse(client, recorder, fixture, rng):
+    headers = rng.choice(fixture.student_headers)
+    query = rng.choice(["", "python", "engineer", "backend devel", "enginer"])
+    await recorder.call(client, "GET /jobs/search", "GET", "/jobs/search", headers=headers, params={"q": query})
+    await recorder.call(client, "GET /applications/my", "GET", "/applications/my", headers=headers)
+
+
+async def scenario_interview(client, recorder, fixture, rng):
+    headers = rng.choice(fixture.student_headers)
+    name, content = rng.choice(fixture.resumes)
+    response = await recorder.call(
+        client, "POST /interview/start", "POST", "/interview/start", headers=headers,
+        data={"job_id": str(rng.choice(fixture.job_ids)), "experience_years": "0"},
+        files={"resume": (name, content, "application/pdf")},
+    )
+    if response.status_code != 200:
+        return
+    application_id = response.json()["application_id"]
+    for message in CHAT_SCRIPT:
+        await recorder.call(client, "POST /interview/chat", "POST", "/interview/chat", headers=headers,
+                            json={"application_id": application_id, "message": message})
+
+
+async def scenario_hr(client, recorder, fixture, rng):
+    hr_index = rng.randrange(len(fixture.hr_headers))
+    headers = fixture.hr_headers[hr_index]
+    job_id = rng.choice(fixture.jobs_by_hr[hr_index])
+    await recorder.call(client, "GET /jobs/my", "GET", "/jobs/my", headers=headers)
+    response = await recorder.call(client, "GET /jobs/{job_id}/applications", "GET",
+                                   f"/jobs/{job_id}/applications?sort=ats_score", headers=headers)
+    await recorder.call(client, "GET /jobs/{job_id}/ranking", "GET", f"/jobs/{job_id}/ranking", headers=headers)
+
+    applications = response.json()["applications"] if response.status_code == 200 else []
+    if not applications:
+        return
+    app_id = rng.choice(applications)["id"]
+    await recorder.call(client, "GET /applications/{app_id}", "GET", f"/applications/{app_id}", headers=headers)
+    await recorder.call(client, "POST /interview/summarize/{application_id}", "POST",
+                        f"/interview/summarize/{app_id}", headers=headers)
+    if rng.random() < 0.3:
+        await recorder.call(client, "PUT /applications/{app_id}/status", "PUT",
+                            f"/applications/{app_id}/status", headers=headers, json={"status": "Rejected"})
+
+
+SCENARIOS = {
+    "root": scenario_root,
+    "auth": scenario_auth,
+    "browse": scenario_browse,
+    "interview": scenario_interview,
+    "hr": scenario_hr,
+}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run_benchmark(args) -> dict:
+    import httpx
+    import main
+    from benchmarks.fakes import FakeBrevoApi, install_fakes
+
+    groq = install_fakes(args.llm_latency_ms, args.email_latency_ms, args.jitter, args.seed)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            fixture = await seed(client, args, random.Random(args.seed))
+            recorder = Recorder()
+
+            async def virtual_user(index: int):
+                rng = random.Random(args.seed * 1000 + index)
+                for _ in range(args.iterations):
+                    name = rng.choices(names, weights)[0]
+                    await SCENARIOS[name](client, recorder, fixture, rng)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(virtual_user(i) for i in range(args.users)))
+            wall = time.perf_counter() - start
+
+        # Let post-response background work (summaries, evaluations) finish before teardown
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        if pending:
+            await asyncio.wait(pending, timeout=30)
+
+    results = recorder.report(wall)
+    results["config"] = {
+        "users": args.users, "iterations": args.iterations, "mix": mix,
+        "llm_latency_ms": args.llm_latency_ms, "email_latency_ms": args.email_latency_ms,
+        "llm_cache": args.llm_cache,
+        "database": "postgres" if (args.database_url or "").startswith("postgres") else "sqlite",
+    }
+    results["upstream"] = {"llm_calls": groq.calls, "emails_sent": FakeBrevoApi.sent}
+    return results
+
+
+def print_report(results: dict):
+    print(f"\n{'operation':<42}{'count':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print("-" * 84)
+    for op, stats in results["operations"].items():
+        print(f"{op:<42}{stats['count']:>7}{stats['errors']:>5}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+    print("-" * 84)
+    print(f"{results['requests']} requests in {results['wall_seconds']}s "
+          f"-> {results['throughput_rps']} req/s, {results['errors']} errors, "
+          f"{results['upstream']['llm_calls']} LLM calls, {results['upstream']['emails_sent']} emails\n")
+
+
+def compare(results: dict, baseline: dict, max_regression: float, min_delta_ms: float) -> List[str]:
+    """Human-readable regressions (empty when within budget)"""
+    regressions = []
+    for op, base in baseline.get("operations", {}).items():
+        current = results["operations"].get(op)
+        if current is None:
+            continue
+        limit = base["p95_ms"] * (1 + max_regression)
+        if current["p95_ms"] > limit and current["p95_ms"] - base["p95_ms"] > min_delta_ms:
+            regressions.append(f"{op}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+    base_rps = baseline.get("throughput_rps", 0)
+    if base_rps and results["throughput_rps"] < base_rps * (1 - max_regression):
+        regressions.append(f"throughput {results['throughput_rps']} req/s vs baseline {base_rps} req/s")
+    if results["errors"] > baseline.get("errors", 0):
+        regressions.append(f"errors {results['errors']} vs baseline {baseline.get('errors', 0)}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # Resolve output paths before we chdir into the scratch directory
+    for attr in ("json_out", "save_baseline", "baseline"):
+        if getattr(args, attr):
+            setattr(args, attr, os.path.abspath(getattr(args, attr)))
+
+    workdir = prepare_environment(args)
+    try:
+        results = asyncio.run(run_benchmark(args))
+    finally:
+        os.chdir(BACKEND_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results)
+    for path in (args.json_out, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"📄 Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression, args.min_delta_ms)
+        if regressions:
+            print("❌ Performance regression:")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print("✅ Within baseline budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Content-Addressed Resume Storage
+Resumes are stored once per distinct file under resumes/<sha[:2]>/<sha256>.pdf,
+so a candidate applying to 20 jobs with the same CV shares one blob between
+User.resume_path and every Application.resume_path.
+
+- StoredBlob keeps the size, the text extracted at first upload (duplicates are
+  never written or parsed again) and ref_count, the number of resume_path
+  columns pointing at the blob
+- Reference changes are UPDATE ... SET ref_count = ref_count +/- n executed in
+  the caller's session, so they commit atomically with the referencing row
+- Blobs that drop to zero references stay in storage; the orphan sweeper
+  removes them after a grace period
+- Paths that are not content-addressed (uploads from before this scheme) are
+  read and parsed as before and never counted
+"""
+import asyncio
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, literal, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from database import async_session_maker
+from models import Application, StoredBlob, User
+from storage import storage, to_key, to_path, BlobNotFound, PUBLIC_PREFIX
+from utils import extract_text_from_pdf
+
+RESUME_PREFIX = "resumes/"
+
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def resume_key(digest: str) -> str:
+    return f"{RESUME_PREFIX}{digest[:2]}/{digest}.pdf"
+
+
+def content_addressed_key(path: Optional[str]) -> Optional[str]:
+    """Storage key for a content-addressed resume path, else None"""
+    if not path:
+        return None
+    try:
+        key = to_key(path)
+    except BlobNotFound:
+        return None
+    return key if key.startswith(RESUME_PREFIX) else None
+
+
+async def store_resume(content: bytes) -> StoredBlob:
+    """
+    Store a resume PDF by content hash and return its blob row (ref_count is
+    not changed; call add_ref when a row starts pointing at it). Concurrent
+    uploads of the same file share a single write + parse.
+    """
+    digest = hashlib.sha256(content).hexdigest()
+
+    inflight = _inflight.get(digest)
+    while inflight is not None:
+        await asyncio.wait([inflight])
+        if not inflight.cancelled():
+            return inflight.result()
+        # The leader was cancelled: retry (the next caller through becomes the leader)
+        inflight = _inflight.get(digest)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[digest] = future
+    try:
+        blob = await _store_resume(digest, content)
+        future.set_result(blob)
+        return blob
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()
+        raise
+    finally:
+        # Cancelled (CancelledError is a BaseException): release the waiters
+        if not future.done():
+            future.cancel()
+        _inflight.pop(digest, None)
+
+
+async def _store_resume(digest: str, content: bytes) -> StoredBlob:
+    async with async_session_maker() as session:
+        blob = await session.get(StoredBlob, digest)
+        if blob is not None:
+            # Touch it so the orphan sweeper's grace period covers the reference about to be added
+            blob.updated_at = datetime.utcnow()
+            await session.commit()
+            return blob
+
+    key = resume_key(digest)
+    if not await storage.exists(key):
+        await storage.put(key, content, "application/pdf")
+    text = await asyncio.to_thread(extract_text_from_pdf, content)
+
+    blob = StoredBlob(sha256=digest, key=key, size=len(content), content_type="application/pdf", text=text)
+    async with async_session_maker() as session:
+        session.add(blob)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Another worker stored the same file first
+            await session.rollback()
+            blob = await session.get(StoredBlob, digest)
+    return blob
+
+
+async def read_resume_text(resume_path: str) -> str:
+    """Text of a stored resume; raises BlobNotFound if the file is missing"""
+    key = content_addressed_key(resume_path)
+    if key is not None:
+        async with async_session_maker() as session:
+            result = await session.execute(select(StoredBlob.text).where(StoredBlob.key == key))
+            row = result.first()
+        if row is not None:
+            return row[0] or ""
+
+    content = await storage.get(to_key(resume_path))
+    return await asyncio.to_thread(extract_text_from_pdf, content)
+
+
+async def add_ref(session: AsyncSession, path: Optional[str], delta: int = 1):
+    """Adjust the reference count of the blob behind `path` (no-op for legacy paths)"""
+    key = content_addressed_key(path)
+    if key is None or delta == 0:
+        return
+    await session.execute(
+        update(StoredBlob)
+        .where(StoredBlob.key == key)
+        .values(ref_count=StoredBlob.ref_count + delta, updated_at=datetime.utcnow())
+    )
+
+
+async def release_refs(session: AsyncSession, paths: Iterable[Optional[str]]):
+    """Drop one reference per path; one UPDATE per distinct blob"""
+    for path, count in Counter(p for p in paths if p).items():
+        await add_ref(session, path, -count)
+
+
+async def release_application_refs(session: AsyncSession, *criteria):
+    """
+    Drop the references held by every Application matching `criteria` in a
+    single UPDATE (set-based: cost does not grow with statements per applicant)
+    """
+    blob_path_expr = literal(PUBLIC_PREFIX) + StoredBlob.key
+    held = (
+        select(func.count())
+        .select_from(Application)
+        .where(*criteria, Application.resume_path == blob_path_expr)
+        .scalar_subquery()
+    )
+    await session.execute(
+        update(StoredBlob)
+        .where(blob_path_expr.in_(select(Application.resume_path).where(*criteria)))
+        .values(ref_count=StoredBlob.ref_count - held, updated_at=datetime.utcnow()),
+        execution_options={"synchronize_session": False},
+    )
+
+
+async def replace_ref(session: AsyncSession, old_path: Optional[str], new_path: Optional[str]):
+    if old_path != new_path:
+        await add_ref(session, old_path, -1)
+        await add_ref(session, new_path, 1)
+
+
+def blob_path(blob: StoredBlob) -> str:
+    return to_path(blob.key)
+
+
+async def recount_refs(session: AsyncSession):
+    """Recompute every ref_count from the resume_path columns (repair / backfill)"""
+    paths = union_all(
+        select(User.resume_path.label("path")).where(User.resume_path.like(f"%{RESUME_PREFIX}%")),
+        select(Application.resume_path.label("path")).where(Application.resume_path.like(f"%{RESUME_PREFIX}%")),
+    ).subquery()
+    result = await session.execute(select(paths.c.path, func.count()).group_by(paths.c.path))
+    counts = Counter()
+    for path, count in result.all():
+        key = content_addressed_key(path)
+        if key:
+            counts[key] += count
+
+    await session.execute(update(StoredBlob).values(ref_count=0))
+    for key, count in counts.items():
+        await session.execute(update(StoredBlob).where(StoredBlob.key == key).values(ref_count=count))
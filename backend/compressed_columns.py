@@ -0,0 +1,247 @@
+"""
+Compressed Columns
+Column types that store large text / JSON values compressed, transparently to
+the models: attributes still read and write str / dict / list.
+
+- zstd (pip install zstandard) with an optional per-column dictionary trained
+  on existing rows (migrate_compressed_columns.py train); small documents like
+  a single resume or ATS report share most of their vocabulary, which a
+  dictionary captures and per-value compression can't. Without zstandard
+  values are zlib-compressed
+- Stored values are self-describing: MAGIC + codec byte + 4-byte dictionary id
+  + body, so old values stay readable after the codec or dictionary changes.
+  Values below COLUMN_COMPRESSION_MIN_BYTES are stored uncompressed (codec raw)
+- Anything without the header is a legacy value (plain UTF-8 bytes after the
+  Postgres column was converted to bytea, or the original TEXT/JSON on SQLite)
+  and is read as is
+- Dictionaries live in CompressionDictionary. init_db loads all of them (a
+  failure fails startup) and every worker reloads new ones every
+  COMPRESSION_DICTIONARY_REFRESH_INTERVAL seconds. A new dictionary is only
+  written with once it is two refresh intervals old, by which time every
+  running worker has loaded it, so reads never meet an unknown dictionary
+  and never query the database from the result processor
+
+  COLUMN_COMPRESSION=zstd (zstd | zlib | off), COLUMN_COMPRESSION_LEVEL=3,
+  COLUMN_COMPRESSION_MIN_BYTES=256, COMPRESSION_DICTIONARY_REFRESH_INTERVAL=60
+"""
+import asyncio
+import json
+import os
+import struct
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import DateTime, Integer, LargeBinary, String, bindparam, text
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the deployment
+    zstandard = None
+
+COLUMN_COMPRESSION = os.getenv("COLUMN_COMPRESSION", "zstd").lower()
+COLUMN_COMPRESSION_LEVEL = int(os.getenv("COLUMN_COMPRESSION_LEVEL", "3"))
+COLUMN_COMPRESSION_MIN_BYTES = int(os.getenv("COLUMN_COMPRESSION_MIN_BYTES", "256"))
+DICTIONARY_REFRESH_INTERVAL = float(os.getenv("COMPRESSION_DICTIONARY_REFRESH_INTERVAL", "60"))
+DICTIONARY_ACTIVATION_DELAY = timedelta(seconds=2 * DICTIONARY_REFRESH_INTERVAL)
+
+# 0xFF never occurs in UTF-8, so no legacy value can start with the header
+MAGIC = b"\xffHM"
+CODEC_RAW, CODEC_ZLIB, CODEC_ZSTD = 0, 1, 2
+_HEADER = struct.Struct(">3sBI")  # magic, codec, dictionary id (0 = none)
+ZLIB_LEVEL = 6
+
+
+class DictionaryRegistry:
+    """Trained zstd dictionaries by id, and the newest active one per name (used for writes)"""
+
+    def __init__(self):
+        self._dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._trained: Dict[int, Tuple[str, datetime]] = {}
+        self._active: Dict[str, int] = {}
+        self._compressors: Dict[int, "zstandard.ZstdCompressor"] = {}
+        self._decompressors: Dict[int, "zstandard.ZstdDecompressor"] = {}
+
+    def register(self, dictionary_id: int, name: str, data: bytes, created_at: Optional[datetime] = None):
+        """Load a dictionary for reads; without created_at it is also written with right away"""
+        if zstandard is None:
+            return
+        self._dictionaries[dictionary_id] = zstandard.ZstdCompressionDict(data)
+        self._trained[dictionary_id] = (name, created_at or datetime.min)
+        self._compressors.pop(dictionary_id, None)
+        self._decompressors.pop(dictionary_id, None)
+        self.activate()
+
+    def activate(self, now: Optional[datetime] = None):
+        """Write with the newest dictionary per name that every worker has had time to load"""
+        cutoff = (now or datetime.utcnow()) - DICTIONARY_ACTIVATION_DELAY
+        for dictionary_id, (name, created_at) in self._trained.items():
+            if created_at <= cutoff and dictionary_id > self._active.get(name, 0):
+                self._active[name] = dictionary_id
+
+    def pending(self) -> float:
+        """Seconds until the last loaded dictionary is written with (0 when none is waiting)"""
+        newest = max((created_at for _, created_at in self._trained.values()), default=datetime.min)
+        return max(0.0, (newest + DICTIONARY_ACTIVATION_DELAY - datetime.utcnow()).total_seconds())
+
+    def loaded(self) -> set:
+        return set(self._dictionaries)
+
+    def active(self, name: Optional[str]) -> int:
+        return self._active.get(name, 0) if name else 0
+
+    def compressor(self, dictionary_id: int) -> "zstandard.ZstdCompressor":
+        compressor = self._compressors.get(dictionary_id)
+        if compressor is None:
+            dictionary = self._dictionaries.get(dictionary_id)
+            compressor = zstandard.ZstdCompressor(level=COLUMN_COMPRESSION_LEVEL, dict_data=dictionary)
+            self._compressors[dictionary_id] = compressor
+        return compressor
+
+    def decompressor(self, dictionary_id: int) -> "zstandard.ZstdDecompressor":
+        decompressor = self._decompressors.get(dictionary_id)
+        if decompressor is None:
+            if dictionary_id and dictionary_id not in self._dictionaries:
+                raise LookupError(f"Compression dictionary {dictionary_id} is not loaded")
+            decompressor = zstandard.ZstdDecompressor(dict_data=self._dictionaries.get(dictionary_id))
+            self._decompressors[dictionary_id] = decompressor
+        return decompressor
+
+    def snapshot(self) -> dict:
+        return {"codec": write_codec_name(), "active": dict(self._active), "loaded": sorted(self._dictionaries)}
+
+
+dictionaries = DictionaryRegistry()
+
+
+def write_codec_name() -> str:
+    if COLUMN_COMPRESSION == "off":
+        return "raw"
+    if COLUMN_COMPRESSION == "zstd" and zstandard is not None:
+        return "zstd"
+    return "zlib"
+
+
+def compress(raw: bytes, dictionary: Optional[str] = None) -> bytes:
+    codec = write_codec_name()
+    if codec == "raw" or len(raw) < COLUMN_COMPRESSION_MIN_BYTES:
+        return _HEADER.pack(MAGIC, CODEC_RAW, 0) + raw
+    if codec == "zstd":
+        dictionary_id = dictionaries.active(dictionary)
+        return _HEADER.pack(MAGIC, CODEC_ZSTD, dictionary_id) + dictionaries.compressor(dictionary_id).compress(raw)
+    return _HEADER.pack(MAGIC, CODEC_ZLIB, 0) + zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decompress(stored: bytes) -> bytes:
+    if not stored.startswith(MAGIC) or len(stored) < _HEADER.size:
+        return stored  # legacy: plain UTF-8
+    _, codec, dictionary_id = _HEADER.unpack_from(stored)
+    body = stored[_HEADER.size:]
+    if codec == CODEC_RAW:
+        return body
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(body)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed column value found but the zstandard package is not installed")
+        return dictionaries.decompressor(dictionary_id).decompress(body)
+    raise ValueError(f"Unknown column compression codec {codec}")
+
+
+def stored_codec(stored) -> Tuple[str, int]:
+    """(codec name, dictionary id) of a stored value; "legacy" for values written before compression"""
+    if not isinstance(stored, (bytes, bytearray, memoryview)):
+        return "legacy", 0
+    stored = bytes(stored)
+    if not stored.startswith(MAGIC) or len(stored) < _HEADER.size:
+        return "legacy", 0
+    _, codec, dictionary_id = _HEADER.unpack_from(stored)
+    return {CODEC_RAW: "raw", CODEC_ZLIB: "zlib", CODEC_ZSTD: "zstd"}.get(codec, "unknown"), dictionary_id
+
+
+class CompressedText(TypeDecorator):
+    """Text stored compressed as bytes; `dictionary` names the trained zstd dictionary to use"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, dictionary: Optional[str] = None):
+        super().__init__()
+        self.dictionary = dictionary
+
+    def serialize(self, value) -> bytes:
+        return value.encode("utf-8")
+
+    def deserialize(self, raw: bytes):
+        return raw.decode("utf-8")
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress(self.serialize(value), self.dictionary)
+
+    def result_processor(self, dialect, coltype):
+        # Skip LargeBinary's processor: legacy SQLite rows come back as str, not bytes
+        def process(value):
+            if value is None:
+                return None
+            if isinstance(value, str):
+                return self.deserialize(value.encode("utf-8"))
+            return self.deserialize(decompress(bytes(value)))
+        return process
+
+
+class CompressedJSON(CompressedText):
+    """JSON (dict / list) stored compressed; reads and writes like Column(JSON)"""
+
+    cache_ok = True
+
+    def serialize(self, value) -> bytes:
+        return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+    def deserialize(self, raw: bytes):
+        return json.loads(raw)
+
+
+async def load_dictionaries(conn):
+    """Register every stored dictionary (called from init_db; an error here fails startup)"""
+    if zstandard is None:
+        if COLUMN_COMPRESSION == "zstd":
+            print("⚠️ zstandard is not installed; compressing columns with zlib")
+        return
+    await load_new_dictionaries(conn)
+
+
+async def load_new_dictionaries(conn) -> int:
+    """Register the stored dictionaries this worker hasn't loaded yet; returns how many"""
+    result = await conn.execute(text("SELECT id FROM compressiondictionary"))
+    missing = set(result.scalars().all()) - dictionaries.loaded()
+    if missing:
+        result = await conn.execute(
+            text("SELECT id, name, data, created_at FROM compressiondictionary WHERE id IN :ids")
+            .bindparams(bindparam("ids", expanding=True))
+            .columns(id=Integer, name=String, data=LargeBinary, created_at=DateTime),
+            {"ids": sorted(missing)},
+        )
+        for dictionary_id, name, data, created_at in result.all():
+            dictionaries.register(dictionary_id, name, bytes(data), created_at)
+    dictionaries.activate()
+    return len(missing)
+
+
+async def refresh_dictionaries(engine, interval: float = DICTIONARY_REFRESH_INTERVAL):
+    """Load dictionaries trained after startup and activate them once every worker has had time to"""
+    if zstandard is None:
+        return
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with engine.connect() as conn:
+                loaded = await load_new_dictionaries(conn)
+            if loaded:
+                print(f"📖 Loaded {loaded} new compression dictionaries")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Error refreshing compression dictionaries: {e}")
@@ -15,6 +15,9 @@ if DATABASE_URL and DATABASE_URL.startswith("postgresql://"):
 
 engine = create_async_engine(DATABASE_URL, echo=False, future=True)
 
+# Shared session factory (request handlers via get_session, background tasks directly)
+async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
 async def init_db():
     async with engine.begin() as conn:
         # await conn.run_sync(SQLModel.metadata.drop_all) # Uncomment to reset DB
@@ -52,17 +55,123 @@ async def init_db():
         await ensure_column('job', 'experience_required', 'INTEGER DEFAULT 0 NOT NULL')
         await ensure_column('job', 'work_location', "VARCHAR DEFAULT 'In-Office' NOT NULL")
         await ensure_column('job', 'policy_path', 'VARCHAR')
+        await ensure_column('job', 'updated_at', 'TIMESTAMP')
         
         # Execute checks for User table
         await ensure_column('user', 'company_policy_path', 'VARCHAR')
+        await ensure_column('user', 'profile_picture_variants', 'JSON')
         
         # Execute checks for Application table (Malpractice Detection)
         await ensure_column('application', 'tab_switch_count', 'INTEGER DEFAULT 0 NOT NULL')
         await ensure_column('application', 'is_disqualified_malpractice', 'BOOLEAN DEFAULT FALSE NOT NULL')
 
+        # Application archiver (cold storage marker)
+        await ensure_column('application', 'archived_at', 'TIMESTAMP')
+
+        # Background job deletion: worker that claimed it
+        await ensure_column('jobdeletion', 'owner', 'VARCHAR')
+
+        # Helper function to add an index if it doesn't exist (same names create_all uses)
+        async def ensure_index(name, table, columns):
+            try:
+                await conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({columns})'))
+            except Exception as e:
+                print(f"❌ Error creating index {name} on {table}: {e}")
+
+        # Upload path lookups (orphan sweeper reconciles stored files against these)
+        await ensure_index('ix_user_profile_picture', 'user', 'profile_picture')
+        await ensure_index('ix_user_resume_path', 'user', 'resume_path')
+        await ensure_index('ix_user_company_policy_path', 'user', 'company_policy_path')
+        await ensure_index('ix_job_policy_path', 'job', 'policy_path')
+        await ensure_index('ix_application_resume_path', 'application', 'resume_path')
+
+        # Applicant list: one index per sort order (id breaks ties) plus status filtering
+        await ensure_index('ix_application_job_ats', 'application', 'job_id, ats_score DESC, id DESC')
+        await ensure_index('ix_application_job_created', 'application', 'job_id, created_at DESC, id DESC')
+        await ensure_index('ix_application_job_experience', 'application', 'job_id, experience_years DESC, id DESC')
+        await ensure_index('ix_application_job_status', 'application', 'job_id, status')
+
+        # Cascading deletes: parent lookups for ON DELETE on the referencing side
+        await ensure_index('ix_application_student_id', 'application', 'student_id')
+        await ensure_index('ix_job_hr_id', 'job', 'hr_id')
+        await ensure_index('ix_job_updated_at', 'job', 'updated_at')
+
+        # ATS history: a user's analyses newest first (keyset pagination)
+        await ensure_index('ix_atsanalysis_user_created', 'atsanalysis', 'user_id, created_at DESC, id DESC')
+
+        # Application archiver: finished, not yet archived applications by age
+        await ensure_index('ix_application_archive_due', 'application', 'status, archived_at, created_at')
+
+        # Helper function to (re)create a foreign key with the ON DELETE rule the models declare.
+        # Postgres only: SQLite can't alter constraints (new SQLite databases get them from create_all)
+        async def ensure_foreign_key(table, column, ref_table, on_delete):
+            if conn.dialect.name != 'postgresql':
+                return
+            wanted = {'CASCADE': 'c', 'SET NULL': 'n'}[on_delete]
+            try:
+                result = await conn.execute(text(
+                    "SELECT con.conname, con.confdeltype FROM pg_constraint con "
+                    "JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = ANY(con.conkey) "
+                    f"WHERE con.contype = 'f' AND con.conrelid = '\"{table}\"'::regclass AND att.attname = '{column}'"
+                ))
+                row = result.first()
+                if row and row[1] == wanted:
+                    return
+                name = row[0] if row else f"{table}_{column}_fkey"
+                print(f"⚠️ Foreign key {table}.{column} missing ON DELETE {on_delete}. Recreating...")
+                # NOT VALID + VALIDATE: no long exclusive lock while existing rows are checked
+                drop = f'DROP CONSTRAINT "{name}", ' if row else ''
+                await conn.execute(text(
+                    f'ALTER TABLE "{table}" {drop}ADD CONSTRAINT "{name}" FOREIGN KEY ({column}) '
+                    f'REFERENCES "{ref_table}" (id) ON DELETE {on_delete} NOT VALID'
+                ))
+                await conn.execute(text(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT "{name}"'))
+                print(f"✅ Foreign key {table}.{column} -> {ref_table} ON DELETE {on_delete}")
+            except Exception as e:
+                print(f"❌ Error updating foreign key {table}.{column}: {e}")
+
+        await ensure_foreign_key('job', 'hr_id', 'user', 'CASCADE')
+        await ensure_foreign_key('application', 'job_id', 'job', 'CASCADE')
+        await ensure_foreign_key('application', 'student_id', 'user', 'CASCADE')
+        await ensure_foreign_key('interviewsummary', 'application_id', 'application', 'CASCADE')
+        await ensure_foreign_key('answerevaluation', 'application_id', 'application', 'CASCADE')
+        await ensure_foreign_key('atsanalysis', 'user_id', 'user', 'CASCADE')
+        await ensure_foreign_key('interviewslot', 'hr_id', 'user', 'CASCADE')
+        await ensure_foreign_key('interviewslot', 'candidate_id', 'user', 'SET NULL')
+
+        # Compressed columns (compressed_columns.py) are bytea on Postgres. Existing values
+        # become their plain UTF-8 bytes, which the column type reads as legacy values;
+        # migrate_compressed_columns.py compresses them. SQLite stores bytes in any column
+        async def ensure_bytea(table, column):
+            if conn.dialect.name != 'postgresql':
+                return
+            try:
+                result = await conn.execute(text(
+                    f"SELECT data_type FROM information_schema.columns WHERE table_name='{table}' AND column_name='{column}'"
+                ))
+                row = result.first()
+                if row is None or row[0] == 'bytea':
+                    return
+                print(f"⚠️ Column {table}.{column} is {row[0]}. Converting to bytea...")
+                await conn.execute(text(
+                    f'ALTER TABLE "{table}" ALTER COLUMN {column} TYPE bytea '
+                    f"USING convert_to({column}::text, 'UTF8')"
+                ))
+                print(f"✅ Column {table}.{column} converted to bytea")
+            except Exception as e:
+                print(f"❌ Error converting {table}.{column} to bytea: {e}")
+
+        await ensure_bytea('application', 'chat_history')
+        await ensure_bytea('atsanalysis', 'analysis_data')
+        await ensure_bytea('storedblob', 'text')
+
+        from compressed_columns import load_dictionaries
+        await load_dictionaries(conn)
+
+        # Applicant full-text search (tsvector + GIN on Postgres, FTS5 on SQLite)
+        from applicant_search import install as install_applicant_search
+        await install_applicant_search(conn)
+
 async def get_session() -> AsyncSession:
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
-    async with async_session() as session:
+    async with async_session_maker() as session:
         yield session
@@ -3,11 +3,14 @@ Email Utility Functions using Brevo API (formerly Sendinblue)
 Replaces Resend API to enable sending to any email address without domain verification
 """
 import os
+import time
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
 import logging
 from dotenv import load_dotenv
 
+from metrics import EMAIL_SEND_SECONDS
+
 # Load environment variables
 load_dotenv()
 
@@ -49,6 +52,8 @@ def _send_email_base(to_email: str, subject: str, html_body: str) -> bool:
         logger.info("To configure: Sign up at https://app.brevo.com and add BREVO_API_KEY to .env")
         return False
 
+    start = time.perf_counter()
+    result = "error"
     try:
         api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
         
@@ -61,6 +66,7 @@ def _send_email_base(to_email: str, subject: str, html_body: str) -> bool:
         
         api_response = api_instance.send_transac_email(send_smtp_email)
         logger.info(f"✅ Email sent successfully to {to_email} | Message ID: {api_response.message_id}")
+        result = "sent"
         return True
 
     except ApiException as e:
@@ -69,6 +75,8 @@ def _send_email_base(to_email: str, subject: str, html_body: str) -> bool:
     except Exception as e:
         logger.error(f"⚠️ Email sending failed: {e}")
         return False
+    finally:
+        EMAIL_SEND_SECONDS.observe(time.perf_counter() - start, result=result)
 
 
 async def send_email_otp(to_email: str, full_name: str, otp: str):
@@ -0,0 +1,103 @@
+"""
+Profile Picture Variants
+Uploaded avatars are decoded once and re-encoded into fixed square sizes
+(AVATAR_SIZES, default 64 and 256 px) as WebP plus a JPEG fallback, so
+dashboards never download the full-size original.
+
+- Decoding/encoding is CPU-bound and runs in a worker thread
+- Variants are stored next to the original as "<original key>@<size>.<ext>";
+  the orphan sweeper treats them as part of the original (see variant_base)
+- Pillow is optional: without it uploads keep working and no variants are made
+"""
+import io
+import os
+from typing import Dict, Optional, Tuple
+
+from storage import to_path
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the deployment
+    PIL_AVAILABLE = False
+
+AVATAR_SIZES = tuple(int(s) for s in os.getenv("AVATAR_SIZES", "64,256").split(",") if s.strip())
+AVATAR_WEBP_QUALITY = int(os.getenv("AVATAR_WEBP_QUALITY", "80"))
+AVATAR_JPEG_QUALITY = int(os.getenv("AVATAR_JPEG_QUALITY", "85"))
+# Refuse decompression bombs well before Pillow's own (warning-only) threshold
+MAX_IMAGE_PIXELS = int(os.getenv("AVATAR_MAX_PIXELS", str(40_000_000)))
+
+FORMATS = (("webp", "WEBP", "image/webp"), ("jpeg", "JPEG", "image/jpeg"))
+VARIANT_SEPARATOR = "@"
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def variant_key(key: str, suffix: str) -> str:
+    return f"{key}{VARIANT_SEPARATOR}{suffix}"
+
+
+def variant_base(key: str) -> str:
+    """Original key a derived variant belongs to (the key itself for originals)"""
+    return key.split(VARIANT_SEPARATOR, 1)[0]
+
+
+def render_avatar_variants(content: bytes) -> Dict[Tuple[int, str], Tuple[bytes, str]]:
+    """
+    Decode an uploaded image once and encode every (size, format) variant.
+    Returns {(size, "webp"|"jpeg"): (data, content_type)}; raises InvalidImage.
+    Blocking: call via asyncio.to_thread.
+    """
+    if not PIL_AVAILABLE:
+        return {}
+
+    try:
+        with Image.open(io.BytesIO(content)) as probe:
+            width, height = probe.size
+            if width * height > MAX_IMAGE_PIXELS:
+                raise InvalidImage("Image dimensions too large")
+            probe.verify()
+        image = Image.open(io.BytesIO(content))
+        image.seek(0)  # first frame of animated GIFs
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except InvalidImage:
+        raise
+    except Exception:
+        raise InvalidImage("Invalid or unsupported image file")
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    rgba = image.convert("RGBA") if has_alpha else None
+    rgb = image.convert("RGB")
+    if rgba is not None:
+        # JPEG has no alpha channel: flatten onto white
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        rgb = background
+
+    variants = {}
+    for size in sorted(AVATAR_SIZES, reverse=True):
+        for name, pil_format, content_type in FORMATS:
+            source = rgba if (rgba is not None and name == "webp") else rgb
+            thumb = ImageOps.fit(source, (size, size), method=Image.LANCZOS)
+            out = io.BytesIO()
+            if pil_format == "WEBP":
+                thumb.save(out, "WEBP", quality=AVATAR_WEBP_QUALITY, method=4)
+            else:
+                thumb.save(out, "JPEG", quality=AVATAR_JPEG_QUALITY, optimize=True, progressive=True)
+            variants[(size, name)] = (out.getvalue(), content_type)
+    return variants
+
+
+def avatar_variant_key(key: str, size: int, name: str) -> str:
+    return variant_key(key, f"{size}.{'jpg' if name == 'jpeg' else name}")
+
+
+def variants_field(key: str, sizes_and_formats) -> Optional[dict]:
+    """User.profile_picture_variants value: {"64": {"webp": path, "jpeg": path}, ...}"""
+    field: Dict[str, Dict[str, str]] = {}
+    for size, name in sizes_and_formats:
+        field.setdefault(str(size), {})[name] = to_path(avatar_variant_key(key, size, name))
+    return field or None
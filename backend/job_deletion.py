@@ -0,0 +1,235 @@
+"""
+Job / Account Deletion
+Set-based deletes for jobs, applications and everything hanging off them
+(answer evaluations, interview summaries, archived columns, resume blob references), so removing
+a job costs a fixed number of statements however many applicants it has.
+
+- delete_applications / delete_jobs issue one statement per table for any set
+  of rows (children first, so SQLite, which does not enforce foreign keys by
+  default, never keeps orphans). On Postgres the ON DELETE CASCADE / SET NULL
+  foreign keys declared in the models back this up
+- Jobs with more than DELETE_ASYNC_THRESHOLD applications are deleted in the
+  background: the job is hidden at once (active_job_filter, a NOT EXISTS
+  primary-key lookup), then purged in batches of DELETE_BATCH_SIZE
+  applications, each batch its own short transaction. Progress is kept in
+  JobDeletion; finished rows are removed DELETE_STATUS_TTL seconds later
+- One worker purges a deletion: it claims the row with a conditional UPDATE
+  (owner), and every batch advances the progress with `deleted = deleted + n`
+  only while it is still the owner, which doubles as its heartbeat. Every
+  worker periodically takes over running deletions whose owner has not
+  heartbeated for DELETE_HEARTBEAT_TIMEOUT seconds (a crash or restart), and
+  retries failed deletions after the same delay; DELETE /jobs/{id} again
+  retries one at once
+
+  DELETE_ASYNC_THRESHOLD=2000, DELETE_BATCH_SIZE=500, DELETE_HEARTBEAT_TIMEOUT=120,
+  DELETE_STATUS_TTL=3600
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import and_, delete, exists, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from database import async_session_maker
+from models import AnswerEvaluation, Application, ApplicationArchive, InterviewSummary, Job, JobDeletion
+from blobs import release_application_refs
+from leases import WORKER_ID
+
+DELETE_ASYNC_THRESHOLD = int(os.getenv("DELETE_ASYNC_THRESHOLD", "2000"))
+DELETE_BATCH_SIZE = int(os.getenv("DELETE_BATCH_SIZE", "500"))
+DELETE_HEARTBEAT_TIMEOUT = float(os.getenv("DELETE_HEARTBEAT_TIMEOUT", "120"))
+DELETE_STATUS_TTL = float(os.getenv("DELETE_STATUS_TTL", "3600"))
+
+# Deletions this worker is purging right now (the claim only tells workers apart)
+_purging = set()
+
+
+def active_job_filter():
+    """WHERE clause hiding jobs whose background deletion has not finished"""
+    return ~exists().where(JobDeletion.job_id == Job.id, JobDeletion.status != "done")
+
+
+# Plain bulk statements: no RETURNING / identity-map bookkeeping per deleted row
+BULK = {"synchronize_session": False}
+
+
+async def delete_applications(session: AsyncSession, *criteria) -> int:
+    """Delete every Application matching `criteria` with its dependent rows; returns the count"""
+    application_ids = select(Application.id).where(*criteria)
+    await release_application_refs(session, *criteria)
+    await session.execute(
+        delete(AnswerEvaluation).where(AnswerEvaluation.application_id.in_(application_ids)), execution_options=BULK
+    )
+    await session.execute(
+        delete(InterviewSummary).where(InterviewSummary.application_id.in_(application_ids)), execution_options=BULK
+    )
+    await session.execute(
+        delete(ApplicationArchive).where(ApplicationArchive.application_id.in_(application_ids)), execution_options=BULK
+    )
+    result = await session.execute(delete(Application).where(*criteria), execution_options=BULK)
+    return result.rowcount
+
+
+async def delete_jobs(session: AsyncSession, *criteria) -> int:
+    """Delete every Job matching `criteria` and all of its applications; returns the job count"""
+    await delete_applications(session, Application.job_id.in_(select(Job.id).where(*criteria)))
+    result = await session.execute(delete(Job).where(*criteria), execution_options=BULK)
+    return result.rowcount
+
+
+async def count_applications(session: AsyncSession, job_id: int) -> int:
+    result = await session.execute(select(func.count()).select_from(Application).where(Application.job_id == job_id))
+    return result.scalar_one()
+
+
+async def start_job_deletion(session: AsyncSession, job: Job, total: int) -> JobDeletion:
+    """Hide the job and record a pending deletion owned by this worker (commits); run purge_job afterwards"""
+    deletion = await session.get(JobDeletion, job.id)
+    if deletion is None:
+        deletion = JobDeletion(job_id=job.id, hr_id=job.hr_id)
+        session.add(deletion)
+    deletion.status, deletion.total, deletion.deleted, deletion.error = "running", total, 0, None
+    deletion.owner = WORKER_ID
+    deletion.started_at = deletion.updated_at = datetime.utcnow()
+    await session.commit()
+    return deletion
+
+
+async def restart_job_deletion(session: AsyncSession, deletion: JobDeletion) -> JobDeletion:
+    """Retry a failed deletion on request (commits); run purge_job afterwards"""
+    deletion.status, deletion.error, deletion.owner = "running", None, WORKER_ID
+    deletion.updated_at = datetime.utcnow()
+    await session.commit()
+    return deletion
+
+
+def _claimable(stale: datetime):
+    """Running deletions that are unowned or whose owner stopped heartbeating, and failed ones due a retry"""
+    return or_(
+        and_(JobDeletion.status == "running", or_(JobDeletion.owner.is_(None), JobDeletion.updated_at < stale)),
+        and_(JobDeletion.status == "failed", JobDeletion.updated_at < stale),
+    )
+
+
+async def claim_job_deletion(job_id: int) -> bool:
+    """Take a deletion that is ours or claimable (see _claimable), marking it running"""
+    stale = datetime.utcnow() - timedelta(seconds=DELETE_HEARTBEAT_TIMEOUT)
+    async with async_session_maker() as session:
+        result = await session.execute(
+            update(JobDeletion)
+            .where(
+                JobDeletion.job_id == job_id,
+                or_(and_(JobDeletion.status == "running", JobDeletion.owner == WORKER_ID), _claimable(stale)),
+            )
+            .values(status="running", error=None, owner=WORKER_ID, updated_at=datetime.utcnow()),
+            execution_options=BULK,
+        )
+        await session.commit()
+    return result.rowcount == 1
+
+
+def _owned(job_id: int):
+    return update(JobDeletion).where(
+        JobDeletion.job_id == job_id, JobDeletion.status == "running", JobDeletion.owner == WORKER_ID
+    )
+
+
+async def purge_job(job_id: int):
+    """Background deletion in short batches; safe to re-run after a crash"""
+    if job_id in _purging:
+        return
+    _purging.add(job_id)
+    try:
+        if not await claim_job_deletion(job_id):
+            return  # another worker is purging it (or it is done / failed)
+        while True:
+            async with async_session_maker() as session:
+                batch = (await session.execute(
+                    select(Application.id).where(Application.job_id == job_id).limit(DELETE_BATCH_SIZE)
+                )).scalars().all()
+                if batch:
+                    deleted = await delete_applications(session, Application.id.in_(batch))
+                    progress = _owned(job_id).values(deleted=JobDeletion.deleted + deleted, updated_at=datetime.utcnow())
+                else:
+                    await session.execute(delete(Job).where(Job.id == job_id), execution_options=BULK)
+                    progress = _owned(job_id).values(status="done", updated_at=datetime.utcnow())
+                if (await session.execute(progress, execution_options=BULK)).rowcount == 0:
+                    # Our heartbeat went stale and another worker took the deletion over
+                    await session.rollback()
+                    logger.bind(event="job_deletion", job_id=job_id).warning(
+                        f"Background deletion of job {job_id} was taken over by another worker"
+                    )
+                    return
+                await session.commit()
+            if not batch:
+                logger.bind(event="job_deletion", job_id=job_id, status="done").info(
+                    f"Job {job_id} deleted in the background"
+                )
+                return
+            # Let request handlers run between batches
+            await asyncio.sleep(0)
+    except Exception as e:
+        logger.bind(event="job_deletion", job_id=job_id, status="failed").exception(
+            f"Background deletion of job {job_id} failed"
+        )
+        async with async_session_maker() as session:
+            await session.execute(
+                _owned(job_id).values(status="failed", error=str(e)[:500], updated_at=datetime.utcnow()),
+                execution_options=BULK,
+            )
+            await session.commit()
+    finally:
+        _purging.discard(job_id)
+
+
+async def resume_stale_deletions() -> int:
+    """
+    One pass of resume_job_deletions: purge the claimable deletions and drop
+    finished ones older than DELETE_STATUS_TTL; returns how many were purged
+    """
+    now = datetime.utcnow()
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(JobDeletion).where(
+                JobDeletion.status == "done", JobDeletion.updated_at < now - timedelta(seconds=DELETE_STATUS_TTL)
+            ),
+            execution_options=BULK,
+        )
+        await session.commit()
+        pending = (await session.execute(
+            select(JobDeletion.job_id).where(_claimable(now - timedelta(seconds=DELETE_HEARTBEAT_TIMEOUT)))
+        )).scalars().all()
+    resumed = 0
+    for job_id in pending:
+        if job_id not in _purging and await claim_job_deletion(job_id):
+            logger.bind(event="job_deletion", job_id=job_id).info(f"Resuming deletion of job {job_id}")
+            await purge_job(job_id)
+            resumed += 1
+    return resumed
+
+
+async def resume_job_deletions():
+    """Take over stopped and failed deletions (runs in the background of every worker)"""
+    while True:
+        try:
+            await resume_stale_deletions()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.bind(event="job_deletion").exception("Could not resume pending job deletions")
+        await asyncio.sleep(DELETE_HEARTBEAT_TIMEOUT)
+
+
+def deletion_progress(deletion: JobDeletion) -> dict:
+    return {
+        "job_id": deletion.job_id,
+        "status": deletion.status,
+        "total": deletion.total,
+        "deleted": deletion.deleted,
+        "error": deletion.error,
+        "started_at": deletion.started_at.isoformat(),
+        "updated_at": deletion.updated_at.isoformat(),
+    }
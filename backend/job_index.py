@@ -0,0 +1,200 @@
+"""
+Job Vector Index
+Keeps a hashed TF-IDF vector for every job posting in memory so a candidate's
+resume can be scored against all open jobs with a single matrix-vector product.
+Vectors are updated incrementally from create_job / update_job / delete_job;
+sync() picks up jobs other workers created, changed or deleted (job_sync.py),
+vectorizing them in a worker thread SYNC_CHUNK_SIZE jobs at a time so a full
+load never stalls the event loop.
+"""
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ats_scoring import VECTOR_DIM, hash_vector, hash_vectors
+from models import Job
+from storage import storage, to_key, BlobNotFound
+from blobs import content_addressed_key, read_resume_text
+from job_sync import JobSync
+
+SYNC_CHUNK_SIZE = 256
+
+
+def job_document(title: str, description: str) -> str:
+    """Text used to vectorize a job (title repeated so it outweighs boilerplate)"""
+    return f"{title} {title} {description}"
+
+
+class JobVectorIndex:
+    def __init__(self, dim: int = VECTOR_DIM):
+        self.dim = dim
+        self._ids: List[int] = []
+        self._positions: Dict[int, int] = {}
+        self._matrix = np.zeros((64, dim), dtype=np.float32)
+        self._doc_freq = np.zeros(dim, dtype=np.float32)
+        self._idf: Optional[np.ndarray] = None
+        self._row_norms: Optional[np.ndarray] = None
+        self._changes = JobSync()
+        self._lock = asyncio.Lock()
+        self._touched: Optional[set] = None  # jobs upserted / removed locally while a sync is running
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def upsert(self, job_id: int, title: str, description: str):
+        if self._touched is not None:
+            self._touched.add(job_id)
+        self._store(job_id, hash_vector(job_document(title, description), self.dim))
+
+    def _store(self, job_id: int, vector: np.ndarray):
+        if job_id in self._positions:
+            row = self._positions[job_id]
+            self._doc_freq -= self._matrix[row] > 0
+        else:
+            row = len(self._ids)
+            if row == len(self._matrix):
+                grown = np.zeros((len(self._matrix) * 2, self.dim), dtype=np.float32)
+                grown[:row] = self._matrix[:row]
+                self._matrix = grown
+            self._ids.append(job_id)
+            self._positions[job_id] = row
+
+        self._matrix[row] = vector
+        self._doc_freq += vector > 0
+        self._invalidate()
+
+    def remove(self, job_id: int):
+        if self._touched is not None:
+            self._touched.add(job_id)
+        row = self._positions.pop(job_id, None)
+        if row is None:
+            return
+        self._doc_freq -= self._matrix[row] > 0
+
+        # Swap the last row into the hole to keep the matrix dense
+        last = len(self._ids) - 1
+        if row != last:
+            last_id = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = last_id
+            self._positions[last_id] = row
+        self._matrix[last] = 0
+        self._ids.pop()
+        self._invalidate()
+
+    def _invalidate(self):
+        self._idf = None
+        self._row_norms = None
+
+    def _weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Smoothed IDF and the IDF-weighted row norms (recomputed lazily after updates)"""
+        if self._idf is None:
+            n = len(self._ids)
+            self._idf = (np.log((1.0 + n) / (1.0 + self._doc_freq)) + 1.0).astype(np.float32)
+            self._row_norms = None
+        if self._row_norms is None:
+            weighted = self._matrix[:len(self._ids)] * self._idf
+            self._row_norms = np.linalg.norm(weighted, axis=1)
+        return self._idf, self._row_norms
+
+    def top_n(self, query: np.ndarray, n: int = 10, exclude_ids=()) -> List[Tuple[int, float]]:
+        """Cosine similarity of the query against every job, best first"""
+        if not self._ids:
+            return []
+
+        idf, row_norms = self._weights()
+        weighted_query = query * idf
+        query_norm = float(np.linalg.norm(weighted_query))
+        if query_norm == 0:
+            return []
+
+        scores = self._matrix[:len(self._ids)] @ (weighted_query * idf)
+        scores /= np.maximum(row_norms, 1e-9) * query_norm
+
+        if exclude_ids:
+            excluded = [self._positions[j] for j in exclude_ids if j in self._positions]
+            scores[excluded] = -1.0
+
+        n = min(n, len(scores))
+        if n <= 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    async def sync(self, session: AsyncSession):
+        """Load every job on first use, afterwards (throttled) only jobs other workers changed or deleted"""
+        if not self._changes.due():
+            return
+        async with self._lock:
+            if not self._changes.due():
+                return
+            first = not self._changes.loaded
+            self._touched = set()
+            try:
+                rows = await self._changes.changed(session, Job.id, Job.title, Job.description)
+                for start in range(0, len(rows), SYNC_CHUNK_SIZE):
+                    chunk = rows[start:start + SYNC_CHUNK_SIZE]
+                    documents = [job_document(title, description) for _, title, description in chunk]
+                    vectors = await asyncio.to_thread(hash_vectors, documents, self.dim)
+                    for (job_id, _, _), vector in zip(chunk, vectors):
+                        # A local create / update / delete since the rows were read is newer
+                        if job_id not in self._touched:
+                            self._store(job_id, vector)
+            finally:
+                self._touched = None
+            if first:
+                print(f"📚 Job vector index loaded ({len(self)} jobs)")
+                return
+
+            for job_id in set(self._positions) - await self._changes.active_ids(session):
+                self.remove(job_id)
+
+
+job_index = JobVectorIndex()
+
+
+# ---------------------------------------------------------
+# Candidate resume vectors (keyed by stored path; legacy paths also by mtime)
+# ---------------------------------------------------------
+RESUME_VECTOR_CACHE_SIZE = int(os.getenv("RESUME_VECTOR_CACHE_SIZE", "512"))
+_resume_vectors: "OrderedDict[Tuple[str, float], np.ndarray]" = OrderedDict()
+
+
+async def get_resume_vector(resume_path: str) -> Optional[np.ndarray]:
+    """Vector for a stored resume PDF, or None if the file is missing/unreadable"""
+    if not resume_path:
+        return None
+
+    if content_addressed_key(resume_path):
+        # Content-addressed blobs never change under the same path
+        key = (resume_path, 0.0)
+    else:
+        try:
+            info = await storage.stat(to_key(resume_path))
+        except BlobNotFound:
+            return None
+        if info is None:
+            return None
+        key = (resume_path, info.modified.timestamp())
+
+    if key in _resume_vectors:
+        _resume_vectors.move_to_end(key)
+        return _resume_vectors[key]
+
+    try:
+        resume_text = await read_resume_text(resume_path)
+    except BlobNotFound:
+        return None
+    if not resume_text:
+        return None
+
+    vector = await asyncio.to_thread(hash_vector, resume_text)
+    _resume_vectors[key] = vector
+    if len(_resume_vectors) > RESUME_VECTOR_CACHE_SIZE:
+        _resume_vectors.popitem(last=False)
+    return vector
@@ -0,0 +1,240 @@
+"""
+Job Search Index
+In-memory inverted index over job postings for the candidate job board, so
+search, filters and facet counts no longer need every job shipped to the browser.
+
+- Terms come from title, company, location and description, weighted per field
+  (title > company/location > description) with saturating term frequency and IDF
+- Every query word must match (AND). Each word also matches vocabulary terms it
+  is a prefix of, at a lower weight ("engineer" -> engineering; the last word
+  from two letters, for search-as-you-type). Words with no exact or prefix
+  match fall back to trigram similarity (pg_trgm style), so "kubernets" still
+  finds kubernetes
+- Facets (job_type, work_location, experience buckets) are counted over the
+  matching jobs with every other filter applied, so counts show what picking
+  that value would return
+- Maintained incrementally from create_job / update_job / delete_job; sync()
+  picks up jobs other workers created, changed or deleted (job_sync.py),
+  at most every JOB_INDEX_SYNC_INTERVAL seconds
+"""
+import asyncio
+import math
+import os
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models import Job
+from job_sync import JobSync
+
+FIELD_WEIGHTS = {"title": 3.0, "company": 2.0, "location": 2.0, "description": 1.0}
+PREFIX_WEIGHT = 0.8
+MIN_PREFIX_LENGTH = 2
+FUZZY_MIN_LENGTH = 4
+FUZZY_THRESHOLD = float(os.getenv("JOB_SEARCH_FUZZY_THRESHOLD", "0.4"))
+MAX_EXPANSIONS = 20
+
+# (bucket, min years, max years) over Job.experience_required
+EXPERIENCE_BUCKETS = (("0", 0, 0), ("1-2", 1, 2), ("3-5", 3, 5), ("6+", 6, None))
+FACETS = ("job_type", "work_location", "experience")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the this to we will with you your".split()
+)
+_WORD = re.compile(r"\w[\w+#]*")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [word for word in _WORD.findall((text or "").lower()) if word not in STOPWORDS]
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def experience_bucket(years: int) -> str:
+    for name, low, high in EXPERIENCE_BUCKETS:
+        if years >= low and (high is None or years <= high):
+            return name
+    return EXPERIENCE_BUCKETS[0][0]
+
+
+class _JobDoc:
+    __slots__ = ("terms", "job_type", "work_location", "experience", "created_at")
+
+    def __init__(self, terms: Dict[str, float], job_type: str, work_location: str, experience: str, created_at: datetime):
+        self.terms = terms
+        self.job_type = job_type
+        self.work_location = work_location
+        self.experience = experience
+        self.created_at = created_at
+
+    def facet(self, name: str) -> str:
+        return getattr(self, name)
+
+
+class JobSearchIndex:
+    def __init__(self):
+        self._docs: Dict[int, _JobDoc] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._vocabulary: Optional[List[str]] = None
+        self._changes = JobSync()
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def upsert(self, job: Job):
+        job_id = job.id
+        self.remove(job_id)
+
+        # Saturating tf per field: repeating a word in the description can't outweigh the title
+        terms: Dict[str, float] = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for term, count in Counter(tokenize(getattr(job, field))).items():
+                terms[term] = terms.get(term, 0.0) + field_weight * count / (count + 1.0)
+
+        self._docs[job_id] = _JobDoc(
+            terms, job.job_type, job.work_location, experience_bucket(job.experience_required or 0),
+            job.created_at or datetime.utcnow(),
+        )
+        postings = self._postings
+        for term, weight in terms.items():
+            posting = postings.get(term)
+            if posting is None:
+                posting = postings[term] = {}
+                for gram in trigrams(term):
+                    self._trigrams[gram].add(term)
+                self._vocabulary = None
+            posting[job_id] = weight
+
+    def remove(self, job_id: int):
+        doc = self._docs.pop(job_id, None)
+        if doc is None:
+            return
+        for term in doc.terms:
+            posting = self._postings[term]
+            posting.pop(job_id, None)
+            if not posting:
+                del self._postings[term]
+                for gram in trigrams(term):
+                    self._trigrams[gram].discard(term)
+                self._vocabulary = None
+
+    def _prefixed(self, term: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect_left(self._vocabulary, term)
+        matches = []
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            if candidate != term:
+                matches.append(candidate)
+        # Most common completions first
+        matches.sort(key=lambda t: len(self._postings[t]), reverse=True)
+        return matches[:MAX_EXPANSIONS]
+
+    def _similar(self, term: str) -> List[Tuple[str, float]]:
+        grams = trigrams(term)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for candidate in self._trigrams.get(gram, ()):
+                shared[candidate] += 1
+        scored = []
+        for candidate, common in shared.items():
+            similarity = common / (len(grams) + len(trigrams(candidate)) - common)
+            if similarity >= FUZZY_THRESHOLD:
+                scored.append((candidate, similarity))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:MAX_EXPANSIONS]
+
+    def _expand(self, term: str, last: bool) -> Tuple[Dict[str, float], Optional[str]]:
+        """{vocabulary term: weight} a query word matches, plus its typo correction if fuzzy"""
+        expansions = {term: 1.0} if term in self._postings else {}
+        if len(term) >= (MIN_PREFIX_LENGTH if last else MIN_PREFIX_LENGTH + 1):
+            for candidate in self._prefixed(term):
+                expansions.setdefault(candidate, PREFIX_WEIGHT)
+        if expansions or len(term) < FUZZY_MIN_LENGTH:
+            return expansions, None
+        similar = self._similar(term)
+        return dict(similar), (similar[0][0] if similar else None)
+
+    def search(self, query: str, filters: Optional[Dict[str, str]] = None,
+               offset: int = 0, limit: int = 20) -> dict:
+        """{"total", "hits": [(job_id, score)], "facets", "corrections"} for one page"""
+        filters = {name: value for name, value in (filters or {}).items() if value}
+        words = list(dict.fromkeys(tokenize(query)))
+        corrections: Dict[str, str] = {}
+
+        if words:
+            scores: Optional[Dict[int, float]] = None
+            for i, word in enumerate(words):
+                expansions, correction = self._expand(word, last=i == len(words) - 1)
+                if correction:
+                    corrections[word] = correction
+                word_scores: Dict[int, float] = {}
+                for term, weight in expansions.items():
+                    posting = self._postings[term]
+                    idf = math.log(1.0 + len(self._docs) / len(posting))
+                    for job_id, tf in posting.items():
+                        score = weight * tf * idf
+                        if score > word_scores.get(job_id, 0.0):
+                            word_scores[job_id] = score
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {job_id: score + word_scores[job_id] for job_id, score in scores.items() if job_id in word_scores}
+                if not scores:
+                    break
+        else:
+            # Browse mode: every job, newest first
+            scores = dict.fromkeys(self._docs, 0.0)
+
+        facets: Dict[str, Dict[str, int]] = {name: defaultdict(int) for name in FACETS}
+        matched = []
+        for job_id in scores:
+            doc = self._docs[job_id]
+            failed = [name for name, value in filters.items() if doc.facet(name) != value]
+            if not failed:
+                matched.append(job_id)
+                for name in FACETS:
+                    facets[name][doc.facet(name)] += 1
+            elif len(failed) == 1:
+                # Counts for the one facet this job misses, as if that filter were changed
+                facets[failed[0]][doc.facet(failed[0])] += 1
+
+        matched.sort(key=lambda job_id: (scores[job_id], self._docs[job_id].created_at, job_id), reverse=True)
+        return {
+            "total": len(matched),
+            "hits": [(job_id, scores[job_id]) for job_id in matched[offset:offset + limit]],
+            "facets": {name: dict(counts) for name, counts in facets.items()},
+            "corrections": corrections,
+        }
+
+    async def sync(self, session: AsyncSession):
+        """Load every job on first use, afterwards (throttled) only jobs other workers changed or deleted"""
+        if not self._changes.due():
+            return
+        async with self._lock:
+            if not self._changes.due():
+                return
+            first = not self._changes.loaded
+            for (job,) in await self._changes.changed(session, Job):
+                self.upsert(job)
+            if first:
+                print(f"🔎 Job search index loaded ({len(self)} jobs)")
+                return
+
+            for job_id in set(self._docs) - await self._changes.active_ids(session):
+                self.remove(job_id)
+
+
+job_search_index = JobSearchIndex()
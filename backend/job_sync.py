@@ -0,0 +1,57 @@
+"""
+Job Index Sync
+The in-memory job indexes (job_search.JobSearchIndex, job_index.JobVectorIndex)
+are kept current by create_job / update_job / delete_job in the worker that
+handles the request; JobSync tells each index what the other workers changed.
+
+- At most one sync every JOB_INDEX_SYNC_INTERVAL seconds; requests in between
+  use the index as is
+- Jobs whose updated_at is past the previous sync are reloaded. The watermark
+  overlaps the previous sync by WATERMARK_OVERLAP, so a job committed slightly
+  out of timestamp order (or by a worker with a skewed clock) is not missed
+- Deleted and hidden jobs are found with one id-only query
+
+  JOB_INDEX_SYNC_INTERVAL=5
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models import Job
+from job_deletion import active_job_filter
+
+JOB_INDEX_SYNC_INTERVAL = float(os.getenv("JOB_INDEX_SYNC_INTERVAL", "5"))
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+
+class JobSync:
+    def __init__(self, interval: float = JOB_INDEX_SYNC_INTERVAL):
+        self.interval = interval
+        self._watermark: Optional[datetime] = None
+        self._next_sync = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self._watermark is not None
+
+    def due(self) -> bool:
+        return time.monotonic() >= self._next_sync
+
+    async def changed(self, session: AsyncSession, *columns) -> List:
+        """Rows of `columns` for active jobs changed since the last call (every active job the first time)"""
+        started = datetime.utcnow()
+        stmt = select(*columns).where(active_job_filter())
+        if self._watermark is not None:
+            stmt = stmt.where(Job.updated_at >= self._watermark - WATERMARK_OVERLAP)
+        rows = (await session.execute(stmt)).all()
+        self._watermark = started
+        self._next_sync = time.monotonic() + self.interval
+        return rows
+
+    async def active_ids(self, session: AsyncSession) -> Set[int]:
+        result = await session.execute(select(Job.id).where(active_job_filter()))
+        return set(result.scalars().all())
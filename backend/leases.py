@@ -0,0 +1,54 @@
+"""
+Background Leases
+The lifespan starts the background tasks (upload sweeper, application
+archiver, ...) in every uvicorn worker; a lease lets exactly one worker do
+the work at a time.
+
+- A lease is a BackgroundLease row (name, owner, expires_at). acquire() takes
+  it when it is free or expired, or extends it when this worker already holds
+  it, with one conditional UPDATE (the very first acquire INSERTs the row), so
+  it behaves the same on SQLite and Postgres
+- The holder calls acquire() again before the lease runs out, with a longer
+  ttl to keep it through a pause between passes; a worker that dies loses the
+  lease once it expires and another worker takes over
+
+  LEASE_TTL=60 (seconds)
+"""
+import os
+import socket
+import time
+import uuid
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from database import async_session_maker
+from models import BackgroundLease
+
+LEASE_TTL = float(os.getenv("LEASE_TTL", "60"))
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def acquire(name: str, ttl: float = LEASE_TTL) -> bool:
+    """Take or extend the lease for `ttl` seconds; False while another worker holds it"""
+    now = time.time()
+    async with async_session_maker() as session:
+        result = await session.execute(
+            update(BackgroundLease)
+            .where(BackgroundLease.name == name)
+            .where(or_(BackgroundLease.owner == WORKER_ID, BackgroundLease.expires_at < now))
+            .values(owner=WORKER_ID, expires_at=now + ttl)
+        )
+        if result.rowcount:
+            await session.commit()
+            return True
+        await session.rollback()
+
+        session.add(BackgroundLease(name=name, owner=WORKER_ID, expires_at=now + ttl))
+        try:
+            await session.commit()
+            return True
+        except IntegrityError:
+            # The row exists and is held by another worker
+            return False
@@ -0,0 +1,281 @@
+"""
+LLM Client
+Single entry point for Groq chat completions.
+
+- Blocking Groq SDK calls run in a worker thread instead of on the event loop
+- Results are cached by (model, temperature, normalized prompt hash) with a TTL,
+  in a bounded in-memory LRU backed by the `llmcacheentry` table so entries
+  survive restarts and are shared between workers
+- Concurrent identical requests coalesce onto one in-flight upstream call
+- Callers expecting JSON pass a validator; replies that fail it are returned
+  but not cached, so a malformed reply isn't replayed for the whole TTL
+- Upstream calls are admitted by priority (see llm_scheduler.py); cache hits
+  never wait for a slot
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from groq import Groq
+from sqlalchemy import delete
+from sqlalchemy.future import select
+
+from database import async_session_maker
+from llm_scheduler import CALL_SITE_PRIORITY, Priority, llm_scheduler
+from metrics import LLM_CACHE_LOOKUPS, LLM_ERRORS, LLM_REQUEST_SECONDS, LLM_TOKENS
+from models import LLMCacheEntry
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+JSON_SYSTEM_PROMPT = "You are a helpful assistant that outputs raw JSON data without markdown formatting."
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))  # in-memory
+LLM_CACHE_MAX_PERSISTED = int(os.getenv("LLM_CACHE_MAX_PERSISTED", "20000"))  # database
+LLM_CACHE_PRUNE_EVERY = 100  # writes between database prunes
+
+client = Groq(
+    api_key=os.environ.get("GROQ_API_KEY"),
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cache_key(messages: List[dict], model: str, temperature: float) -> str:
+    """Stable hash of the request; whitespace differences in prompts don't matter"""
+    normalized = [
+        {"role": m.get("role"), "content": _WHITESPACE.sub(" ", m.get("content") or "").strip()}
+        for m in messages
+    ]
+    payload = json.dumps(
+        {"model": model, "temperature": round(float(temperature), 3), "messages": normalized},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def json_reply_validator(opener: str = "{") -> Callable[[str], bool]:
+    """Validator for chat_completion: the reply holds a parseable JSON object ("{") or array ("[")"""
+    closer = "}" if opener == "{" else "]"
+
+    def validate(content: str) -> bool:
+        clean = (content or "").replace("```json", "").replace("```", "").strip()
+        start, end = clean.find(opener), clean.rfind(closer) + 1
+        if start == -1 or end <= start:
+            return False
+        try:
+            json.loads(clean[start:end])
+            return True
+        except ValueError:
+            return False
+
+    return validate
+
+
+class LLMCache:
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._entries: "OrderedDict[str, Tuple[datetime, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._writes = 0
+        self.stats = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "upstream_errors": 0,
+            "rejected": 0,  # replies that failed the caller's validator (returned, not cached)
+        }
+
+    # ---- in-memory LRU ----
+    def _get_memory(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < datetime.utcnow():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_memory(self, key: str, value: str, expires_at: datetime):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    # ---- persistent tier ----
+    async def _get_persisted(self, key: str) -> Optional[Tuple[datetime, str]]:
+        try:
+            async with async_session_maker() as session:
+                result = await session.execute(select(LLMCacheEntry).where(LLMCacheEntry.key == key))
+                entry = result.scalars().first()
+                if entry and entry.expires_at >= datetime.utcnow():
+                    return entry.expires_at, entry.response
+        except Exception as e:
+            print(f"⚠️ LLM cache read failed: {e}")
+        return None
+
+    async def _put_persisted(self, key: str, value: str, model: str, call_site: str, expires_at: datetime):
+        try:
+            async with async_session_maker() as session:
+                await session.merge(LLMCacheEntry(
+                    key=key, model=model, call_site=call_site, response=value, expires_at=expires_at
+                ))
+                await session.commit()
+
+                self._writes += 1
+                if self._writes % LLM_CACHE_PRUNE_EVERY == 0:
+                    await self._prune(session)
+        except Exception as e:
+            print(f"⚠️ LLM cache write failed: {e}")
+
+    async def _prune(self, session):
+        """Drop expired rows, then the oldest rows beyond LLM_CACHE_MAX_PERSISTED"""
+        await session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at < datetime.utcnow()))
+        cutoff = await session.execute(
+            select(LLMCacheEntry.created_at)
+            .order_by(LLMCacheEntry.created_at.desc())
+            .offset(LLM_CACHE_MAX_PERSISTED)
+            .limit(1)
+        )
+        oldest_kept = cutoff.scalar()
+        if oldest_kept is not None:
+            await session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.created_at <= oldest_kept))
+        await session.commit()
+
+    # ---- public API ----
+    async def get_or_call(self, key: str, model: str, call_site: str, upstream,
+                          validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Cached / coalesced upstream call. Replies failing `validate` are returned
+        but never cached, so one malformed reply isn't replayed for the whole TTL.
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            LLM_CACHE_LOOKUPS.inc(call_site=call_site, result="memory_hit")
+            return value
+
+        # Someone is already fetching this exact prompt: wait for their result.
+        # asyncio.wait never cancels the shared future; if the leader was cancelled
+        # it is cancelled too, and the next waiter in line becomes the leader
+        inflight = self._inflight.get(key)
+        while inflight is not None:
+            self.stats["coalesced"] += 1
+            LLM_CACHE_LOOKUPS.inc(call_site=call_site, result="coalesced")
+            await asyncio.wait([inflight])
+            if not inflight.cancelled():
+                return inflight.result()
+            inflight = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            persisted = await self._get_persisted(key)
+            if persisted is not None and validate is not None and not validate(persisted[1]):
+                persisted = None  # stored before validation existed
+            if persisted is not None:
+                self.stats["persistent_hits"] += 1
+                LLM_CACHE_LOOKUPS.inc(call_site=call_site, result="persistent_hit")
+                expires_at, value = persisted
+                self._put_memory(key, value, expires_at)
+            else:
+                self.stats["misses"] += 1
+                LLM_CACHE_LOOKUPS.inc(call_site=call_site, result="miss")
+                try:
+                    value = await upstream()
+                except Exception:
+                    self.stats["upstream_errors"] += 1
+                    raise
+                if validate is not None and not validate(value):
+                    self.stats["rejected"] += 1
+                else:
+                    expires_at = datetime.utcnow() + self.ttl
+                    self._put_memory(key, value, expires_at)
+                    await self._put_persisted(key, value, model, call_site, expires_at)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            # Cancelled (CancelledError is a BaseException): release the waiters
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["memory_hits"] + self.stats["persistent_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["persistent_hits"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._entries),
+            "inflight": len(self._inflight),
+        }
+
+
+llm_cache = LLMCache()
+
+
+async def chat_completion(
+    messages: List[dict],
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.3,
+    call_site: str = "general",
+    use_cache: bool = True,
+    priority: Optional[Priority] = None,
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """
+    Returns the completion text for `messages` (cached and coalesced by default).
+    Only replies passing `validate` (e.g. json_reply_validator()) are cached.
+    `priority` defaults to the call site's class; raises LLMOverloaded (503) when
+    that class is shedding load.
+    """
+    if priority is None:
+        priority = CALL_SITE_PRIORITY.get(call_site, Priority.BATCH)
+
+    async def call_groq() -> str:
+        start = time.perf_counter()
+        try:
+            completion = await asyncio.to_thread(
+                client.chat.completions.create,
+                messages=messages,
+                model=model,
+                temperature=temperature,
+            )
+        except Exception:
+            LLM_ERRORS.inc(call_site=call_site)
+            raise
+        finally:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, call_site=call_site, model=model)
+
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            LLM_TOKENS.inc(usage.prompt_tokens or 0, call_site=call_site, kind="prompt")
+            LLM_TOKENS.inc(usage.completion_tokens or 0, call_site=call_site, kind="completion")
+        return completion.choices[0].message.content
+
+    async def upstream() -> str:
+        return await llm_scheduler.run(priority, call_groq)
+
+    if not (use_cache and LLM_CACHE_ENABLED):
+        return await upstream()
+
+    key = cache_key(messages, model, temperature)
+    return await llm_cache.get_or_call(key, model, call_site, upstream, validate)
@@ -0,0 +1,180 @@
+"""
+LLM Admission Control
+Every upstream LLM call is admitted through a priority scheduler so bulk work
+can't starve live interviews of the shared Groq rate limit:
+
+  INTERACTIVE  live interview turns (questions, policy Q&A)
+  CANDIDATE    candidate-facing ATS analysis
+  BATCH        HR summaries and background answer evaluation
+
+Each class has its own concurrency cap under a global cap; freed slots go to the
+highest-priority waiter first. When a class queue is full the call is shed with
+503 + Retry-After instead of piling up on the event loop.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Awaitable, Callable, Dict
+
+from fastapi import HTTPException, status
+
+from metrics import LLM_QUEUE_WAIT_SECONDS, LLM_SCHEDULER_QUEUED, LLM_SCHEDULER_RUNNING, LLM_SHED, registry
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    CANDIDATE = 1
+    BATCH = 2
+
+
+# Default priority per LLM call site
+CALL_SITE_PRIORITY = {
+    "questions": Priority.INTERACTIVE,
+    "policy_qa": Priority.INTERACTIVE,
+    "ats": Priority.CANDIDATE,
+    "summary": Priority.BATCH,
+    "answer_eval": Priority.BATCH,
+}
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+CLASS_CONCURRENCY = {
+    Priority.INTERACTIVE: int(os.getenv("LLM_CONCURRENCY_INTERACTIVE", str(LLM_MAX_CONCURRENCY))),
+    Priority.CANDIDATE: int(os.getenv("LLM_CONCURRENCY_CANDIDATE", "4")),
+    Priority.BATCH: int(os.getenv("LLM_CONCURRENCY_BATCH", "2")),
+}
+CLASS_QUEUE_LIMIT = {
+    Priority.INTERACTIVE: int(os.getenv("LLM_QUEUE_LIMIT_INTERACTIVE", "50")),
+    Priority.CANDIDATE: int(os.getenv("LLM_QUEUE_LIMIT_CANDIDATE", "20")),
+    Priority.BATCH: int(os.getenv("LLM_QUEUE_LIMIT_BATCH", "200")),
+}
+
+
+class LLMOverloaded(HTTPException):
+    """Raised when a priority class queue is full (served as 503 with Retry-After)"""
+
+    def __init__(self, priority: Priority, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The AI service is busy right now. Please try again shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.priority = priority
+
+
+class _ClassStats:
+    __slots__ = ("admitted", "shed", "wait_seconds", "run_seconds", "errors")
+
+    def __init__(self):
+        self.admitted = 0
+        self.shed = 0
+        self.errors = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._running_total = 0
+        self._running: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._queues: Dict[Priority, deque] = {p: deque() for p in Priority}
+        self.stats: Dict[Priority, _ClassStats] = {p: _ClassStats() for p in Priority}
+
+    def _dispatch(self):
+        """Hand free slots to waiters, highest priority first"""
+        for priority in Priority:
+            queue = self._queues[priority]
+            while (
+                queue
+                and self._running_total < self.max_concurrency
+                and self._running[priority] < CLASS_CONCURRENCY[priority]
+            ):
+                waiter = queue.popleft()
+                if waiter.done():  # cancelled while queued
+                    continue
+                self._running_total += 1
+                self._running[priority] += 1
+                waiter.set_result(None)
+
+    def _release(self, priority: Priority):
+        self._running_total -= 1
+        self._running[priority] -= 1
+        self._dispatch()
+
+    def _retry_after(self, priority: Priority) -> int:
+        stats = self.stats[priority]
+        avg_run = stats.run_seconds / stats.admitted if stats.admitted else 2.0
+        backlog = len(self._queues[priority]) / max(1, CLASS_CONCURRENCY[priority])
+        return max(1, math.ceil(avg_run * backlog))
+
+    async def run(self, priority: Priority, call: Callable[[], Awaitable]):
+        """Wait for an admission slot for `priority`, then await `call()`"""
+        queue = self._queues[priority]
+        if len(queue) >= CLASS_QUEUE_LIMIT[priority]:
+            self.stats[priority].shed += 1
+            LLM_SHED.inc(priority=priority.name.lower())
+            raise LLMOverloaded(priority, self._retry_after(priority))
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        queued_at = time.perf_counter()
+        self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(priority)  # slot was granted just before cancellation
+            else:
+                try:
+                    queue.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+        started_at = time.perf_counter()
+        wait_seconds = started_at - queued_at
+        LLM_QUEUE_WAIT_SECONDS.observe(wait_seconds, priority=priority.name.lower())
+        try:
+            return await call()
+        except Exception:
+            self.stats[priority].errors += 1
+            raise
+        finally:
+            run_seconds = time.perf_counter() - started_at
+            stats = self.stats[priority]
+            stats.admitted += 1
+            stats.wait_seconds += wait_seconds
+            stats.run_seconds += run_seconds
+            self._release(priority)
+
+    def snapshot(self) -> dict:
+        return {
+            priority.name.lower(): {
+                "running": self._running[priority],
+                "queued": len(self._queues[priority]),
+                "concurrency_limit": CLASS_CONCURRENCY[priority],
+                "queue_limit": CLASS_QUEUE_LIMIT[priority],
+                "admitted": stats.admitted,
+                "shed": stats.shed,
+                "errors": stats.errors,
+                "avg_wait_ms": round(stats.wait_seconds / stats.admitted * 1000, 1) if stats.admitted else 0.0,
+                "avg_run_ms": round(stats.run_seconds / stats.admitted * 1000, 1) if stats.admitted else 0.0,
+            }
+            for priority, stats in self.stats.items()
+        }
+
+
+llm_scheduler = LLMScheduler()
+
+
+def _collect_scheduler_gauges():
+    for priority in Priority:
+        LLM_SCHEDULER_RUNNING.set(llm_scheduler._running[priority], priority=priority.name.lower())
+        LLM_SCHEDULER_QUEUED.set(len(llm_scheduler._queues[priority]), priority=priority.name.lower())
+
+
+registry.add_collector(_collect_scheduler_gauges)
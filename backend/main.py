@@ -1,41 +1,59 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from contextlib import asynccontextmanager
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from loguru import logger
-import sys
+import asyncio
 
-from database import init_db, get_session
+from database import init_db, get_session, engine
 from models import User, UserRole
 from schemas import UserCreate, Token
-from auth import get_password_hash, create_access_token, verify_password
+from auth import get_password_hash, create_access_token, verify_password, require_debug_token
+from rate_limit import limiter, rate_limit
+from app_logging import configure_logging
+from metrics import METRICS_ENABLED, instrument_engine, monitor_event_loop_lag, render_metrics
+from middleware import RequestMiddleware
+from storage import storage, to_key, BlobNotFound
+from upload_sweeper import SWEEPER_ENABLED, upload_sweeper
+from job_deletion import resume_job_deletions
+from application_archive import ARCHIVE_ENABLED, application_archiver
+from compressed_columns import refresh_dictionaries
+from blobs import content_addressed_key
+from images import variant_base
+import sql_profiler
 from routers import interview, jobs, ats, applications, users, verification, schedule, password_reset
 import secrets
 from datetime import datetime, timedelta
 from pydantic import BaseModel, EmailStr
 
 # ✅ SECURITY FIX: Structured logging setup (Bug #12)
-logger.remove()  # Remove default handler
-logger.add(sys.stdout, format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}", level="INFO")
-logger.add("logs/app.log", rotation="1 day", retention="7 days", level="DEBUG")  # File logging
-
-# ✅ SECURITY FIX: Rate limiter setup (Bug #8)
-limiter = Limiter(key_func=get_remote_address)
+configure_logging()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    lag_monitor = asyncio.create_task(monitor_event_loop_lag()) if METRICS_ENABLED else None
+    sweeper = asyncio.create_task(upload_sweeper.run_forever()) if SWEEPER_ENABLED else None
+    deletions = asyncio.create_task(resume_job_deletions())
+    archiver = asyncio.create_task(application_archiver.run_forever()) if ARCHIVE_ENABLED else None
+    dictionary_refresh = asyncio.create_task(refresh_dictionaries(engine))
+    bucket_prune = asyncio.create_task(limiter.prune_forever())
     yield
+    if lag_monitor:
+        lag_monitor.cancel()
+    if sweeper:
+        sweeper.cancel()
+    deletions.cancel()
+    if archiver:
+        archiver.cancel()
+    dictionary_refresh.cancel()
+    bucket_prune.cancel()
 
 app = FastAPI(title="HireMind API", lifespan=lifespan)
-
-# Add rate limiter to app state
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+instrument_engine(engine)
+if sql_profiler.SQL_PROFILER_ENABLED:
+    sql_profiler.install(engine)
 
 app.include_router(interview.router)
 app.include_router(jobs.router)
@@ -60,39 +78,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ✅ SECURITY FIX: Add security headers to mitigate XSS risk (Bug #6)
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    response = await call_next(request)
-    # Prevent clickjacking
-    response.headers["X-Frame-Options"] = "DENY"
-    # Prevent MIME type sniffing
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    # Enable XSS protection
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    # Content Security Policy - helps prevent XSS
-    response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline';"
-    # HSTS for HTTPS (important in production)
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-    return response
-
-# ✅ LOGGING: Request logging middleware (Bug #12)
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info(f"Request: {request.method} {request.url.path}")
-    response = await call_next(request)
-    logger.info(f"Response: {response.status_code} for {request.method} {request.url.path}")
-    return response
-
-from fastapi.staticfiles import StaticFiles
-import os
-
-# Create uploads directory if not exists
-UPLOAD_DIR = "uploads"
-if not os.path.exists(UPLOAD_DIR):
-    os.makedirs(UPLOAD_DIR)
-
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+# ✅ Security headers + request logging/metrics (Bug #6, Bug #12) in one pure-ASGI
+# middleware; added last so it wraps CORS and sees every response
+app.add_middleware(RequestMiddleware)
+
+# Uploaded files are served from the configured storage backend: local files are
+# streamed with ETag/Range support, S3 objects redirect to a presigned URL
+@app.api_route("/uploads/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_upload(key: str, request: Request):
+    try:
+        storage_key = to_key(key)
+        # Content-addressed resumes and derived variants never change under the same key
+        immutable = content_addressed_key(storage_key) is not None or variant_base(storage_key) != storage_key
+        headers = {"Cache-Control": "public, max-age=31536000, immutable"} if immutable else None
+        return await storage.response(storage_key, request, headers=headers)
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail="File not found")
 
 @app.get("/")
 def read_root():
@@ -211,8 +212,8 @@ class LoginRequest(BaseModel):
     role: str # 'student' or 'hr' - Enforced context
 
 # ✅ SECURITY FIX: Rate limit login attempts (Bug #8)
-@app.post("/auth/login", response_model=Token)
-@limiter.limit("5/minute")  # Max 5 login attempts per minute per IP
+# Max 5 login attempts per minute per IP (token bucket shared across workers)
+@app.post("/auth/login", response_model=Token, dependencies=[Depends(rate_limit("auth_login"))])
 async def login(request: Request, user_data: LoginRequest, session: AsyncSession = Depends(get_session)):
     
     result = await session.execute(select(User).where(User.email == user_data.email))
@@ -327,6 +328,40 @@ async def debug_fix_schema():
         return {"status": "error", "message": str(e), "log": log}
 
 
+@app.get("/debug/llm-cache", dependencies=[Depends(require_debug_token)])
+async def debug_llm_cache():
+    """LLM result cache hit/miss/coalescing counters for this worker"""
+    from llm import llm_cache
+    return llm_cache.snapshot()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (text exposition format)"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/debug/storage", dependencies=[Depends(require_debug_token)])
+async def debug_storage():
+    """Upload storage from the sweeper's last full pass: totals by state, deletions, top owners by bytes"""
+    return await upload_sweeper.snapshot()
+
+
+@app.get("/debug/archive", dependencies=[Depends(require_debug_token)])
+async def debug_archive():
+    """Application archiver: archived row count, raw vs compressed bytes, passes on this worker"""
+    return await application_archiver.snapshot()
+
+
+@app.get("/debug/llm-scheduler", dependencies=[Depends(require_debug_token)])
+async def debug_llm_scheduler():
+    """LLM admission control: running/queued/shed counts and avg wait/run time per priority class"""
+    from llm_scheduler import llm_scheduler
+    return llm_scheduler.snapshot()
+
+
 # ============================================================================
 # DUAL OTP VERIFICATION ENDPOINTS
 # ============================================================================
@@ -0,0 +1,337 @@
+"""
+Metrics
+Minimal in-process Prometheus registry (counters, gauges, histograms) rendered
+in the text exposition format at GET /metrics. Recording is a dict lookup plus a
+bisect under a lock, so it is cheap enough to leave on in production.
+
+Metrics are per worker process; scrape each worker (or run a single worker
+behind the scrape target) when using several uvicorn workers.
+
+What is recorded where:
+  - HTTP latency per route template, DB queries/time per request   main.py middleware
+  - LLM latency / tokens / errors per call site, queue wait         llm.py, llm_scheduler.py
+  - Email send latency                                              email_utils.py
+  - PDF parse time                                                  utils.py
+  - Password hash/verify time                                       auth.py
+  - Event-loop lag                                                  monitor_event_loop_lag()
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[key] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Callback run before each scrape to refresh gauges from live state"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# ---- HTTP ----
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "hiremind_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status"),
+))
+DB_QUERIES_PER_REQUEST = registry.register(Histogram(
+    "hiremind_db_queries_per_request", "SQL statements executed per HTTP request",
+    ("route",), buckets=COUNT_BUCKETS,
+))
+DB_SECONDS_PER_REQUEST = registry.register(Histogram(
+    "hiremind_db_time_per_request_seconds", "Total SQL execution time per HTTP request",
+    ("route",),
+))
+
+# ---- LLM ----
+LLM_REQUEST_SECONDS = registry.register(Histogram(
+    "hiremind_llm_request_duration_seconds", "Upstream LLM call latency by call site",
+    ("call_site", "model"), buckets=LLM_BUCKETS,
+))
+LLM_TOKENS = registry.register(Counter(
+    "hiremind_llm_tokens_total", "LLM tokens consumed by call site", ("call_site", "kind"),
+))
+LLM_ERRORS = registry.register(Counter(
+    "hiremind_llm_errors_total", "Failed upstream LLM calls by call site", ("call_site",),
+))
+LLM_CACHE_LOOKUPS = registry.register(Counter(
+    "hiremind_llm_cache_lookups_total", "LLM cache lookups by call site and result", ("call_site", "result"),
+))
+LLM_QUEUE_WAIT_SECONDS = registry.register(Histogram(
+    "hiremind_llm_queue_wait_seconds", "Time LLM calls waited for an admission slot", ("priority",),
+))
+LLM_SHED = registry.register(Counter(
+    "hiremind_llm_shed_total", "LLM calls rejected by admission control", ("priority",),
+))
+LLM_SCHEDULER_RUNNING = registry.register(Gauge(
+    "hiremind_llm_scheduler_running", "LLM calls currently holding an admission slot", ("priority",),
+))
+LLM_SCHEDULER_QUEUED = registry.register(Gauge(
+    "hiremind_llm_scheduler_queued", "LLM calls waiting for an admission slot", ("priority",),
+))
+
+# ---- Other dependencies ----
+EMAIL_SEND_SECONDS = registry.register(Histogram(
+    "hiremind_email_send_duration_seconds", "Brevo transactional email send latency", ("result",),
+))
+PDF_PARSE_SECONDS = registry.register(Histogram(
+    "hiremind_pdf_parse_duration_seconds", "pypdf text extraction time", ("result",),
+))
+PASSWORD_HASH_SECONDS = registry.register(Histogram(
+    "hiremind_password_hash_duration_seconds", "bcrypt hash/verify time", ("operation",),
+))
+EVENT_LOOP_LAG_SECONDS = registry.register(Histogram(
+    "hiremind_event_loop_lag_seconds", "Delay of a periodic event-loop timer beyond its schedule",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+))
+EVENT_LOOP_LAG_MAX = registry.register(Gauge(
+    "hiremind_event_loop_lag_max_seconds", "Largest event-loop lag seen since the last scrape",
+))
+
+# ---- Upload storage (updated by the orphan sweeper after each full pass) ----
+UPLOAD_STORAGE_BYTES = registry.register(Gauge(
+    "hiremind_upload_storage_bytes", "Stored upload bytes by state (referenced, grace, orphaned)", ("state",),
+))
+UPLOAD_STORAGE_FILES = registry.register(Gauge(
+    "hiremind_upload_storage_files", "Stored upload files by state (referenced, grace, orphaned)", ("state",),
+))
+UPLOAD_SWEEP_DELETED = registry.register(Counter(
+    "hiremind_upload_sweep_deleted_total", "Orphaned upload files deleted by the sweeper",
+))
+
+
+# ---------------------------------------------------------
+# Per-request DB accounting (SQLAlchemy cursor events)
+# ---------------------------------------------------------
+class RequestDBStats:
+    __slots__ = ("queries", "seconds", "closed")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.closed = False  # response sent: later statements (background tasks) aren't the request's
+
+    def close(self):
+        self.closed = True
+
+
+_request_db_stats: contextvars.ContextVar[Optional[RequestDBStats]] = contextvars.ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def start_request_db_stats() -> Tuple[RequestDBStats, contextvars.Token]:
+    stats = RequestDBStats()
+    return stats, _request_db_stats.set(stats)
+
+
+def stop_request_db_stats(token: contextvars.Token):
+    _request_db_stats.reset(token)
+
+
+def instrument_engine(async_engine):
+    """Count and time every statement; attributed to the current request, if any"""
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("_metrics_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = _request_db_stats.get()
+        if stats is not None and not stats.closed:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("_metrics_start"):
+            conn.info["_metrics_start"].pop()
+
+
+def observe_request(method: str, route: str, status_code: int, seconds: float, db: Optional[RequestDBStats]):
+    HTTP_REQUEST_SECONDS.observe(seconds, method=method, route=route, status=status_code)
+    if db is not None:
+        DB_QUERIES_PER_REQUEST.observe(db.queries, route=route)
+        DB_SECONDS_PER_REQUEST.observe(db.seconds, route=route)
+
+
+# ---------------------------------------------------------
+# Event-loop lag
+# ---------------------------------------------------------
+_lag_max = 0.0
+
+
+async def monitor_event_loop_lag(interval: float = EVENT_LOOP_LAG_INTERVAL):
+    """Sleep `interval` repeatedly; any oversleep is time the loop was blocked"""
+    global _lag_max
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - scheduled)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        _lag_max = max(_lag_max, lag)
+
+
+def render_metrics() -> str:
+    global _lag_max
+    EVENT_LOOP_LAG_MAX.set(_lag_max)
+    _lag_max = 0.0
+    return registry.render()
@@ -0,0 +1,96 @@
+"""
+Request Middleware
+One pure-ASGI middleware for every HTTP request, replacing the two
+@app.middleware("http") functions (security headers + request logging).
+
+- Security headers are encoded once at import and appended to the
+  http.response.start message; nothing is rebuilt per request
+- No BaseHTTPMiddleware task/stream wrapping: body messages are forwarded
+  untouched, so streaming and file responses are never buffered
+- Records timing, per-request DB stats and the optional SQL profile up to
+  the final response body message. Starlette runs BackgroundTasks inside the
+  same app call after that, so they don't count towards the request; the
+  metrics observation and the single access-log record are emitted once the
+  app call returns
+"""
+import time
+
+import sql_profiler
+from app_logging import log_request, log_sql_profile
+from metrics import observe_request, start_request_db_stats, stop_request_db_stats
+
+# ✅ SECURITY FIX: Add security headers to mitigate XSS risk (Bug #6)
+SECURITY_HEADERS = [
+    # Prevent clickjacking
+    (b"x-frame-options", b"DENY"),
+    # Prevent MIME type sniffing
+    (b"x-content-type-options", b"nosniff"),
+    # Enable XSS protection
+    (b"x-xss-protection", b"1; mode=block"),
+    # Content Security Policy - helps prevent XSS
+    (
+        b"content-security-policy",
+        b"default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline';",
+    ),
+    # HSTS for HTTPS (important in production)
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+]
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in SECURITY_HEADERS)
+
+
+class RequestMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        elapsed = None
+        db_stats, db_token = start_request_db_stats()
+        profile, profile_token = (
+            sql_profiler.start_request() if sql_profiler.SQL_PROFILER_ENABLED else (None, None)
+        )
+
+        def response_sent():
+            nonlocal elapsed
+            elapsed = time.perf_counter() - start
+            db_stats.close()
+            if profile is not None:
+                profile.close()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [
+                    (name, value) for name, value in message.get("headers", ())
+                    if name.lower() not in _SECURITY_HEADER_NAMES
+                ]
+                headers.extend(SECURITY_HEADERS)
+                if profile is not None and sql_profiler.SQL_PROFILER_HEADER:
+                    headers.append((b"x-sql-profile", profile.header_value().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and elapsed is None:
+                response_sent()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if elapsed is None:
+                response_sent()  # the app raised before finishing a response
+            stop_request_db_stats(db_token)
+            method = scope["method"]
+            path = scope["path"]
+            if profile is not None:
+                sql_profiler.stop_request(profile_token)
+                log_sql_profile(method, path, profile)
+            route = scope.get("route")
+            # Unmatched paths share one label so scanners can't blow up metric cardinality
+            route_template = route.path if route else "unmatched"
+            observe_request(method, route_template, status_code, elapsed, db_stats)
+            log_request(method, path, route_template, status_code, elapsed * 1000)
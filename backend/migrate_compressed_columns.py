@@ -0,0 +1,135 @@
+"""
+Compress existing values of the compressed columns (compressed_columns.py):
+StoredBlob.text, Application.chat_history and ATSAnalysis.analysis_data.
+
+init_db already converted the Postgres columns to bytea, so existing rows hold
+plain UTF-8 (legacy values, readable as is). This script
+
+  train    trains one zstd dictionary per column from up to --samples recent
+           values and stores it in CompressionDictionary (needs zstandard).
+           API workers load it on their next dictionary refresh and write
+           with it once it is two refresh intervals old
+  rewrite  recompresses, in batches of --batch-size rows (one transaction
+           each), every value not already stored with the current codec and
+           the newest dictionary for its column. Right after train it first
+           waits until the new dictionaries are active, so no worker reads
+           a value compressed with a dictionary it hasn't loaded
+  stats    counts values and stored bytes per codec
+
+    cd backend
+    python migrate_compressed_columns.py train --samples 5000
+    python migrate_compressed_columns.py rewrite
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+
+from sqlalchemy import type_coerce, update
+from sqlalchemy.future import select
+from sqlalchemy.types import NullType
+
+from database import async_session_maker, init_db
+from models import Application, ATSAnalysis, CompressionDictionary, StoredBlob
+from compressed_columns import dictionaries, stored_codec, write_codec_name, zstandard
+
+# (dictionary name, primary key, column)
+COLUMNS = [
+    ("resume", StoredBlob.sha256, StoredBlob.text),
+    ("chat_history", Application.id, Application.chat_history),
+    ("ats_analysis", ATSAnalysis.id, ATSAnalysis.analysis_data),
+]
+
+
+async def train(samples: int, dict_size: int):
+    if zstandard is None:
+        print("❌ Training dictionaries needs zstandard (pip install zstandard)")
+        return
+    for name, key, column in COLUMNS:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(column).where(column.is_not(None)).order_by(key.desc()).limit(samples)
+            )
+            values = [column.type.serialize(value) for value in result.scalars().all() if value]
+            if len(values) < 10:
+                print(f"⚠️ {name}: only {len(values)} values, not training a dictionary")
+                continue
+            data = zstandard.train_dictionary(dict_size, values).as_bytes()
+            dictionary = CompressionDictionary(name=name, data=data, sample_count=len(values))
+            session.add(dictionary)
+            await session.commit()
+            dictionaries.register(dictionary.id, name, data, dictionary.created_at)
+            print(f"✅ {name}: dictionary {dictionary.id} ({len(data)} bytes) trained on {len(values)} values")
+
+
+def _current(name: str, stored) -> bool:
+    codec, dictionary_id = stored_codec(stored)
+    wanted = write_codec_name()
+    if codec == "raw":
+        return True  # below the size threshold (or compression off)
+    if codec != wanted:
+        return False
+    return codec != "zstd" or dictionary_id == dictionaries.active(name)
+
+
+async def rewrite(batch_size: int):
+    wait = dictionaries.pending()
+    if wait:
+        print(f"⏳ Waiting {wait:.0f}s for the API workers to load the new dictionaries")
+        await asyncio.sleep(wait)
+        dictionaries.activate()
+    for name, key, column in COLUMNS:
+        process = column.type.result_processor(None, None)
+        rewritten, last_key = 0, None
+        while True:
+            async with async_session_maker() as session:
+                stmt = select(key, type_coerce(column, NullType())).where(column.is_not(None)).order_by(key).limit(batch_size)
+                if last_key is not None:
+                    stmt = stmt.where(key > last_key)
+                rows = (await session.execute(stmt)).all()
+                if not rows:
+                    break
+                last_key = rows[-1][0]
+                stale = [(row_key, process(stored)) for row_key, stored in rows if not _current(name, stored)]
+                for row_key, value in stale:
+                    await session.execute(
+                        update(column.class_).where(key == row_key).values({column.key: value}),
+                        execution_options={"synchronize_session": False},
+                    )
+                await session.commit()
+            rewritten += len(stale)
+        print(f"✅ {name}: {rewritten} values recompressed")
+
+
+async def stats():
+    for name, key, column in COLUMNS:
+        counts = defaultdict(lambda: [0, 0])
+        async with async_session_maker() as session:
+            result = await session.stream(select(type_coerce(column, NullType())).where(column.is_not(None)))
+            async for (stored,) in result:
+                codec, dictionary_id = stored_codec(stored)
+                label = f"{codec}+dict{dictionary_id}" if dictionary_id else codec
+                counts[label][0] += 1
+                counts[label][1] += len(stored.encode("utf-8") if isinstance(stored, str) else stored)
+        summary = ", ".join(f"{label}: {n} values / {size} bytes" for label, (n, size) in sorted(counts.items()))
+        print(f"{name}: {summary or 'empty'}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["train", "rewrite", "stats"])
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--dict-size", type=int, default=64 * 1024)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    await init_db()
+    if args.command == "train":
+        await train(args.samples, args.dict_size)
+    elif args.command == "rewrite":
+        await rewrite(args.batch_size)
+    else:
+        await stats()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+Move existing resume uploads to content-addressed storage.
+
+Every distinct User.resume_path / Application.resume_path that still points at a
+legacy "uploads/resume_..." file is stored once by content hash, the columns are
+rewritten to the shared blob path and all reference counts are recomputed.
+The old files are left in place; the orphan sweeper removes them once nothing
+references them.
+
+    cd backend
+    python migrate_resume_blobs.py
+"""
+import asyncio
+
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from database import async_session_maker, init_db
+from models import Application, User
+from storage import storage, to_key, BlobNotFound
+from blobs import store_resume, content_addressed_key, recount_refs, blob_path
+
+
+async def migrate():
+    await init_db()
+
+    async with async_session_maker() as session:
+        legacy_paths = set()
+        for column in (User.resume_path, Application.resume_path):
+            result = await session.execute(select(column).where(column.is_not(None)).distinct())
+            legacy_paths.update(p for p in result.scalars().all() if p and not content_addressed_key(p))
+
+        moved, missing = 0, 0
+        for path in sorted(legacy_paths):
+            try:
+                content = await storage.get(to_key(path))
+            except BlobNotFound:
+                print(f"⚠️ Missing file, leaving reference as is: {path}")
+                missing += 1
+                continue
+            new_path = blob_path(await store_resume(content))
+            await session.execute(update(User).where(User.resume_path == path).values(resume_path=new_path))
+            await session.execute(update(Application).where(Application.resume_path == path).values(resume_path=new_path))
+            moved += 1
+
+        await recount_refs(session)
+        await session.commit()
+
+    print(f"✅ Resume migration complete: {moved} files moved, {missing} missing")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -2,7 +2,8 @@ from sqlmodel import SQLModel, Field
 from enum import Enum
 from typing import Optional, List
 from datetime import datetime
-from sqlalchemy import Column, JSON, Text
+from sqlalchemy import Column, JSON, LargeBinary, Text, UniqueConstraint
+from compressed_columns import CompressedJSON, CompressedText
 
 class UserRole(str, Enum):
     STUDENT = "student"
@@ -20,11 +21,12 @@ class User(SQLModel, table=True):
     
     # Profile fields
     university_or_company: Optional[str] = None  # Unified field for university or previous company
-    profile_picture: Optional[str] = None
-    resume_path: Optional[str] = None
+    profile_picture: Optional[str] = Field(default=None, index=True)
+    profile_picture_variants: Optional[dict] = Field(default=None, sa_column=Column(JSON))  # {"64": {"webp": path, "jpeg": path}, ...}
+    resume_path: Optional[str] = Field(default=None, index=True)
     bio: Optional[str] = None
     phone_number: Optional[str] = None
-    company_policy_path: Optional[str] = None  # Path to uploaded company policy PDF
+    company_policy_path: Optional[str] = Field(default=None, index=True)  # Path to uploaded company policy PDF
     
     # Email Verification fields (OTP-based)
     email_otp: Optional[str] = None  # Stores the current email OTP code
@@ -45,16 +47,19 @@ class Job(SQLModel, table=True):
     salary_range: str
     job_type: str = "Full-time"
     work_location: str = Field(default="In-Office")  # Remote, Hybrid, In-Office
-    policy_path: Optional[str] = None
+    policy_path: Optional[str] = Field(default=None, index=True)
     experience_required: int = Field(default=0)  # Minimum years of experience (0 = freshers welcome)
-    hr_id: int = Field(foreign_key="user.id")
+    hr_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped by every ORM update; the job indexes of other workers reload jobs changed since their last sync
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow, index=True,
+                                           sa_column_kwargs={"onupdate": datetime.utcnow})
 
 class Application(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    job_id: int = Field(foreign_key="job.id")
-    student_id: int = Field(foreign_key="user.id")
-    resume_path: Optional[str] = None
+    job_id: int = Field(foreign_key="job.id", ondelete="CASCADE")
+    student_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
+    resume_path: Optional[str] = Field(default=None, index=True)
     status: str = Field(default="Applied") # Applied, Interviewing, Rejected, Offer
     ats_score: int = 0
     ats_feedback: Optional[str] = None
@@ -70,26 +75,117 @@ class Application(SQLModel, table=True):
     candidate_info: Optional[dict] = Field(default={}, sa_column=Column(JSON)) # Stores name, college, cgpa, skills
     generated_questions: Optional[list] = Field(default=[], sa_column=Column(JSON))
     current_question_index: int = Field(default=0)
-    chat_history: Optional[list] = Field(default=[], sa_column=Column(JSON))
+    chat_history: Optional[list] = Field(default=[], sa_column=Column(CompressedJSON(dictionary="chat_history")))
     
     # Malpractice Tracking
     tab_switch_count: int = Field(default=0)
     is_disqualified_malpractice: bool = Field(default=False)
 
+    # Cold storage: set once resume_text / chat_history / generated_questions / the full
+    # ats_report have been moved to ApplicationArchive (see application_archive.py)
+    archived_at: Optional[datetime] = Field(default=None)
+
+class InterviewSummary(SQLModel, table=True):
+    application_id: int = Field(primary_key=True, foreign_key="application.id", ondelete="CASCADE")
+    transcript_version: str  # sha256 of the transcript the summary was generated from
+    summary: dict = Field(default={}, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class AnswerEvaluation(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("application_id", "question_index"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    application_id: int = Field(foreign_key="application.id", ondelete="CASCADE", index=True)
+    question_index: int  # 0-2 (technical_1..technical_3)
+    question: str = Field(sa_column=Column(Text, nullable=False))
+    answer: str = Field(sa_column=Column(Text, nullable=False))
+    relevance: int = 0  # 0-10
+    depth: int = 0  # 0-10
+    specificity: int = 0  # 0-10
+    notes: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
 class ATSAnalysis(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
     job_title: str
     score: int
-    analysis_data: dict = Field(default={}, sa_column=Column(JSON))
+    analysis_data: dict = Field(default={}, sa_column=Column(CompressedJSON(dictionary="ats_analysis")))
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class InterviewSlot(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    hr_id: int = Field(foreign_key="user.id")
-    candidate_id: Optional[int] = Field(default=None, foreign_key="user.id", nullable=True)
+    hr_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
+    candidate_id: Optional[int] = Field(default=None, foreign_key="user.id", nullable=True, ondelete="SET NULL")
     start_time: datetime
     end_time: datetime
     meet_link: str
     status: str = Field(default="AVAILABLE") # AVAILABLE, BOOKED
     is_collapsed: bool = Field(default=False)
+
+class LLMCacheEntry(SQLModel, table=True):
+    key: str = Field(primary_key=True)  # sha256 of (model, temperature, normalized messages)
+    model: str
+    call_site: str = Field(default="general")
+    response: str = Field(sa_column=Column(Text, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
+
+class RateLimitBucket(SQLModel, table=True):
+    key: str = Field(primary_key=True)  # "<policy>:<user or ip>"
+    tokens: float
+    updated_at: float  # unix timestamp of the last refill
+
+class StoredBlob(SQLModel, table=True):
+    sha256: str = Field(primary_key=True)  # hex digest of the file content
+    key: str = Field(unique=True)  # storage key, e.g. "resumes/ab/<sha256>.pdf"
+    size: int
+    content_type: Optional[str] = None
+    text: Optional[str] = Field(default=None, sa_column=Column(CompressedText(dictionary="resume")))  # extracted once at upload
+    ref_count: int = Field(default=0)  # User.resume_path + Application.resume_path references
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)  # last reference change
+
+class ResumePreview(SQLModel, table=True):
+    sha256: str = Field(primary_key=True)  # StoredBlob.sha256 of the rendered PDF
+    image_key: Optional[str] = None  # storage key of the first-page image (None without PyMuPDF)
+    width: int = 0
+    height: int = 0
+    page_count: int = 0
+    excerpt: str = Field(default="", sa_column=Column(Text, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class JobDeletion(SQLModel, table=True):
+    job_id: int = Field(primary_key=True)  # no FK: the row outlives the job it reports on
+    hr_id: int = Field(index=True)
+    status: str = Field(default="running")  # running, failed, done
+    total: int = 0  # applications when the deletion started
+    deleted: int = 0
+    error: Optional[str] = None
+    owner: Optional[str] = None  # worker purging it; updated_at is its heartbeat
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class BackgroundLease(SQLModel, table=True):
+    name: str = Field(primary_key=True)  # background task, e.g. "upload_sweeper"
+    owner: str  # worker holding it ("<host>:<pid>:<random>")
+    expires_at: float  # unix timestamp; free for the taking after this
+
+class StorageUsage(SQLModel, table=True):
+    user_id: int = Field(primary_key=True)  # no FK: rewritten wholesale by every sweeper pass
+    bytes: int = 0
+    files: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)  # end of the pass that counted it
+
+class ApplicationArchive(SQLModel, table=True):
+    application_id: int = Field(primary_key=True, foreign_key="application.id", ondelete="CASCADE")
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))  # zlib-compressed JSON of the archived columns
+    raw_size: int = 0  # uncompressed JSON bytes
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+
+class CompressionDictionary(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)  # stored in every value compressed with it
+    name: str = Field(index=True)  # column family, e.g. "resume", "chat_history"
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    sample_count: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
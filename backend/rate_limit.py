@@ -0,0 +1,246 @@
+"""
+Rate Limiting
+Token-bucket limiter with pluggable storage so limits hold across uvicorn workers.
+
+  RATE_LIMIT_BACKEND=database (default)  buckets live in the `ratelimitbucket` table
+                                         (shared by every worker, SQLite or Postgres)
+  RATE_LIMIT_BACKEND=memory              per-process buckets (single worker / tests)
+
+Routes opt in with `Depends(rate_limit("<policy>", cost=N))`. LLM-heavy routes draw
+different costs from the same per-user "llm" quota. Every limited response carries
+X-RateLimit-Limit / X-RateLimit-Remaining, and 429s carry Retry-After.
+
+A bucket left alone for its refill window (capacity / refill rate) is full again, the
+same as no bucket at all, so prune_forever drops those every RATE_LIMIT_PRUNE_INTERVAL
+seconds (in one worker, under a lease, for the database store).
+
+  RATE_LIMIT_PRUNE_INTERVAL=600
+"""
+import asyncio
+import math
+import os
+import time
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from jose import JWTError, jwt
+from sqlalchemy import case, delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.future import select
+
+from auth import SECRET_KEY, ALGORITHM
+from database import async_session_maker
+from leases import LEASE_TTL, acquire
+from models import RateLimitBucket
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "database").lower()
+RATE_LIMIT_PRUNE_INTERVAL = float(os.getenv("RATE_LIMIT_PRUNE_INTERVAL", "600"))
+LEASE_NAME = "rate_limit_prune"
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class BucketPolicy:
+    def __init__(self, name: str, capacity: float, refill_per_second: float, per: str = "user"):
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.per = per  # "user" (falls back to IP when anonymous) or "ip"
+
+    @classmethod
+    def parse(cls, name: str, spec: str, per: str = "user", burst: float = None) -> "BucketPolicy":
+        """'5/minute' -> capacity 5, refilled continuously over a minute"""
+        amount, period = spec.split("/")
+        amount = float(amount)
+        return cls(name, burst or amount, amount / _PERIODS[period.strip()], per)
+
+    @property
+    def refill_window(self) -> float:
+        """Seconds for an empty bucket to fill up again"""
+        return self.capacity / self.refill_per_second
+
+
+POLICIES: Dict[str, BucketPolicy] = {
+    # Brute-force protection for login (was slowapi's 5/minute per IP)
+    "auth_login": BucketPolicy.parse("auth_login", os.getenv("RATE_LIMIT_LOGIN", "5/minute"), per="ip"),
+    # Shared per-user LLM quota; each route spends its cost from it
+    "llm": BucketPolicy.parse(
+        "llm",
+        os.getenv("LLM_QUOTA", "120/hour"),
+        burst=float(os.getenv("LLM_QUOTA_BURST", "30")),
+    ),
+}
+
+# Relative cost of LLM-backed routes against the "llm" quota
+LLM_COSTS = {
+    "ats_analyze": 5,
+    "interview_start": 6,  # ATS analysis + question generation
+    "interview_chat": 1,
+    "interview_summarize": 2,
+}
+
+
+class MemoryBucketStore:
+    """Per-process buckets (not shared between workers)"""
+
+    shared = False
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = asyncio.Lock()
+
+    async def take(self, key: str, policy: BucketPolicy, cost: float) -> Tuple[bool, float]:
+        async with self._lock:
+            now = time.time()
+            tokens, updated_at = self._buckets.get(key, (policy.capacity, now))
+            tokens = min(policy.capacity, tokens + (now - updated_at) * policy.refill_per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            return allowed, tokens
+
+    async def prune(self) -> int:
+        async with self._lock:
+            now = time.time()
+            idle = []
+            for key, (_, updated_at) in self._buckets.items():
+                policy = POLICIES.get(key.split(":", 1)[0])
+                if policy is not None and updated_at < now - policy.refill_window:
+                    idle.append(key)
+            for key in idle:
+                del self._buckets[key]
+            return len(idle)
+
+
+class DatabaseBucketStore:
+    """
+    Buckets in the application database. The refill-and-spend is a single
+    conditional UPDATE, so concurrent workers can never overspend a bucket.
+    """
+
+    shared = True
+
+    async def take(self, key: str, policy: BucketPolicy, cost: float) -> Tuple[bool, float]:
+        now = time.time()
+        refilled = RateLimitBucket.tokens + (now - RateLimitBucket.updated_at) * policy.refill_per_second
+        refilled = case((refilled > policy.capacity, policy.capacity), else_=refilled)
+
+        async with async_session_maker() as session:
+            result = await session.execute(
+                update(RateLimitBucket)
+                .where(RateLimitBucket.key == key)
+                .where(refilled >= cost)
+                .values(tokens=refilled - cost, updated_at=now)
+                .returning(RateLimitBucket.tokens)
+            )
+            remaining = result.scalar()
+            if remaining is not None:
+                await session.commit()
+                return True, remaining
+
+            result = await session.execute(
+                select(RateLimitBucket.tokens, RateLimitBucket.updated_at).where(RateLimitBucket.key == key)
+            )
+            row = result.first()
+            if row is None:
+                # First request for this key: create a full bucket minus this request
+                session.add(RateLimitBucket(key=key, tokens=policy.capacity - cost, updated_at=now))
+                try:
+                    await session.commit()
+                    return True, policy.capacity - cost
+                except IntegrityError:
+                    await session.rollback()
+                    return await self.take(key, policy, cost)
+
+            tokens, updated_at = row
+            return False, min(policy.capacity, tokens + (now - updated_at) * policy.refill_per_second)
+
+    async def prune(self) -> int:
+        """Delete the buckets idle for their policy's refill window (full again); returns the count"""
+        now = time.time()
+        deleted = 0
+        async with async_session_maker() as session:
+            for policy in POLICIES.values():
+                result = await session.execute(
+                    delete(RateLimitBucket)
+                    .where(RateLimitBucket.key.startswith(f"{policy.name}:", autoescape=True))
+                    .where(RateLimitBucket.updated_at < now - policy.refill_window)
+                )
+                deleted += result.rowcount
+            await session.commit()
+        return deleted
+
+
+class TokenBucketLimiter:
+    def __init__(self, backend: str = RATE_LIMIT_BACKEND):
+        self.store = MemoryBucketStore() if backend == "memory" else DatabaseBucketStore()
+
+    async def take(self, key: str, policy: BucketPolicy, cost: float = 1) -> Tuple[bool, float, float]:
+        """Returns (allowed, remaining tokens, seconds until `cost` tokens are available)"""
+        try:
+            allowed, remaining = await self.store.take(key, policy, cost)
+        except Exception as e:
+            # Never take the API down because the limiter store is unavailable
+            print(f"⚠️ Rate limiter store error ({policy.name}): {e}")
+            return True, policy.capacity, 0.0
+        retry_after = 0.0 if allowed else (cost - remaining) / policy.refill_per_second
+        return allowed, remaining, retry_after
+
+    async def prune_forever(self, interval: float = RATE_LIMIT_PRUNE_INTERVAL):
+        """Drop idle full buckets periodically (runs in the background of every worker)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # Database buckets are shared: one worker prunes, holding the lease until its next pass
+                if self.store.shared and not await acquire(LEASE_NAME, interval + LEASE_TTL):
+                    continue
+                pruned = await self.store.prune()
+                if pruned:
+                    print(f"🧹 Pruned {pruned} idle rate limit buckets")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Rate limit bucket prune failed: {e}")
+
+
+limiter = TokenBucketLimiter()
+
+
+def client_identity(request: Request, per: str) -> str:
+    """Bucket owner: the JWT subject for authenticated users, otherwise the client IP"""
+    if per == "user":
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            try:
+                payload = jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM])
+                if payload.get("sub"):
+                    return f"user:{payload['sub']}"
+            except JWTError:
+                pass
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def rate_limit(policy_name: str, cost: float = 1):
+    """FastAPI dependency that spends `cost` tokens from the caller's `policy_name` bucket"""
+    policy = POLICIES[policy_name]
+
+    async def dependency(request: Request, response: Response):
+        key = f"{policy.name}:{client_identity(request, policy.per)}"
+        allowed, remaining, retry_after = await limiter.take(key, policy, cost)
+
+        headers = {
+            "X-RateLimit-Limit": str(int(policy.capacity)),
+            "X-RateLimit-Remaining": str(max(0, math.floor(remaining))),
+            "X-RateLimit-Cost": str(int(cost)),
+        }
+        if not allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded. Please try again in {headers['Retry-After']} seconds.",
+                headers=headers,
+            )
+        response.headers.update(headers)
+
+    return dependency
@@ -0,0 +1,191 @@
+"""
+Resume Preview Renditions
+Lightweight previews for the HR review screen, so opening an application does
+not mean downloading a multi-MB PDF or shipping the full resume text.
+
+- One rendition per content-addressed resume (cached by content hash in
+  ResumePreview): a first-page image ("<blob key>@page1.webp") and a trimmed
+  excerpt of the text extracted at upload
+- Rendering runs in a background task / worker thread after an application is
+  created, or on first view if it is still missing; concurrent requests for the
+  same resume share one render
+- Keyword highlights depend on the job, so they are computed per request from
+  the application's ATS matched_keywords as character offsets into the excerpt
+- PyMuPDF (requirements.txt) renders the page image and Pillow encodes it as
+  WebP. The imports stay guarded so a stripped-down install still starts:
+  without PyMuPDF previews are text-only, without Pillow the image is PNG
+- Images are immutable (content-addressed) and served with long cache headers
+"""
+import asyncio
+import io
+import os
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy.future import select
+
+from database import async_session_maker
+from models import ResumePreview, StoredBlob
+from storage import storage, to_path, BlobNotFound
+from blobs import content_addressed_key
+from images import variant_key
+
+try:
+    import pymupdf
+except ImportError:  # pragma: no cover - depends on the deployment
+    try:
+        import fitz as pymupdf
+    except ImportError:
+        pymupdf = None
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the deployment
+    Image = None
+
+PREVIEW_WIDTH = int(os.getenv("RESUME_PREVIEW_WIDTH", "800"))
+PREVIEW_EXCERPT_CHARS = int(os.getenv("RESUME_PREVIEW_EXCERPT_CHARS", "1500"))
+PREVIEW_WEBP_QUALITY = int(os.getenv("RESUME_PREVIEW_WEBP_QUALITY", "70"))
+
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def trim_excerpt(text: str, limit: int = PREVIEW_EXCERPT_CHARS) -> str:
+    """Whitespace-normalized prefix of the resume text, cut at a word boundary"""
+    lines = [" ".join(line.split()) for line in (text or "").splitlines()]
+    compact = "\n".join(line for line in lines if line)
+    if len(compact) <= limit:
+        return compact
+    cut = compact.rfind(" ", 0, limit)
+    return compact[:cut if cut > limit // 2 else limit].rstrip() + " …"
+
+
+def highlight_spans(excerpt: str, keywords: List[str]) -> List[dict]:
+    """Non-overlapping [start, end) offsets of whole-word keyword matches"""
+    spans = []
+    for keyword in sorted({k.strip() for k in keywords or [] if k and k.strip()}, key=len, reverse=True):
+        pattern = re.compile(r"(?<!\w)" + re.escape(keyword) + r"(?!\w)", re.IGNORECASE)
+        for match in pattern.finditer(excerpt):
+            if not any(s["start"] < match.end() and match.start() < s["end"] for s in spans):
+                spans.append({"start": match.start(), "end": match.end(), "keyword": keyword})
+    return sorted(spans, key=lambda s: s["start"])
+
+
+def _render_first_page(content: bytes):
+    """(image bytes, content type, extension, width, height, page count); blocking"""
+    with pymupdf.open(stream=content, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if page_count == 0:
+            return None, None, None, 0, 0, 0
+        page = doc[0]
+        zoom = PREVIEW_WIDTH / max(page.rect.width, 1)
+        pix = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+        if Image is not None:
+            out = io.BytesIO()
+            Image.frombytes("RGB", (pix.width, pix.height), pix.samples).save(
+                out, "WEBP", quality=PREVIEW_WEBP_QUALITY, method=4
+            )
+            return out.getvalue(), "image/webp", "webp", pix.width, pix.height, page_count
+        return pix.tobytes("png"), "image/png", "png", pix.width, pix.height, page_count
+
+
+async def _render(blob: StoredBlob) -> ResumePreview:
+    preview = ResumePreview(sha256=blob.sha256, excerpt=trim_excerpt(blob.text or ""))
+    if pymupdf is not None:
+        try:
+            content = await storage.get(blob.key)
+            data, content_type, ext, width, height, pages = await asyncio.to_thread(_render_first_page, content)
+            if data:
+                image_key = variant_key(blob.key, f"page1.{ext}")
+                await storage.put(image_key, data, content_type)
+                preview.image_key, preview.width, preview.height = image_key, width, height
+            preview.page_count = pages
+        except BlobNotFound:
+            raise
+        except Exception as e:
+            # Unrenderable PDF: keep the text-only preview
+            print(f"⚠️ Resume preview render failed for {blob.key}: {e}")
+
+    async with async_session_maker() as session:
+        existing = await session.get(ResumePreview, blob.sha256)
+        if existing is not None:
+            return existing
+        session.add(preview)
+        await session.commit()
+    return preview
+
+
+async def ensure_preview(resume_path: Optional[str]) -> Optional[ResumePreview]:
+    """Cached preview for a resume, rendering it if missing (None for legacy/missing files)"""
+    key = content_addressed_key(resume_path)
+    if key is None:
+        return None
+
+    async with async_session_maker() as session:
+        blob = (await session.execute(select(StoredBlob).where(StoredBlob.key == key))).scalars().first()
+        if blob is None:
+            return None
+        preview = await session.get(ResumePreview, blob.sha256)
+        if preview is not None:
+            return preview
+
+    inflight = _inflight.get(blob.sha256)
+    while inflight is not None:
+        await asyncio.wait([inflight])
+        if not inflight.cancelled():
+            return inflight.result()
+        # The leader was cancelled: retry (the next caller through becomes the leader)
+        inflight = _inflight.get(blob.sha256)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[blob.sha256] = future
+    try:
+        preview = await _render(blob)
+        future.set_result(preview)
+        return preview
+    except BlobNotFound:
+        future.set_result(None)
+        return None
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()
+        raise
+    finally:
+        # Cancelled (CancelledError is a BaseException): release the waiters
+        if not future.done():
+            future.cancel()
+        _inflight.pop(blob.sha256, None)
+
+
+async def get_cached_preview(resume_path: Optional[str]) -> Optional[ResumePreview]:
+    """Preview if already rendered; never renders"""
+    key = content_addressed_key(resume_path)
+    if key is None:
+        return None
+    sha256 = key.rsplit("/", 1)[-1].split(".", 1)[0]
+    async with async_session_maker() as session:
+        return await session.get(ResumePreview, sha256)
+
+
+async def render_preview_in_background(resume_path: Optional[str]):
+    """BackgroundTasks entry point: failures are logged, never raised"""
+    try:
+        await ensure_preview(resume_path)
+    except Exception as e:
+        print(f"⚠️ Resume preview generation failed: {e}")
+
+
+def preview_payload(resume_path: Optional[str], preview: Optional[ResumePreview], keywords: List[str]) -> dict:
+    if content_addressed_key(resume_path) is None:
+        return {"status": "unavailable"}
+    if preview is None:
+        return {"status": "pending"}
+    return {
+        "status": "ready",
+        "image": to_path(preview.image_key) if preview.image_key else None,
+        "width": preview.width,
+        "height": preview.height,
+        "page_count": preview.page_count,
+        "excerpt": preview.excerpt,
+        "highlights": highlight_spans(preview.excerpt, keywords),
+    }
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import hashlib
+import json
+from fastapi.responses import JSONResponse
 
 from database import get_session
 from models import Application, User, UserRole, Job
 from auth import get_current_user
-from schemas import ApplicationDetail, StatusUpdate  # Make sure this import is correct
+from schemas import ApplicationDetail, ApplicantSearchResults, StatusUpdate  # Make sure this import is correct
+from resume_previews import ensure_preview, get_cached_preview, preview_payload, render_preview_in_background
+from applicant_search import SearchUnavailable, search_applicants
+from application_archive import rehydrate
 
 router = APIRouter(
     prefix="/applications",
@@ -50,6 +56,35 @@ async def get_my_applications(
         ))
     return apps
 
+@router.get("/search", response_model=ApplicantSearchResults)
+async def search_my_applicants(
+    q: str,
+    job_id: Optional[int] = None,
+    page: int = 1,
+    page_size: int = 20,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Full-text search over the resume text, profile details (name, college,
+    role, skills) and matched ATS keywords of the applicants to this HR's
+    jobs (optionally one job), best matches first.
+    """
+    if current_user.role != UserRole.HR:
+        raise HTTPException(status_code=403, detail="Only HR can search applicants")
+
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query is required")
+    page = max(page, 1)
+    page_size = max(1, min(page_size, 100))
+
+    try:
+        total, results = await search_applicants(session, current_user.id, q, job_id=job_id, page=page, page_size=page_size)
+    except SearchUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return ApplicantSearchResults(query=q, total=total, page=page, page_size=page_size, results=results)
+
 @router.put("/{app_id}/status")
 async def update_application_status(
     app_id: int,
@@ -141,6 +176,8 @@ async def update_application_status(
 @router.get("/{app_id}", response_model=ApplicationDetail)
 async def get_application_detail(
     app_id: int,
+    background_tasks: BackgroundTasks,
+    include_resume_text: bool = False,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
@@ -172,7 +209,16 @@ async def get_application_detail(
         session.add(application)
         await session.commit()
         await session.refresh(application)
+
+    # Finished applications may have their heavy columns in cold storage
+    await rehydrate(session, application)
     
+    resume_path = application.resume_path or student.resume_path
+    preview = await get_cached_preview(resume_path)
+    if preview is None:
+        background_tasks.add_task(render_preview_in_background, resume_path)
+    keywords = (application.ats_report or {}).get("matched_keywords", [])
+
     return {
         "id": application.id,
         "job_id": application.job_id,
@@ -184,10 +230,50 @@ async def get_application_detail(
         "created_at": application.created_at,
         "candidate_name": student.full_name,
         "candidate_email": student.email,
-        "resume_path": application.resume_path or student.resume_path,
-        "resume_text": application.resume_text,
+        "resume_path": resume_path,
+        # Full text only on request; the review screen uses the trimmed preview excerpt
+        "resume_text": application.resume_text if include_resume_text else None,
+        "resume_preview": preview_payload(resume_path, preview, keywords),
         "candidate_info": application.candidate_info,
         "chat_history": application.chat_history,
         "ats_report": application.ats_report,
         "interview_step": application.interview_step
     }
+
+@router.get("/{app_id}/preview")
+async def get_application_resume_preview(
+    app_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    First-page image + highlighted excerpt of the application's resume,
+    rendered on demand if the background step hasn't produced it yet.
+    """
+    if current_user.role != UserRole.HR:
+        raise HTTPException(status_code=403, detail="Only HR can view application details")
+
+    stmt = (
+        select(Application.resume_path, Application.ats_report, User.resume_path, Job.hr_id)
+        .join(User, Application.student_id == User.id)
+        .join(Job, Application.job_id == Job.id)
+        .where(Application.id == app_id)
+    )
+    row = (await session.execute(stmt)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Application not found")
+    app_resume_path, ats_report, profile_resume_path, hr_id = row
+    if hr_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access Denied: You do not own this job posting.")
+
+    resume_path = app_resume_path or profile_resume_path
+    preview = await ensure_preview(resume_path)
+    payload = preview_payload(resume_path, preview, (ats_report or {}).get("matched_keywords", []))
+
+    # The preview is immutable per resume; only the highlights depend on the ATS report
+    etag = '"' + hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
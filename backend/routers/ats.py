@@ -1,27 +1,29 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 import os
 import json
+import base64
 from datetime import datetime
+from sqlalchemy import tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from groq import Groq
 from database import get_session
 from models import User, ATSAnalysis
 from auth import get_current_user
 from utils import extract_text_from_pdf
+from llm import chat_completion, json_reply_validator, JSON_SYSTEM_PROMPT
+from llm_scheduler import LLMOverloaded
+from app_logging import debug_sample
+from rate_limit import rate_limit, LLM_COSTS
+from ats_scoring import score_resume_locally, passes_llm_gate, ATS_LLM_GATE_THRESHOLD
 
 router = APIRouter(
     prefix="/ats",
     tags=["ats"]
 )
 
-client = Groq(
-    api_key=os.environ.get("GROQ_API_KEY"),
-)
-
 class ATSAnalysisResponse(BaseModel):
     score: int
     matched_keywords: List[str]
@@ -37,7 +39,14 @@ class ATSHistoryItem(BaseModel):
     score: int
     created_at: datetime
 
-def analyze_resume_with_llm(resume_text: str, job_title: str, job_description: str = "") -> dict:
+class ATSHistoryPage(BaseModel):
+    items: List[ATSHistoryItem]
+    next_cursor: Optional[str] = None  # pass as ?cursor= for the next (older) page; None on the last page
+
+class ATSHistoryDetail(ATSHistoryItem):
+    analysis: dict  # the stored ATSAnalysisResponse
+
+async def analyze_resume_with_llm(resume_text: str, job_title: str, job_description: str = "") -> dict:
     """
     Analyze resume using LLM for ATS scoring.
     Returns a dict with score, feedback, keywords, etc.
@@ -88,17 +97,16 @@ Output ONLY valid JSON (no markdown):
 """
     
     try:
-        print(f"🤖 Calling LLM for ATS analysis...")
-        completion = client.chat.completions.create(
+        content = await chat_completion(
             messages=[
-                {"role": "system", "content": "You are a helpful assistant that outputs raw JSON data without markdown formatting."},
+                {"role": "system", "content": JSON_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            model="llama-3.3-70b-versatile",
             temperature=0.3,  # Lower temperature for analytical tasks
+            call_site="ats",
+            validate=json_reply_validator(),
         )
-        content = completion.choices[0].message.content
-        print(f"✅ LLM Response received (length: {len(content)})")
+        debug_sample("LLM ATS response", call_site="ats", length=len(content), response=content[:500])
         
         # Clean cleanup - remove markdown code blocks if present
         content = content.replace("```json", "").replace("```", "").strip()
@@ -109,7 +117,6 @@ Output ONLY valid JSON (no markdown):
         if start != -1 and end != -1:
             json_str = content[start:end]
             result = json.loads(json_str)
-            print(f"✅ JSON parsed successfully. Score: {result.get('score', 'N/A')}")
             
             # 🛡️ SAFETY CHECK: Double-validate that non-resume documents get score = 0
             # This is a fail-safe in case the LLM ignores our instructions
@@ -146,7 +153,7 @@ Output ONLY valid JSON (no markdown):
             return result
             
         print(f"⚠️ ATS Parse Error - Could not find JSON in response")
-        print(f"Raw LLM Output: {content[:300]}...")
+        debug_sample("Unparseable LLM ATS output", call_site="ats", response=content[:300])
         return {
             "score": 50, 
             "matched_keywords": [],
@@ -157,9 +164,11 @@ Output ONLY valid JSON (no markdown):
             "strengths": []
         }
         
+    except LLMOverloaded:
+        raise
     except json.JSONDecodeError as e:
         print(f"❌ JSON Decode Error: {e}")
-        print(f"Attempted to parse: {content[:500] if 'content' in locals() else 'N/A'}...")
+        debug_sample("Unparseable LLM ATS output", call_site="ats", response=content[:500] if 'content' in locals() else None)
         return {
             "score": 0, 
             "matched_keywords": [],
@@ -182,7 +191,36 @@ Output ONLY valid JSON (no markdown):
         }
 
 
-@router.post("/analyze", response_model=ATSAnalysisResponse)
+async def analyze_resume_gated(resume_text: str, job_title: str, job_description: str = "") -> dict:
+    """
+    Run the local pre-scorer first and only pay for the LLM analysis when the
+    resume clears ATS_LLM_GATE_THRESHOLD. Obvious mismatches return instantly.
+    """
+    local_result = score_resume_locally(resume_text, job_title, job_description)
+    if not passes_llm_gate(local_result):
+        debug_sample("ATS gate skipped LLM", score=local_result["score"], threshold=ATS_LLM_GATE_THRESHOLD)
+        return local_result
+    return await analyze_resume_with_llm(resume_text, job_title, job_description)
+
+
+@router.post("/prescore", response_model=ATSAnalysisResponse)
+async def prescore_resume(
+    resume: UploadFile = File(...),
+    job_title: str = Form(...),
+    job_description: str = Form(""),
+    current_user: User = Depends(get_current_user)
+):
+    """Instant local keyword score (no LLM call, not saved to history)"""
+    content = await resume.read()
+    resume_text = extract_text_from_pdf(content)
+
+    if not resume_text or len(resume_text) < 50:
+        raise HTTPException(status_code=400, detail="Could not extract text from PDF. Please upload a readable text PDF.")
+
+    return score_resume_locally(resume_text, job_title, job_description)
+
+
+@router.post("/analyze", response_model=ATSAnalysisResponse, dependencies=[Depends(rate_limit("llm", LLM_COSTS["ats_analyze"]))])
 async def analyze_resume(
     resume: UploadFile = File(...),
     job_title: str = Form(...),
@@ -196,7 +234,7 @@ async def analyze_resume(
     if not resume_text or len(resume_text) < 50:
         raise HTTPException(status_code=400, detail="Could not extract text from PDF. Please upload a readable text PDF.")
         
-    analysis_result = analyze_resume_with_llm(resume_text, job_title, job_description)
+    analysis_result = await analyze_resume_gated(resume_text, job_title, job_description)
     
     # Save History
     db_analysis = ATSAnalysis(
@@ -210,12 +248,64 @@ async def analyze_resume(
     
     return analysis_result
 
-@router.get("/history", response_model=List[ATSHistoryItem])
+def encode_history_cursor(created_at: datetime, analysis_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{analysis_id}".encode()).decode()
+
+def decode_history_cursor(cursor: str):
+    """(created_at, id) from a cursor; anything we did not encode is a 400, never a database error"""
+    try:
+        created_at, analysis_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        created_at, analysis_id = datetime.fromisoformat(created_at), int(analysis_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # created_at is a naive UTC column, and ids fit a BIGINT
+    if created_at.tzinfo is not None or not 0 <= analysis_id < 2 ** 63:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, analysis_id
+
+@router.get("/history", response_model=ATSHistoryPage)
 async def get_ats_history(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Newest first, keyset-paginated on (created_at, id) over ix_atsanalysis_user_created.
+    Only the list columns are selected; the analysis itself is in /history/{id}.
+    """
+    stmt = (
+        select(ATSAnalysis.id, ATSAnalysis.job_title, ATSAnalysis.score, ATSAnalysis.created_at)
+        .where(ATSAnalysis.user_id == current_user.id)
+        .order_by(ATSAnalysis.created_at.desc(), ATSAnalysis.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        stmt = stmt.where(tuple_(ATSAnalysis.created_at, ATSAnalysis.id) < decode_history_cursor(cursor))
+    rows = (await session.execute(stmt)).all()
+
+    items = [ATSHistoryItem(id=row.id, job_title=row.job_title, score=row.score, created_at=row.created_at) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_history_cursor(items[-1].created_at, items[-1].id)
+    return ATSHistoryPage(items=items, next_cursor=next_cursor)
+
+@router.get("/history/{analysis_id}", response_model=ATSHistoryDetail)
+async def get_ats_history_detail(
+    analysis_id: int,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
-    stmt = select(ATSAnalysis).where(ATSAnalysis.user_id == current_user.id).order_by(ATSAnalysis.created_at.desc())
-    result = await session.execute(stmt)
-    history = result.scalars().all()
-    return history
+    result = await session.execute(
+        select(ATSAnalysis).where(ATSAnalysis.id == analysis_id, ATSAnalysis.user_id == current_user.id)
+    )
+    analysis = result.scalars().first()
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return ATSHistoryDetail(
+        id=analysis.id,
+        job_title=analysis.job_title,
+        score=analysis.score,
+        created_at=analysis.created_at,
+        analysis=analysis.analysis_data or {},
+    )
@@ -1,30 +1,40 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, BackgroundTasks
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.exc import IntegrityError
 from typing import Optional, List
 import os
 from pypdf import PdfReader
 import io
 import json
-from groq import Groq
+import hashlib
+import asyncio
 from datetime import datetime
 
-from database import get_session
-from models import Application, Job, User, UserRole
+from database import get_session, async_session_maker
+from models import Application, Job, User, UserRole, InterviewSummary, AnswerEvaluation
 from auth import get_current_user
-from routers.ats import analyze_resume_with_llm
+from routers.ats import analyze_resume_gated
+from applicant_ranking import applicant_ranker
+from llm import chat_completion, json_reply_validator, JSON_SYSTEM_PROMPT
+from llm_scheduler import LLMOverloaded
+from app_logging import debug_sample
+from rate_limit import rate_limit, LLM_COSTS
+from storage import storage, to_key, BlobNotFound
+from blobs import store_resume, read_resume_text, add_ref, blob_path
+from resume_previews import render_preview_in_background
+from job_deletion import active_job_filter
+from application_archive import rehydrate
+
+# Small, fast model for scoring individual answers during the interview
+ANSWER_EVAL_MODEL = os.getenv("ANSWER_EVAL_MODEL", "llama-3.1-8b-instant")
 
 router = APIRouter(
     prefix="/interview",
     tags=["interview"]
 )
 
-# Initialize Groq Client
-client = Groq(
-    api_key=os.environ.get("GROQ_API_KEY"),
-)
-
 class ChatRequest(BaseModel):
     application_id: int
     message: str
@@ -37,7 +47,7 @@ class ChatResponse(BaseModel):
 
 from utils import extract_text_from_pdf
 
-def generate_technical_questions(resume_text: str, job_title: str) -> List[str]:
+async def generate_technical_questions(resume_text: str, job_title: str) -> List[str]:
     prompt = f"""
     You are an expert technical interviewer for the role of {job_title}.
     Analyze the candidate's resume deepy to extract specific projects and technical contributions.
@@ -60,16 +70,16 @@ def generate_technical_questions(resume_text: str, job_title: str) -> List[str]:
     """
     
     try:
-        completion = client.chat.completions.create(
+        content = await chat_completion(
             messages=[
-                {"role": "system", "content": "You are a helpful assistant that outputs raw JSON data without markdown formatting."},
+                {"role": "system", "content": JSON_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            model="llama-3.3-70b-versatile",
             temperature=0.5,
+            call_site="questions",
+            validate=json_reply_validator("["),
         )
-        content = completion.choices[0].message.content
-        print(f"DEBUG: Raw LLM Response: {content}") # Debug log
+        debug_sample("LLM questions response", call_site="questions", response=content[:500])
 
         # 1. Try direct JSON parse
         try:
@@ -100,6 +110,8 @@ def generate_technical_questions(resume_text: str, job_title: str) -> List[str]:
             "What specific challenges did you face with database optimization?", 
             "How do you handle API security in your applications?"
         ]
+    except LLMOverloaded:
+        raise
     except Exception as e:
         print(f"LLM Generation Error: {e}")
         return [
@@ -110,8 +122,9 @@ def generate_technical_questions(resume_text: str, job_title: str) -> List[str]:
 
 import traceback
 
-@router.post("/start", response_model=ChatResponse)
+@router.post("/start", response_model=ChatResponse, dependencies=[Depends(rate_limit("llm", LLM_COSTS["interview_start"]))])
 async def start_interview(
+    background_tasks: BackgroundTasks,
     job_id: int = Form(...),
     experience_years: int = Form(0),  # Candidate's years of experience
     resume: Optional[UploadFile] = File(None),
@@ -135,41 +148,24 @@ async def start_interview(
             if len(content) > MAX_FILE_SIZE:
                 raise HTTPException(status_code=400, detail="Resume too large. Maximum size is 10MB")
             
-            resume_text = extract_text_from_pdf(content)
-            
             # ✅ SECURITY FIX: Validate file type
             allowed_extensions = {'.pdf'}
             filename = resume.filename.lower()
             if not any(filename.endswith(ext) for ext in allowed_extensions):
                 raise HTTPException(status_code=400, detail="Only PDF files are allowed for resumes")
             
-            # ✅ SECURITY FIX: Use basename to prevent path traversal
-            import time
-            safe_filename = os.path.basename(resume.filename)
-            safe_filename = "".join([c for c in safe_filename if c.isalnum() or c in "._-"]).strip()
-            
-            if not safe_filename:
-                safe_filename = "resume.pdf"
-            
-            # Add timestamp to prevent overwrites
-            timestamp = int(time.time())
-            safe_filename = f"resume_{current_user.id}_{job_id}_{timestamp}_{safe_filename}"
-            
-            file_location = f"uploads/{safe_filename}"
-            with open(file_location, "wb") as f:
-                f.write(content)
+            # Stored by content hash: re-uploads of the same CV share one blob and its parsed text
+            blob = await store_resume(content)
+            resume_text = blob.text or ""
+            file_location = blob_path(blob)
                 
         elif use_profile_resume and current_user.resume_path:
             # Case B: Using Profile Resume
-            print(f"DEBUG: Checking profile resume path: {current_user.resume_path}")
-            if not os.path.exists(current_user.resume_path):
-                 print(f"DEBUG: File not found at {current_user.resume_path} (CWD: {os.getcwd()})")
+            try:
+                resume_text = await read_resume_text(current_user.resume_path)
+            except BlobNotFound:
+                 print(f"⚠️ Profile resume not found at {current_user.resume_path}")
                  raise HTTPException(status_code=404, detail=f"Profile resume file not found on server at {current_user.resume_path}")
-                 
-            # Read from existing file
-            with open(current_user.resume_path, "rb") as f:
-                content = f.read()
-            resume_text = extract_text_from_pdf(content)
             file_location = current_user.resume_path
             
         else:
@@ -183,11 +179,7 @@ async def start_interview(
             )
         
         # 📝 Log resume details for debugging
-        print(f"\n{'='*60}")
-        print(f"📄 Resume Upload - Job #{job_id}")
-        print(f"📏 Text Length: {len(resume_text)} characters")
-        print(f"📝 Preview: {resume_text[:200]}...")
-        print(f"{'='*60}\n")
+        debug_sample("Resume upload", job_id=job_id, text_length=len(resume_text), preview=resume_text[:200])
         
         # ✅ Validate it's actually a resume (not a ticket/receipt/invoice)
         from utils import validate_document_is_resume
@@ -200,10 +192,9 @@ async def start_interview(
                 detail=validation_error
             )
         
-        print(f"✅ Document validated as resume")
         
         # 2. Get Job Details (for context)
-        result = await session.execute(select(Job).where(Job.id == job_id))
+        result = await session.execute(select(Job).where(Job.id == job_id, active_job_filter()))
         job = result.scalars().first()
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
@@ -213,7 +204,7 @@ async def start_interview(
             from utils import extract_years_of_experience
             candidate_experience = extract_years_of_experience(resume_text)
             
-            print(f"📊 Experience Check - Required: {job.experience_required} years, Candidate: {candidate_experience} years")
+            debug_sample("Experience check", job_id=job_id, required=job.experience_required, candidate=candidate_experience)
             
             if candidate_experience < job.experience_required:
                 rejection_message = (
@@ -223,21 +214,15 @@ async def start_interview(
                 )
                 print(f"❌ Application rejected: Insufficient experience")
                 raise HTTPException(status_code=400, detail=rejection_message)
-            
-            print(f"✅ Experience requirement met!")
 
         # 3. Analyze Resume (ATS) & Generate Questions
-        print(f"🔍 Starting ATS analysis for: {job.title}")
-        print(f"🏢 Company: {job.company}")
-
         # Pass both job title and description for accurate ATS analysis
-        ats_result = analyze_resume_with_llm(resume_text, job.title, job.description)
+        ats_result = await analyze_resume_gated(resume_text, job.title, job.description)
         
         ats_score = ats_result.get("score", 0)
-        print(f"📊 ATS Score: {ats_score}%")
-        print(f"💡 Feedback: {ats_result.get('feedback', 'N/A')[:150]}...")
+        debug_sample("ATS result", job_id=job_id, score=ats_score, feedback=ats_result.get("feedback", "")[:150])
         
-        questions = generate_technical_questions(resume_text, job.title)
+        questions = await generate_technical_questions(resume_text, job.title)
 
         new_app = Application(
             job_id=job_id,
@@ -256,9 +241,16 @@ async def start_interview(
         )
         
         session.add(new_app)
+        await add_ref(session, file_location)
         await session.commit()
         await session.refresh(new_app)
 
+        # Keep the HR ranking cache warm for this job
+        applicant_ranker.add_application(job, new_app.id, resume_text)
+
+        # Render the HR review preview (first page + excerpt) once per distinct resume
+        background_tasks.add_task(render_preview_in_background, file_location)
+
         return ChatResponse(
             reply="Hello! I've received your resume. To start the interview, may I please have your full name?",
             application_id=new_app.id,
@@ -272,9 +264,10 @@ async def start_interview(
         traceback.print_exc()
         raise HTTPException(status_code=400, detail=f"Processing Error: {str(e)}")
 
-@router.post("/chat", response_model=ChatResponse)
+@router.post("/chat", response_model=ChatResponse, dependencies=[Depends(rate_limit("llm", LLM_COSTS["interview_chat"]))])
 async def chat_interview(
     request: ChatRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
@@ -287,6 +280,7 @@ async def chat_interview(
         
     if app.student_id != current_user.id:
         raise HTTPException(status_code=403, detail="Unauthorized")
+    await rehydrate(session, app, restore=True)
 
     user_msg = request.message.strip()
     
@@ -300,6 +294,8 @@ async def chat_interview(
     
     # State Machine
     reply = ""
+    answered = None  # (question_index, question, answer) of a technical answer in this turn
+    previous_step = app.interview_step
     next_step = app.interview_step
     
     # Check current step and process ANSWER
@@ -359,6 +355,7 @@ async def chat_interview(
     elif app.interview_step == "technical_1":
         # Save Answer 1
         current_history.append({"role": "assistant_q1", "question": app.generated_questions[0], "answer": user_msg})
+        answered = (0, app.generated_questions[0], user_msg)
         
         # Ask Q2
         second_q = app.generated_questions[1] if len(app.generated_questions) > 1 else "What are your strengths?"
@@ -369,6 +366,7 @@ async def chat_interview(
     elif app.interview_step == "technical_2":
         # Save Answer 2
         current_history.append({"role": "assistant_q2", "question": app.generated_questions[1], "answer": user_msg})
+        answered = (1, app.generated_questions[1], user_msg)
 
         # Ask Q3
         third_q = app.generated_questions[2] if len(app.generated_questions) > 2 else "Any questions for us?"
@@ -379,6 +377,7 @@ async def chat_interview(
     elif app.interview_step == "technical_3":
         # Save Answer 3
         current_history.append({"role": "assistant_q3", "question": app.generated_questions[2], "answer": user_msg})
+        answered = (2, app.generated_questions[2], user_msg)
         
         reply = "Thank you for answering the technical questions. Do you have any questions related to the company or our policies? (Type 'no' or 'done' to finish)"
         next_step = "company_qna"
@@ -398,11 +397,10 @@ async def chat_interview(
                  
                  policy_path = job.policy_path if job and job.policy_path else "uploads/SayOne_Technologies_Company_Details_and_Policies.pdf"
                  
-                 if policy_path and os.path.exists(policy_path):
-                     with open(policy_path, "rb") as f:
-                         policy_content = f.read()
+                 try:
+                     policy_content = await storage.get(to_key(policy_path))
                      policy_text = extract_text_from_pdf(policy_content)
-                 else:
+                 except BlobNotFound:
                      policy_text = "Policy document not available."
 
                  # RAG Prompt
@@ -419,18 +417,19 @@ async def chat_interview(
                  Answer concisely and professionally.
                  """
                  
-                 completion = client.chat.completions.create(
+                 answer = await chat_completion(
                     messages=[
                         {"role": "system", "content": "You are a helpful HR assistant."},
                         {"role": "user", "content": prompt}
                     ],
-                    model="llama-3.3-70b-versatile",
                     temperature=0.3,
+                    call_site="policy_qa",
                  )
-                 answer = completion.choices[0].message.content
                  reply = f"{answer}\n\nDo you have any other questions? (Type 'no' to finish)"
                  next_step = "company_qna" # Loop
                  
+             except LLMOverloaded:
+                 raise
              except Exception as e:
                  print(f"RAG Error: {e}")
                  reply = "I'm having trouble accessing the company policies right now. Do you have any other questions?"
@@ -448,6 +447,14 @@ async def chat_interview(
     session.add(app)
     await session.commit()
     await session.refresh(app)
+
+    # Score technical answers while the candidate keeps going
+    if answered:
+        background_tasks.add_task(evaluate_answer_in_background, app.id, *answered)
+
+    # Interview just finished: generate the HR summary now instead of on first click
+    if next_step == "completed" and previous_step != "completed":
+        background_tasks.add_task(summarize_in_background, app.id)
     
     return ChatResponse(
         reply=reply,
@@ -462,34 +469,10 @@ class InterviewSummaryResponse(BaseModel):
     hiring_recommendation: str # "Strong Hire", "Hire", "Leaning No", "Reject"
     summary_text: str
 
-@router.post("/summarize/{application_id}", response_model=InterviewSummaryResponse)
-async def summarize_interview(
-    application_id: int,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
-):
-    if current_user.role != UserRole.HR:
-        raise HTTPException(status_code=403, detail="Only HR can view summaries")
-
-    # Fetch Application
-    result = await session.execute(select(Application).where(Application.id == application_id))
-    app = result.scalars().first()
-    
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
-
-    if not app.chat_history:
-        return InterviewSummaryResponse(
-            strengths=[],
-            weaknesses=[],
-            project_understanding_score=0,
-            hiring_recommendation="N/A",
-            summary_text="No interview transcript available to analyze."
-        )
-
-    # Format Transcript
+def format_transcript(chat_history: list) -> str:
+    """Plain-text transcript of the interview (proctoring alerts are not part of it)"""
     transcript_text = ""
-    for msg in app.chat_history:
+    for msg in chat_history or []:
         role = msg.get("role", "unknown")
         content = msg.get("content") or msg.get("answer") or msg.get("reply") or ""
         question = msg.get("question")
@@ -502,14 +485,154 @@ async def summarize_interview(
                  transcript_text += f"Candidate Answer: {content}\n" # Stored answer
             else:
                  transcript_text += f"Interviewer: {content}\n"
-    
-    # LLM Analysis
+    return transcript_text
+
+def transcript_version(transcript_text: str) -> str:
+    """Version stamp of a transcript; a stored summary is reused while this matches"""
+    return hashlib.sha256(transcript_text.encode("utf-8")).hexdigest()
+
+class AnswerScores(BaseModel):
+    relevance: int = 0
+    depth: int = 0
+    specificity: int = 0
+    notes: str = ""
+
+def parse_json_object(content: str) -> dict:
+    """Extract the first {...} block from an LLM response"""
+    clean_content = content.replace("```json", "").replace("```", "").strip()
+    start = clean_content.find('{')
+    end = clean_content.rfind('}') + 1
+    if start != -1 and end != -1:
+        return json.loads(clean_content[start:end])
+    raise ValueError("Could not parse LLM JSON")
+
+async def evaluate_answer(question: str, answer: str) -> AnswerScores:
+    """Score one technical answer against its question (each dimension 0-10)"""
+    prompt = f"""
+    You are a senior engineer grading one interview answer.
+
+    Question: {question}
+    Candidate Answer: {answer[:2000]}
+
+    Score each dimension from 0 to 10:
+    - relevance: does the answer address the question that was asked?
+    - depth: technical depth and correctness
+    - specificity: concrete details (tools, numbers, decisions) rather than generic statements
+
+    Output strictly valid JSON:
+    {{"relevance": <int>, "depth": <int>, "specificity": <int>, "notes": "one sentence"}}
+    """
+    content = await chat_completion(
+        messages=[
+            {"role": "system", "content": JSON_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        model=ANSWER_EVAL_MODEL,
+        temperature=0.2,
+        call_site="answer_eval",
+        validate=json_reply_validator(),
+    )
+    scores = AnswerScores(**parse_json_object(content))
+    scores.relevance, scores.depth, scores.specificity = (
+        max(0, min(10, v)) for v in (scores.relevance, scores.depth, scores.specificity)
+    )
+    return scores
+
+async def save_answer_evaluation(application_id: int, question_index: int, question: str, answer: str, scores: AnswerScores) -> AnswerEvaluation:
+    """
+    Upsert one answer's scores in its own session: a rollback after losing the
+    insert race must not expire the caller's Application (or drop values
+    rehydrate() loaded into it)
+    """
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(AnswerEvaluation)
+            .where(AnswerEvaluation.application_id == application_id)
+            .where(AnswerEvaluation.question_index == question_index)
+        )
+        evaluation = result.scalars().first() or AnswerEvaluation(
+            application_id=application_id, question_index=question_index, question=question, answer=answer
+        )
+        evaluation.question = question
+        evaluation.answer = answer
+        evaluation.relevance = scores.relevance
+        evaluation.depth = scores.depth
+        evaluation.specificity = scores.specificity
+        evaluation.notes = scores.notes
+        session.add(evaluation)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # A concurrent task stored this question first; keep its row
+            await session.rollback()
+            result = await session.execute(
+                select(AnswerEvaluation)
+                .where(AnswerEvaluation.application_id == application_id)
+                .where(AnswerEvaluation.question_index == question_index)
+            )
+            evaluation = result.scalars().first()
+        return evaluation
+
+async def evaluate_answer_in_background(application_id: int, question_index: int, question: str, answer: str):
+    """Background task: score a technical answer the moment it is submitted"""
+    try:
+        scores = await evaluate_answer(question, answer)
+        await save_answer_evaluation(application_id, question_index, question, answer, scores)
+    except Exception as e:
+        print(f"Answer Evaluation Error (application {application_id}, Q{question_index + 1}): {e}")
+
+def technical_answers(chat_history: list) -> List[tuple]:
+    """(question_index, question, answer) for every technical answer in the history"""
+    answers = []
+    for msg in chat_history or []:
+        role = msg.get("role", "")
+        if role.startswith("assistant_q") and msg.get("question") is not None:
+            answers.append((int(role[len("assistant_q"):]) - 1, msg["question"], msg.get("answer") or ""))
+    return answers
+
+async def load_answer_evaluations(session: AsyncSession, app: Application) -> List[AnswerEvaluation]:
+    """Stored per-question evaluations, scoring any the background tasks haven't finished yet"""
+    result = await session.execute(
+        select(AnswerEvaluation)
+        .where(AnswerEvaluation.application_id == app.id)
+        .order_by(AnswerEvaluation.question_index)
+    )
+    evaluations = {e.question_index: e for e in result.scalars().all()}
+
+    missing = [a for a in technical_answers(app.chat_history) if evaluations.get(a[0]) is None or evaluations[a[0]].answer != a[2]]
+    if missing:
+        all_scores = await asyncio.gather(*(evaluate_answer(question, answer) for _, question, answer in missing))
+        for (question_index, question, answer), scores in zip(missing, all_scores):
+            evaluations[question_index] = await save_answer_evaluation(app.id, question_index, question, answer, scores)
+
+    return [evaluations[i] for i in sorted(evaluations)]
+
+async def generate_interview_summary(session: AsyncSession, app: Application, transcript_text: str) -> dict:
+    """
+    LLM summary of an interview. When per-answer evaluations exist the prompt is
+    assembled from those small pieces instead of the full transcript.
+    Raises if the response can't be parsed.
+    """
+    evaluations = await load_answer_evaluations(session, app)
+
+    if evaluations:
+        info = app.candidate_info or {}
+        profile = "\n".join(f"- {key}: {value}" for key, value in info.items())
+        graded = "\n".join(
+            f"Q{e.question_index + 1}: {e.question}\n"
+            f"   Answer (excerpt): {e.answer[:300]}\n"
+            f"   Scores /10: relevance {e.relevance}, depth {e.depth}, specificity {e.specificity}. {e.notes or ''}"
+            for e in evaluations
+        )
+        interview_material = f"Candidate Profile:\n{profile}\n\nGraded Technical Answers:\n{graded}"
+    else:
+        interview_material = f"Transcript:\n{transcript_text[:12000]}"
+
     prompt = f"""
     You are an expert Technical Recruiter and Engineering Manager.
-    Analyze the following interview transcript for a Software Engineering role.
+    Analyze the following interview for a Software Engineering role.
     
-    Transcript:
-    {transcript_text[:12000]}
+    {interview_material}
     
     Task:
     1. Evaluate the candidate's technical depth based on their answers.
@@ -527,28 +650,94 @@ async def summarize_interview(
     }}
     """
     
+    content = await chat_completion(
+        messages=[
+            {"role": "system", "content": JSON_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        call_site="summary",
+        validate=json_reply_validator(),
+    )
+    summary = InterviewSummaryResponse(**parse_json_object(content))
+
+    # The graded answers give a deterministic project understanding score
+    if evaluations:
+        summary.project_understanding_score = round(
+            sum(e.relevance + e.depth + e.specificity for e in evaluations) / (30 * len(evaluations)) * 100
+        )
+    return summary.dict()
+
+async def get_or_create_summary(session: AsyncSession, app: Application) -> dict:
+    """
+    Return the stored summary if it was built from the current transcript,
+    otherwise generate it once and store it with the new version stamp.
+    """
+    transcript_text = format_transcript(app.chat_history)
+    version = transcript_version(transcript_text)
+
+    result = await session.execute(select(InterviewSummary).where(InterviewSummary.application_id == app.id))
+    stored = result.scalars().first()
+    if stored and stored.transcript_version == version:
+        return stored.summary
+
+    summary = await generate_interview_summary(session, app, transcript_text)
+
+    if stored is None:
+        stored = InterviewSummary(application_id=app.id, transcript_version=version, summary=summary)
+    else:
+        stored.transcript_version = version
+        stored.summary = summary
+        stored.created_at = datetime.utcnow()
+    session.add(stored)
+    await session.commit()
+    return summary
+
+async def summarize_in_background(application_id: int):
+    """Background task: pre-compute the summary as soon as the interview completes"""
     try:
-        completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that outputs raw JSON data without markdown formatting."},
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0.3,
+        async with async_session_maker() as session:
+            result = await session.execute(select(Application).where(Application.id == application_id))
+            app = result.scalars().first()
+            if app:
+                await rehydrate(session, app)
+            if app and app.chat_history:
+                await get_or_create_summary(session, app)
+                print(f"📝 Interview summary stored for application {application_id}")
+    except Exception as e:
+        print(f"Background Summary Error (application {application_id}): {e}")
+
+@router.post("/summarize/{application_id}", response_model=InterviewSummaryResponse, dependencies=[Depends(rate_limit("llm", LLM_COSTS["interview_summarize"]))])
+async def summarize_interview(
+    application_id: int,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    if current_user.role != UserRole.HR:
+        raise HTTPException(status_code=403, detail="Only HR can view summaries")
+
+    # Fetch Application
+    result = await session.execute(select(Application).where(Application.id == application_id))
+    app = result.scalars().first()
+    
+    if not app:
+        raise HTTPException(status_code=404, detail="Application not found")
+    await rehydrate(session, app)
+
+    if not app.chat_history:
+        return InterviewSummaryResponse(
+            strengths=[],
+            weaknesses=[],
+            project_understanding_score=0,
+            hiring_recommendation="N/A",
+            summary_text="No interview transcript available to analyze."
         )
-        content = completion.choices[0].message.content
-        
-        # Cleanup
-        clean_content = content.replace("```json", "").replace("```", "").strip()
-        start = clean_content.find('{')
-        end = clean_content.rfind('}') + 1
-        if start != -1 and end != -1:
-            json_str = clean_content[start:end]
-            data = json.loads(json_str)
-            return InterviewSummaryResponse(**data)
-            
-        raise ValueError("Could not parse LLM JSON")
+
+    try:
+        return InterviewSummaryResponse(**await get_or_create_summary(session, app))
         
+    except LLMOverloaded:
+        raise
     except Exception as e:
         print(f"Summary Generation Error: {e}")
         return InterviewSummaryResponse(
@@ -588,6 +777,7 @@ async def log_violation(
 
         if app.is_disqualified_malpractice:
              return {"message": "Already disqualified", "count": app.tab_switch_count, "terminated": True}
+        await rehydrate(session, app, restore=True)
 
         # Append System Warning to History
         current_history = list(app.chat_history) if app.chat_history else []
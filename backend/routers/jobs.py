@@ -1,15 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends, status, File, UploadFile, Form
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, status, File, UploadFile, Form, Response
+from fastapi.responses import JSONResponse
 import shutil
 import os
-from typing import Optional
+from typing import Literal, Optional
+from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from typing import List
+import numpy as np
 
 from database import get_session
-from models import Job, User, UserRole, Application
-from schemas import JobCreate, JobRead, JobUpdate, TokenData, ApplicationReadWithStudent
+from models import Job, JobDeletion, User, UserRole, Application
+from schemas import JobCreate, JobRead, JobUpdate, TokenData, ApplicationReadWithStudent, ApplicationPage, JobRecommendation, ApplicantRanking, JobSearchResults
 from auth import oauth2_scheme, get_current_user
+from job_index import job_index, get_resume_vector
+from job_search import job_search_index, EXPERIENCE_BUCKETS
+from applicant_ranking import applicant_ranker, combined_scores
+from storage import storage, to_key, to_path
+from job_deletion import (
+    DELETE_ASYNC_THRESHOLD, active_job_filter, count_applications, delete_jobs, deletion_progress,
+    purge_job, restart_job_deletion, start_job_deletion,
+)
 
 router = APIRouter(
     prefix="/jobs",
@@ -37,7 +48,7 @@ async def create_job(
     
     # 1. Check if using profile policy
     if use_profile_policy:
-        if current_user.company_policy_path and os.path.exists(current_user.company_policy_path):
+        if current_user.company_policy_path and await storage.exists(to_key(current_user.company_policy_path)):
              policy_path = current_user.company_policy_path
         else:
              # Fallback or strict error? Let's just ignore if not found for robust UX, or could raise 400.
@@ -70,10 +81,8 @@ async def create_job(
         timestamp = int(time.time())
         safe_filename = f"policy_{current_user.id}_{timestamp}_{safe_filename}"
         
-        file_location = f"uploads/{safe_filename}"
-        with open(file_location, "wb") as file_object:
-            file_object.write(content)
-        policy_path = file_location
+        await storage.put(safe_filename, content, "application/pdf")
+        policy_path = to_path(safe_filename)
 
     new_job = Job(
         title=title,
@@ -91,33 +100,85 @@ async def create_job(
     session.add(new_job)
     await session.commit()
     await session.refresh(new_job)
+
+    job_index.upsert(new_job.id, new_job.title, new_job.description)
+    job_search_index.upsert(new_job)
     return new_job
 
 @router.get("/", response_model=List[JobRead])
 async def get_jobs(session: AsyncSession = Depends(get_session)):
-    result = await session.execute(select(Job).order_by(Job.created_at.desc()))
+    result = await session.execute(select(Job).where(active_job_filter()).order_by(Job.created_at.desc()))
     jobs = result.scalars().all()
     return jobs
 
+@router.get("/search", response_model=JobSearchResults)
+async def search_jobs(
+    q: str = "",
+    job_type: Optional[str] = None,
+    work_location: Optional[str] = None,
+    experience: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Ranked, typo-tolerant job search with facet counts. An empty query browses
+    all jobs newest first. `experience` is a bucket key: 0, 1-2, 3-5 or 6+.
+    """
+    if experience is not None and experience not in {name for name, _, _ in EXPERIENCE_BUCKETS}:
+        raise HTTPException(status_code=400, detail="Unknown experience bucket")
+    page = max(page, 1)
+    page_size = max(1, min(page_size, 50))
+
+    await job_search_index.sync(session)
+    found = job_search_index.search(
+        q,
+        {"job_type": job_type, "work_location": work_location, "experience": experience},
+        offset=(page - 1) * page_size,
+        limit=page_size,
+    )
+
+    scores = dict(found["hits"])
+    jobs = {}
+    if scores:
+        result = await session.execute(select(Job).where(Job.id.in_(list(scores))))
+        jobs = {job.id: job for job in result.scalars().all()}
+
+    return JobSearchResults(
+        query=q,
+        total=found["total"],
+        page=page,
+        page_size=page_size,
+        results=[{**jobs[job_id].dict(), "score": round(score, 4)} for job_id, score in found["hits"] if job_id in jobs],
+        facets=found["facets"],
+        corrections=found["corrections"],
+    )
+
 @router.get("/my", response_model=List[JobRead])
 async def get_my_jobs(current_user: User = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
     if current_user.role != UserRole.HR:
         raise HTTPException(status_code=403, detail="Only HR can access this")
         
-    result = await session.execute(select(Job).where(Job.hr_id == current_user.id).order_by(Job.created_at.desc()))
+    result = await session.execute(
+        select(Job).where(Job.hr_id == current_user.id, active_job_filter()).order_by(Job.created_at.desc())
+    )
     jobs = result.scalars().all()
     
-    # For each job, count unviewed and total applications
+    # Count total and unviewed applications per job in one aggregate (no application rows loaded)
+    counts_result = await session.execute(
+        select(
+            Application.job_id,
+            func.count(),
+            func.count().filter(Application.viewed == False),  # noqa: E712
+        )
+        .where(Application.job_id.in_([job.id for job in jobs]))
+        .group_by(Application.job_id)
+    )
+    counts = {job_id: (total, unviewed) for job_id, total, unviewed in counts_result.all()}
+
     jobs_with_counts = []
     for job in jobs:
-        app_result = await session.execute(
-            select(Application).where(Application.job_id == job.id)
-        )
-        applications = app_result.scalars().all()
-        
-        unviewed_count = sum(1 for app in applications if not app.viewed)
-        total_count = len(applications)
-        
+        total_count, unviewed_count = counts.get(job.id, (0, 0))
         job_dict = job.dict()
         job_dict['unviewed_count'] = unviewed_count
         job_dict['total_applications'] = total_count
@@ -125,37 +186,230 @@ async def get_my_jobs(current_user: User = Depends(get_current_user), session: A
     
     return jobs_with_counts
 
-@router.get("/{job_id}/applications", response_model=List[ApplicationReadWithStudent])
-async def get_job_applications(job_id: int, current_user: User = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+@router.get("/recommended", response_model=List[JobRecommendation])
+async def get_recommended_jobs(
+    limit: int = 10,
+    exclude_applied: bool = True,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Top-N jobs for the candidate's profile resume, scored against every posting
+    in one vectorized similarity pass over the cached job vectors.
+    """
+    if current_user.role != UserRole.STUDENT:
+        raise HTTPException(status_code=403, detail="Only students can get job recommendations")
+
+    limit = max(1, min(limit, 50))
+
+    resume_vector = await get_resume_vector(current_user.resume_path)
+    if resume_vector is None:
+        raise HTTPException(status_code=400, detail="Please upload a profile resume to get job recommendations")
+
+    await job_index.sync(session)
+
+    exclude_ids = ()
+    if exclude_applied:
+        applied = await session.execute(
+            select(Application.job_id).where(Application.student_id == current_user.id)
+        )
+        exclude_ids = set(applied.scalars().all())
+
+    top = job_index.top_n(resume_vector, limit, exclude_ids)
+    if not top:
+        return []
+
+    result = await session.execute(select(Job).where(Job.id.in_([job_id for job_id, _ in top])))
+    jobs_by_id = {job.id: job for job in result.scalars().all()}
+
+    recommendations = []
+    for job_id, score in top:
+        job = jobs_by_id.get(job_id)
+        if job:
+            job_dict = job.dict()
+            job_dict["match_score"] = int(round(score * 100))
+            recommendations.append(job_dict)
+    return recommendations
+
+APPLICANT_SORT_COLUMNS = {
+    "ats_score": Application.ats_score,
+    "created_at": Application.created_at,
+    "experience_years": Application.experience_years,
+}
+
+@router.get("/{job_id}/applications", response_model=ApplicationPage)
+async def get_job_applications(
+    job_id: int,
+    page: int = 1,
+    page_size: int = 20,
+    sort: Literal["ats_score", "created_at", "experience_years"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    status: Optional[str] = None,
+    viewed: Optional[bool] = None,
+    is_disqualified_malpractice: Optional[bool] = None,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    One page of a job's applicants, sorted server-side. Backed by the
+    (job_id, <sort column> DESC) and (job_id, status) indexes from init_db.
+    """
     if current_user.role != UserRole.HR:
         raise HTTPException(status_code=403, detail="Only HR can access this")
     
     # Verify the job belongs to this HR
-    result = await session.execute(select(Job).where(Job.id == job_id))
-    job = result.scalars().first()
+    result = await session.execute(select(Job.hr_id).where(Job.id == job_id))
+    hr_id = result.scalar_one_or_none()
     
-    if not job:
+    if hr_id is None:
           raise HTTPException(status_code=404, detail="Job not found")
           
+    if hr_id != current_user.id:
+        raise HTTPException(status_code=403, detail="You can only view applications for your own jobs")
+
+    page = max(page, 1)
+    page_size = max(1, min(page_size, 100))
+
+    filters = [Application.job_id == job_id]
+    if status is not None:
+        filters.append(Application.status == status)
+    if viewed is not None:
+        filters.append(Application.viewed == viewed)
+    if is_disqualified_malpractice is not None:
+        filters.append(Application.is_disqualified_malpractice == is_disqualified_malpractice)
+
+    total = (await session.execute(select(func.count()).select_from(Application).where(*filters))).scalar_one()
+
+    # Stable order: ties broken by id so pages never overlap
+    sort_column = APPLICANT_SORT_COLUMNS[sort]
+    ordering = (sort_column.desc(), Application.id.desc()) if order == "desc" else (sort_column.asc(), Application.id.asc())
+
+    # Lean projection: resume text, transcripts and reports are never loaded here
+    stmt = (
+        select(
+            Application.id,
+            Application.job_id,
+            Application.student_id,
+            Application.ats_score,
+            Application.ats_feedback,
+            Application.status,
+            Application.viewed,
+            Application.experience_years,
+            Application.created_at,
+            Application.tab_switch_count,
+            Application.is_disqualified_malpractice,
+            User.full_name.label("candidate_name"),
+            User.email.label("candidate_email"),
+        )
+        .join(User, Application.student_id == User.id)
+        .where(*filters)
+        .order_by(*ordering)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
+    rows = (await session.execute(stmt)).mappings().all()
+
+    return ApplicationPage(
+        job_id=job_id,
+        total=total,
+        page=page,
+        page_size=page_size,
+        sort=sort,
+        order=order,
+        applications=[dict(row) for row in rows],
+    )
+
+@router.get("/{job_id}/ranking", response_model=ApplicantRanking)
+async def rank_job_applicants(
+    job_id: int,
+    page: int = 1,
+    page_size: int = 20,
+    shortlist: int = 0,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Rank all applicants for a job by combined score (stored ATS score, local
+    resume/JD similarity and experience fit). `shortlist=K` restricts the
+    result to the top K applicants; pagination applies on top of that.
+    """
+    if current_user.role != UserRole.HR:
+        raise HTTPException(status_code=403, detail="Only HR can access this")
+
+    result = await session.execute(select(Job).where(Job.id == job_id))
+    job = result.scalars().first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
     if job.hr_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only view applications for your own jobs")
-        
-    # Fetch applications with student details
+
+    page = max(page, 1)
+    page_size = max(1, min(page_size, 100))
+
+    # Lean projection: the heavy JSON/Text columns are never loaded here
     stmt = (
-        select(Application, User)
+        select(
+            Application.id,
+            Application.student_id,
+            Application.status,
+            Application.ats_score,
+            Application.experience_years,
+            Application.is_disqualified_malpractice,
+            User.full_name,
+            User.email,
+        )
         .join(User, Application.student_id == User.id)
         .where(Application.job_id == job_id)
     )
-    results = await session.execute(stmt)
-    
-    final_results = []
-    for application, student in results:
-        app_dict = application.dict()
-        app_dict["candidate_name"] = student.full_name
-        app_dict["candidate_email"] = student.email
-        final_results.append(app_dict)
-        
-    return final_results
+    rows = (await session.execute(stmt)).all()
+
+    if not rows:
+        return ApplicantRanking(job_id=job_id, total=0, page=page, page_size=page_size, applicants=[])
+
+    app_ids = [row.id for row in rows]
+    similarities = await applicant_ranker.similarities(session, job, app_ids)
+    scores = combined_scores(
+        ats_scores=np.fromiter((row.ats_score or 0 for row in rows), dtype=np.float32, count=len(rows)),
+        similarities=similarities,
+        experience_years=np.fromiter((row.experience_years or 0 for row in rows), dtype=np.float32, count=len(rows)),
+        experience_required=job.experience_required,
+        disqualified=np.fromiter((bool(row.is_disqualified_malpractice) for row in rows), dtype=bool, count=len(rows)),
+    )
+
+    order = np.argsort(-scores["combined"], kind="stable")
+    shortlist_size = min(shortlist, len(order)) if shortlist > 0 else 0
+    if shortlist_size:
+        order = order[:shortlist_size]
+
+    start = (page - 1) * page_size
+    applicants = []
+    for rank, idx in enumerate(order[start:start + page_size], start=start + 1):
+        row = rows[idx]
+        applicants.append({
+            "rank": rank,
+            "application_id": row.id,
+            "student_id": row.student_id,
+            "candidate_name": row.full_name,
+            "candidate_email": row.email,
+            "status": row.status,
+            "ats_score": row.ats_score,
+            "resume_similarity": int(round(scores["similarity"][idx] * 100)),
+            "experience_fit": int(round(scores["experience"][idx] * 100)),
+            "combined_score": int(round(scores["combined"][idx] * 100)),
+            "is_disqualified_malpractice": row.is_disqualified_malpractice,
+            "shortlisted": bool(shortlist_size),
+        })
+
+    return ApplicantRanking(
+        job_id=job_id,
+        total=len(order),
+        page=page,
+        page_size=page_size,
+        shortlist_size=shortlist_size,
+        applicants=applicants,
+    )
 
 @router.put("/{job_id}", response_model=JobRead)
 async def update_job(
@@ -183,6 +437,10 @@ async def update_job(
     session.add(job)
     await session.commit()
     await session.refresh(job)
+
+    if "title" in job_data or "description" in job_data:
+        job_index.upsert(job.id, job.title, job.description)
+    job_search_index.upsert(job)
     
     # Populate counts for response to match JobRead schema
     # (Though pure update usually just returns the object, keeping it consistent)
@@ -191,29 +449,57 @@ async def update_job(
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_job(
     job_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
+    """
+    Delete a job with its applications. Very large jobs are hidden at once and
+    purged in the background: 202 + progress (see GET /jobs/{job_id}/deletion).
+    Deleting a job whose background deletion failed retries it.
+    """
     if current_user.role != UserRole.HR:
         raise HTTPException(status_code=403, detail="Only HR can delete jobs")
         
-    result = await session.execute(select(Job).where(Job.id == job_id))
+    result = await session.execute(select(Job).where(Job.id == job_id, active_job_filter()))
     job = result.scalars().first()
     
     if not job:
+        deletion = await session.get(JobDeletion, job_id)
+        if deletion is not None and deletion.status == "failed" and deletion.hr_id == current_user.id:
+            deletion = await restart_job_deletion(session, deletion)
+            background_tasks.add_task(purge_job, job_id)
+            return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=deletion_progress(deletion))
         raise HTTPException(status_code=404, detail="Job not found")
         
     if job.hr_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only delete your own jobs")
-        
-    # Delete related applications first (Manual Cascade)
-    result_apps = await session.execute(select(Application).where(Application.job_id == job_id))
-    applications = result_apps.scalars().all()
-    
-    for app in applications:
-        await session.delete(app)
-    
-    await session.delete(job)
-    await session.commit()
-    return None
+
+    total = await count_applications(session, job_id)
+    if total > DELETE_ASYNC_THRESHOLD:
+        deletion = await start_job_deletion(session, job, total)
+        background_tasks.add_task(purge_job, job_id)
+        response = JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=deletion_progress(deletion))
+    else:
+        # Set-based: a fixed number of statements however many applicants there are
+        await delete_jobs(session, Job.id == job_id)
+        await session.commit()
+        response = Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    job_index.remove(job_id)
+    job_search_index.remove(job_id)
+    applicant_ranker.forget_job(job_id)
+    return response
+
+@router.get("/{job_id}/deletion")
+async def get_job_deletion_status(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """Progress of a background job deletion"""
+    deletion = await session.get(JobDeletion, job_id)
+    if deletion is None or deletion.hr_id != current_user.id:
+        raise HTTPException(status_code=404, detail="No deletion in progress for this job")
+    return deletion_progress(deletion)
 
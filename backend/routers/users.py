@@ -3,10 +3,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import shutil
 import os
+import asyncio
 
 from database import get_session
 from models import User
 from auth import get_current_user, verify_password, get_password_hash
+from storage import storage, to_path
+from blobs import store_resume, replace_ref, release_refs, blob_path
+from job_deletion import delete_applications, delete_jobs
+from upload_sweeper import upload_sweeper
+from images import InvalidImage, avatar_variant_key, render_avatar_variants, variants_field
 from schemas import UserRead, UserUpdate, ChangePasswordRequest
 
 router = APIRouter(
@@ -38,6 +44,11 @@ async def update_user_profile(
     await session.refresh(current_user)
     return current_user
 
+@router.get("/me/storage")
+async def read_my_storage_usage(current_user: User = Depends(get_current_user)):
+    """Bytes/files of uploads attributed to the current user as of the last sweeper pass"""
+    return {"user_id": current_user.id, **await upload_sweeper.owner_usage(current_user.id)}
+
 @router.post("/upload/photo", response_model=UserRead)
 async def upload_profile_picture(
     file: UploadFile = File(...),
@@ -64,21 +75,31 @@ async def upload_profile_picture(
     if not safe_filename:
         safe_filename = "photo.jpg"
     
-    # Ensure directory exists
-    os.makedirs("uploads", exist_ok=True)
+    # Decode once and re-encode the fixed avatar sizes off the event loop
+    try:
+        variants = await asyncio.to_thread(render_avatar_variants, content)
+    except InvalidImage as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Add timestamp to prevent overwrites
     timestamp = int(time.time())
-    file_location = f"uploads/pfp_{current_user.id}_{timestamp}_{safe_filename}"
+    storage_key = f"pfp_{current_user.id}_{timestamp}_{safe_filename}"
+    file_location = to_path(storage_key)
     
     try:
-        with open(file_location, "wb") as file_object:
-            file_object.write(content)
+        await asyncio.gather(
+            storage.put(storage_key, content, file.content_type),
+            *(
+                storage.put(avatar_variant_key(storage_key, size, name), data, content_type)
+                for (size, name), (data, content_type) in variants.items()
+            ),
+        )
     except Exception as e:
         print(f"File write error: {e}")
         raise HTTPException(status_code=500, detail="Failed to save file")
         
     current_user.profile_picture = file_location
+    current_user.profile_picture_variants = variants_field(storage_key, variants.keys())
     session.add(current_user)
     await session.commit()
     await session.refresh(current_user)
@@ -102,28 +123,15 @@ async def upload_default_resume(
     if not any(filename.endswith(ext) for ext in allowed_extensions):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed for resumes")
     
-    # ✅ SECURITY FIX: Use basename to prevent path traversal
-    import time
-    safe_filename = os.path.basename(file.filename) if file.filename else "resume.pdf"
-    safe_filename = "".join([c for c in safe_filename if c.isalnum() or c in "._-"]).strip()
-    
-    if not safe_filename:
-        safe_filename = "resume.pdf"
-    
-    # Ensure directory exists
-    os.makedirs("uploads", exist_ok=True)
-    
-    # Add timestamp to prevent overwrites
-    timestamp = int(time.time())
-    file_location = f"uploads/resume_{current_user.id}_{timestamp}_{safe_filename}"
-    
+    # Stored by content hash: re-uploading the same CV reuses the existing blob
     try:
-        with open(file_location, "wb") as file_object:
-            file_object.write(content)
+        blob = await store_resume(content)
     except Exception as e:
         print(f"File write error: {e}")
         raise HTTPException(status_code=500, detail="Failed to save file")
         
+    file_location = blob_path(blob)
+    await replace_ref(session, current_user.resume_path, file_location)
     current_user.resume_path = file_location
     session.add(current_user)
     await session.commit()
@@ -154,14 +162,12 @@ async def upload_company_policy(
     if not safe_filename:
         safe_filename = "policy.pdf"
     
-    os.makedirs("uploads", exist_ok=True)
-    
     timestamp = int(time.time())
-    file_location = f"uploads/policy_{current_user.id}_{timestamp}_{safe_filename}"
+    storage_key = f"policy_{current_user.id}_{timestamp}_{safe_filename}"
+    file_location = to_path(storage_key)
     
     try:
-        with open(file_location, "wb") as file_object:
-            file_object.write(content)
+        await storage.put(storage_key, content, "application/pdf")
     except Exception as e:
         print(f"File write error: {e}")
         raise HTTPException(status_code=500, detail="Failed to save file")
@@ -203,9 +209,11 @@ async def delete_account(
     session: AsyncSession = Depends(get_session)
 ):
     print(f"⚠️ Attempting DELETE ACCOUNT for user: {current_user.email} (ID: {current_user.id})")
-    from sqlalchemy import delete, select
+    from sqlalchemy import delete, update
     from models import Job, Application, ATSAnalysis, InterviewSlot  # Import models here to avoid circular imports
     
+    # Set-based throughout: a fixed number of statements however many jobs/applications
+    # the account has (ON DELETE CASCADE / SET NULL back this up on Postgres)
     try:
         # 1. Delete ATS Analysis History
         await session.execute(delete(ATSAnalysis).where(ATSAnalysis.user_id == current_user.id))
@@ -216,34 +224,24 @@ async def delete_account(
             # a. Delete Interview Slots created by HR
             await session.execute(delete(InterviewSlot).where(InterviewSlot.hr_id == current_user.id))
             
-            # b. Delete Jobs created by HR (and their applications)
-            # First find all jobs by this HR
-            result = await session.execute(select(Job).where(Job.hr_id == current_user.id))
-            hr_jobs = result.scalars().all()
-            hr_job_ids = [job.id for job in hr_jobs]
-            
-            if hr_job_ids:
-                # Delete applications for these jobs
-                await session.execute(delete(Application).where(Application.job_id.in_(hr_job_ids)))
-                # Delete the jobs
-                await session.execute(delete(Job).where(Job.id.in_(hr_job_ids)))
+            # b. Delete Jobs created by HR with their applications (and resume references)
+            await delete_jobs(session, Job.hr_id == current_user.id)
                 
         else:
             # 3. Candidate Specific Cleanup
             
-            # a. Delete Applications made by Candidate
-            await session.execute(delete(Application).where(Application.student_id == current_user.id))
+            # a. Delete Applications made by Candidate (and drop their resume references)
+            await delete_applications(session, Application.student_id == current_user.id)
             
             # b. Unbook Interview Slots (Set candidate_id to None and status to AVAILABLE)
-            # Find slots where this candidate is booked
-            result = await session.execute(select(InterviewSlot).where(InterviewSlot.candidate_id == current_user.id))
-            booked_slots = result.scalars().all()
-            for slot in booked_slots:
-                slot.candidate_id = None
-                slot.status = "AVAILABLE"
-                session.add(slot)
+            await session.execute(
+                update(InterviewSlot)
+                .where(InterviewSlot.candidate_id == current_user.id)
+                .values(candidate_id=None, status="AVAILABLE")
+            )
                 
         # 4. Finally Delete the User
+        await release_refs(session, [current_user.resume_path])
         await session.delete(current_user)
         await session.commit()
         
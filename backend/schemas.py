@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, List, Dict
 from datetime import datetime
 from models import UserRole
 
@@ -19,6 +19,7 @@ class UserRead(BaseModel):
     role: UserRole
     university_or_company: Optional[str] = None
     profile_picture: Optional[str] = None
+    profile_picture_variants: Optional[Dict[str, Dict[str, str]]] = None  # {"64": {"webp": path, "jpeg": path}, "256": ...}
     resume_path: Optional[str] = None
     bio: Optional[str] = None
     phone_number: Optional[str] = None
@@ -77,6 +78,21 @@ class JobRead(JobCreate):
     unviewed_count: int = 0
     total_applications: int = 0
 
+class JobRecommendation(JobRead):
+    match_score: int = 0  # 0-100 similarity between the candidate's profile resume and the job
+
+class JobSearchHit(JobRead):
+    score: float = 0.0
+
+class JobSearchResults(BaseModel):
+    query: str
+    total: int
+    page: int
+    page_size: int
+    results: List[JobSearchHit]
+    facets: Dict[str, Dict[str, int]]
+    corrections: Dict[str, str] = {}
+
 # Application Schemas
 from datetime import datetime
 class ApplicationCreate(BaseModel):
@@ -100,9 +116,61 @@ class ApplicationReadWithStudent(ApplicationRead):
     candidate_name: str
     candidate_email: str
 
+class ApplicationPage(BaseModel):
+    job_id: int
+    total: int
+    page: int
+    page_size: int
+    sort: str
+    order: str
+    applications: List[ApplicationReadWithStudent]
+
+class ApplicantSearchHit(BaseModel):
+    application_id: int
+    job_id: int
+    job_title: str
+    candidate_name: str
+    candidate_email: str
+    status: str
+    ats_score: int
+    created_at: datetime
+    rank: float
+    snippet: str
+    highlights: List[dict] = []
+
+class ApplicantSearchResults(BaseModel):
+    query: str
+    total: int
+    page: int
+    page_size: int
+    results: List[ApplicantSearchHit]
+
+class RankedApplicant(BaseModel):
+    rank: int
+    application_id: int
+    student_id: int
+    candidate_name: str
+    candidate_email: str
+    status: str
+    ats_score: int
+    resume_similarity: int  # 0-100
+    experience_fit: int  # 0-100
+    combined_score: int  # 0-100
+    is_disqualified_malpractice: bool = False
+    shortlisted: bool = False
+
+class ApplicantRanking(BaseModel):
+    job_id: int
+    total: int
+    page: int
+    page_size: int
+    shortlist_size: int = 0
+    applicants: List[RankedApplicant]
+
 class ApplicationDetail(ApplicationReadWithStudent):
     resume_path: Optional[str]
-    resume_text: Optional[str]
+    resume_text: Optional[str] = None  # only with ?include_resume_text=true
+    resume_preview: Optional[dict] = None  # {"status": "ready"|"pending"|"unavailable", "image", "excerpt", "highlights", ...}
     candidate_info: Optional[dict]
     chat_history: Optional[list]
     ats_report: Optional[dict]
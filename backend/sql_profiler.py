@@ -0,0 +1,188 @@
+"""
+SQL Profiler
+Opt-in per-request query profiling on the SQLAlchemy engine events. Every
+statement is counted, timed and fingerprinted (literals and bind parameters
+stripped, IN lists collapsed); a fingerprint executed N+ times in one request is
+reported as an N+1 suspect.
+
+  SQL_PROFILER=true                  profile every request, log N+1 suspects
+  SQL_PROFILER_HEADER=true           also add X-SQL-Profile to responses
+  SQL_PROFILER_NPLUS1_THRESHOLD=5    repeats of one fingerprint that count as N+1
+
+Tests can assert query budgets without enabling it globally:
+
+    with query_budget(5, max_repeats=1) as profile:
+        await client.get("/jobs/my", headers=hr_headers)
+
+(test_query_budget.py drives the app through httpx's ASGITransport this way)
+"""
+import contextvars
+import hashlib
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER", "false").lower() == "true"
+SQL_PROFILER_HEADER = os.getenv("SQL_PROFILER_HEADER", "false").lower() == "true"
+NPLUS1_THRESHOLD = int(os.getenv("SQL_PROFILER_NPLUS1_THRESHOLD", "5"))
+
+_FINGERPRINT_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),                      # string literals
+    (re.compile(r"(?<![\w$])\d+(?:\.\d+)?"), "?"),              # numeric literals
+    (re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+"), "?"),         # asyncpg / pyformat / named binds
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),        # IN (?, ?, ...) of any length
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_statement(statement: str) -> str:
+    normalized = statement
+    for pattern, replacement in _FINGERPRINT_RULES:
+        normalized = pattern.sub(replacement, normalized)
+    return normalized.strip().lower()
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize_statement(statement).encode("utf-8")).hexdigest()[:12]
+
+
+class QueryProfile:
+    """Statements seen during one request (or one query_budget block)"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        # fingerprint -> [count, seconds, normalized statement]
+        self.by_fingerprint: Dict[str, list] = {}
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Stop recording (the response was sent; background tasks run after it)"""
+        self.closed = True
+
+    def record(self, statement: str, seconds: float):
+        if self.closed:
+            return
+        key = fingerprint(statement)
+        with self._lock:
+            self.queries += 1
+            self.seconds += seconds
+            entry = self.by_fingerprint.get(key)
+            if entry is None:
+                self.by_fingerprint[key] = [1, seconds, normalize_statement(statement)]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+
+    def suspects(self, threshold: int = NPLUS1_THRESHOLD) -> List[Tuple[str, int, str]]:
+        """(fingerprint, count, statement) for fingerprints repeated `threshold`+ times"""
+        return sorted(
+            ((key, count, sql) for key, (count, _, sql) in self.by_fingerprint.items() if count >= threshold),
+            key=lambda item: -item[1],
+        )
+
+    def summary(self) -> dict:
+        return {
+            "queries": self.queries,
+            "time_ms": round(self.seconds * 1000, 2),
+            "distinct": len(self.by_fingerprint),
+            "nplus1_suspects": [
+                {"fingerprint": key, "count": count, "statement": sql[:200]}
+                for key, count, sql in self.suspects()
+            ],
+        }
+
+    def header_value(self) -> str:
+        suspects = ",".join(f"{key}x{count}" for key, count, _ in self.suspects())
+        value = f"queries={self.queries}; time_ms={self.seconds * 1000:.2f}; distinct={len(self.by_fingerprint)}"
+        return f"{value}; nplus1={suspects}" if suspects else value
+
+
+_current_profile: contextvars.ContextVar[Optional[QueryProfile]] = contextvars.ContextVar(
+    "sql_profile", default=None
+)
+# Active query_budget/profile_queries blocks; they see statements from every thread
+_captures: List[QueryProfile] = []
+_captures_lock = threading.Lock()
+_installed_engines = set()
+
+
+def install(async_engine):
+    """Attach the profiler listeners to an engine (idempotent)"""
+    sync_engine = async_engine.sync_engine
+    if id(sync_engine) in _installed_engines:
+        return
+    _installed_engines.add(id(sync_engine))
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._sql_profiler_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        if profile is None and not _captures:
+            return
+        started = getattr(context, "_sql_profiler_start", None)
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+        if profile is not None:
+            profile.record(statement, elapsed)
+        if _captures:
+            with _captures_lock:
+                captures = list(_captures)
+            for capture in captures:
+                if capture is not profile:
+                    capture.record(statement, elapsed)
+
+
+def start_request() -> Tuple[QueryProfile, contextvars.Token]:
+    profile = QueryProfile()
+    return profile, _current_profile.set(profile)
+
+
+def stop_request(token: contextvars.Token):
+    _current_profile.reset(token)
+
+
+@contextmanager
+def profile_queries():
+    """Capture every statement executed (on any thread) while the block runs"""
+    from database import engine
+    install(engine)
+
+    profile = QueryProfile()
+    with _captures_lock:
+        _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        with _captures_lock:
+            _captures.remove(profile)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int, max_repeats: Optional[int] = None):
+    """Fail when the block runs more than `max_queries` statements, or (optionally)
+    repeats any single fingerprint more than `max_repeats` times"""
+    with profile_queries() as profile:
+        yield profile
+
+    problems = []
+    if profile.queries > max_queries:
+        problems.append(f"{profile.queries} queries (budget {max_queries})")
+    if max_repeats is not None:
+        for key, count, sql in profile.suspects(threshold=max_repeats + 1):
+            problems.append(f"{count}x [{key}] {sql[:120]}")
+    if problems:
+        raise QueryBudgetExceeded("Query budget exceeded: " + "; ".join(problems))
@@ -0,0 +1,348 @@
+"""
+Blob Storage
+Every uploaded file (resumes, company policies, profile pictures) goes through
+one storage interface, so the API is not tied to a single container's disk.
+
+  STORAGE_BACKEND=local (default)   files under UPLOAD_DIR (default "uploads")
+  STORAGE_BACKEND=s3                S3-compatible bucket (AWS, MinIO, ...), needs boto3
+      S3_BUCKET, S3_ENDPOINT_URL (MinIO / other providers), S3_REGION, S3_PREFIX
+      S3_SERVE=presign (default)    GET /uploads/<key> redirects to a presigned URL
+      S3_SERVE=stream               the API streams the object (private endpoints)
+      S3_PRESIGN_SECONDS=300
+      credentials come from the usual AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY
+
+Database columns keep public paths of the form "uploads/<key>", which is also the
+URL path the frontend requests. Local files are streamed with ETag / Range /
+304 support; S3 objects are served presigned or streamed with the same semantics.
+"""
+import asyncio
+import itertools
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator, List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+
+PUBLIC_PREFIX = "uploads/"
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+class BlobInfo:
+    __slots__ = ("key", "size", "modified")
+
+    def __init__(self, key: str, size: int, modified: datetime):
+        self.key = key
+        self.size = size
+        self.modified = modified
+
+
+def to_key(path: str) -> str:
+    """'uploads/<key>' (as stored in the database) -> storage key"""
+    key = path[len(PUBLIC_PREFIX):] if path.startswith(PUBLIC_PREFIX) else path
+    key = key.lstrip("/")
+    if not key or any(part in ("", ".", "..") for part in key.split("/")):
+        raise BlobNotFound(path)
+    return key
+
+
+def to_path(key: str) -> str:
+    """storage key -> public path stored in the database"""
+    return f"{PUBLIC_PREFIX}{key}"
+
+
+def safe_filename(filename: Optional[str], default: str) -> str:
+    """Basename with only [A-Za-z0-9._-] (prevents path traversal)"""
+    name = os.path.basename(filename) if filename else default
+    name = "".join(c for c in name if c.isalnum() or c in "._-").strip()
+    return name or default
+
+
+class LocalStorage:
+    def __init__(self, root: str = UPLOAD_DIR):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise BlobNotFound(key)
+        return path
+
+    def _put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _get(self, key: str) -> bytes:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            raise BlobNotFound(key)
+
+    def _stat(self, key: str) -> Optional[BlobInfo]:
+        try:
+            st = os.stat(self._path(key))
+        except (FileNotFoundError, BlobNotFound):
+            return None
+        return BlobInfo(key, st.st_size, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc))
+
+    def _delete(self, key: str) -> bool:
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _walk(self, prefix: str, start_after: Optional[str]) -> Iterator[BlobInfo]:
+        """
+        Keys in lexical order after `start_after`. Each directory is read and
+        sorted once, when the walk reaches it; subtrees entirely before the
+        cursor or outside the prefix are never opened.
+        """
+        def walk(directory: str, base: str) -> Iterator[BlobInfo]:
+            try:
+                with os.scandir(directory) as it:
+                    # Sorting "<dir>/" next to file names gives the lexical order of the full keys
+                    entries = sorted((entry.name + "/" if entry.is_dir(follow_symlinks=False) else entry.name, entry)
+                                     for entry in it)
+            except FileNotFoundError:
+                return
+            for name, entry in entries:
+                key = base + name
+                if name.endswith("/"):
+                    if not (key.startswith(prefix) or prefix.startswith(key)):
+                        continue
+                    if start_after is not None and key < start_after and not start_after.startswith(key):
+                        continue
+                    yield from walk(entry.path, key)
+                    continue
+                if name.startswith(".tmp-") or not key.startswith(prefix):
+                    continue
+                if start_after is not None and key <= start_after:
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue  # deleted since the directory was read
+                yield BlobInfo(key, st.st_size, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc))
+
+        return walk(self.root, "")
+
+    def _list(self, prefix: str, start_after: Optional[str], limit: int) -> List[BlobInfo]:
+        return list(itertools.islice(self._walk(prefix, start_after), limit))
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None):
+        await asyncio.to_thread(self._put, key, data)
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._get, key)
+
+    async def stat(self, key: str) -> Optional[BlobInfo]:
+        return await asyncio.to_thread(self._stat, key)
+
+    async def exists(self, key: str) -> bool:
+        return await self.stat(key) is not None
+
+    async def delete(self, key: str) -> bool:
+        return await asyncio.to_thread(self._delete, key)
+
+    async def list(self, prefix: str = "", start_after: Optional[str] = None, limit: int = 1000) -> List[BlobInfo]:
+        """Keys in lexical order after `start_after` (for incremental scans)"""
+        return await asyncio.to_thread(self._list, prefix, start_after, limit)
+
+    async def scan(self, prefix: str = "", start_after: Optional[str] = None,
+                   page_size: int = 1000) -> AsyncIterator[List[BlobInfo]]:
+        """Pages of keys in lexical order from one walk, resumed page by page (full scans)"""
+        walk = self._walk(prefix, start_after)
+        while True:
+            page = await asyncio.to_thread(lambda: list(itertools.islice(walk, page_size)))
+            if not page:
+                return
+            yield page
+
+    async def response(self, key: str, request: Request, headers: Optional[dict] = None) -> Response:
+        path = self._path(key)
+        try:
+            stat_result = await asyncio.to_thread(os.stat, path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="File not found")
+        # FileResponse handles Range / If-Range and sets ETag + Last-Modified
+        response = FileResponse(path, stat_result=stat_result, headers=headers)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and response.headers.get("etag") in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers={"etag": response.headers["etag"], **(headers or {})})
+        return response
+
+
+class S3Storage:
+    def __init__(self):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)") from e
+
+        self.bucket = os.getenv("S3_BUCKET")
+        if not self.bucket:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        self.prefix = os.getenv("S3_PREFIX", "").strip("/")
+        self.serve_mode = os.getenv("S3_SERVE", "presign").lower()
+        self.presign_seconds = int(os.getenv("S3_PRESIGN_SECONDS", "300"))
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            region_name=os.getenv("S3_REGION") or None,
+            config=Config(signature_version="s3v4", retries={"max_attempts": 3, "mode": "standard"}),
+        )
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _storage_key(self, object_key: str) -> str:
+        return object_key[len(self.prefix) + 1:] if self.prefix else object_key
+
+    @staticmethod
+    def _is_missing(error) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    async def put(self, key: str, data: bytes, content_type: Optional[str] = None):
+        extra = {"ContentType": content_type} if content_type else {}
+        await asyncio.to_thread(
+            self.client.put_object, Bucket=self.bucket, Key=self._object_key(key), Body=data, **extra
+        )
+
+    async def get(self, key: str) -> bytes:
+        def read():
+            try:
+                obj = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+            except Exception as e:
+                if self._is_missing(e):
+                    raise BlobNotFound(key)
+                raise
+            return obj["Body"].read()
+
+        return await asyncio.to_thread(read)
+
+    async def stat(self, key: str) -> Optional[BlobInfo]:
+        def head():
+            try:
+                obj = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            except Exception as e:
+                if self._is_missing(e):
+                    return None
+                raise
+            return BlobInfo(key, obj["ContentLength"], obj["LastModified"])
+
+        return await asyncio.to_thread(head)
+
+    async def exists(self, key: str) -> bool:
+        return await self.stat(key) is not None
+
+    async def delete(self, key: str) -> bool:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=self._object_key(key))
+        return True
+
+    async def list(self, prefix: str = "", start_after: Optional[str] = None, limit: int = 1000) -> List[BlobInfo]:
+        params = {"Bucket": self.bucket, "Prefix": self._object_key(prefix), "MaxKeys": limit}
+        if start_after:
+            params["StartAfter"] = self._object_key(start_after)
+        result = await asyncio.to_thread(self.client.list_objects_v2, **params)
+        return [
+            BlobInfo(self._storage_key(obj["Key"]), obj["Size"], obj["LastModified"])
+            for obj in result.get("Contents", [])
+        ]
+
+    async def scan(self, prefix: str = "", start_after: Optional[str] = None,
+                   page_size: int = 1000) -> AsyncIterator[List[BlobInfo]]:
+        """Pages of keys in lexical order (full scans); each page is one StartAfter listing"""
+        while True:
+            page = await self.list(prefix, start_after, page_size)
+            if not page:
+                return
+            yield page
+            start_after = page[-1].key
+
+    async def response(self, key: str, request: Request, headers: Optional[dict] = None) -> Response:
+        if self.serve_mode == "presign":
+            # The signature covers the method, so HEAD needs its own URL
+            url = await asyncio.to_thread(
+                self.client.generate_presigned_url,
+                "head_object" if request.method == "HEAD" else "get_object",
+                Params={"Bucket": self.bucket, "Key": self._object_key(key)},
+                ExpiresIn=self.presign_seconds,
+            )
+            return RedirectResponse(url, status_code=307)
+        return await self._stream(key, request, headers or {})
+
+    async def _stream(self, key: str, request: Request, headers: dict) -> Response:
+        params = {"Bucket": self.bucket, "Key": self._object_key(key)}
+        if request.headers.get("range"):
+            params["Range"] = request.headers["range"]
+        if request.headers.get("if-none-match"):
+            params["IfNoneMatch"] = request.headers["if-none-match"]
+
+        def fetch():
+            try:
+                return self.client.get_object(**params)
+            except Exception as e:
+                if self._is_missing(e):
+                    raise HTTPException(status_code=404, detail="File not found")
+                code = getattr(e, "response", {}).get("Error", {}).get("Code")
+                if code in ("304", "NotModified"):
+                    return None
+                if code == "InvalidRange":
+                    raise HTTPException(status_code=416, detail="Range not satisfiable")
+                raise
+
+        obj = await asyncio.to_thread(fetch)
+        if obj is None:
+            return Response(status_code=304, headers={"etag": request.headers["if-none-match"], **headers})
+
+        response_headers = {
+            "etag": obj["ETag"],
+            "accept-ranges": "bytes",
+            "content-length": str(obj["ContentLength"]),
+            **headers,
+        }
+        if obj.get("ContentRange"):
+            response_headers["content-range"] = obj["ContentRange"]
+
+        def body() -> Iterator[bytes]:
+            try:
+                yield from obj["Body"].iter_chunks(64 * 1024)
+            finally:
+                obj["Body"].close()
+
+        return StreamingResponse(
+            body(),
+            status_code=206 if obj.get("ContentRange") else 200,
+            media_type=obj.get("ContentType") or "application/octet-stream",
+            headers=response_headers,
+        )
+
+
+def create_storage():
+    if STORAGE_BACKEND == "s3":
+        return S3Storage()
+    return LocalStorage()
+
+
+storage = create_storage()
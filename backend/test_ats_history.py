@@ -0,0 +1,120 @@
+"""
+Keyset pagination of GET /ats/history, driven in-process through httpx's
+ASGITransport against a throwaway SQLite database (no server needed):
+
+- pages are newest first on (created_at, id); analyses with the same
+  created_at are split across pages without repeating or skipping any
+- the last page has next_cursor None, also when it is exactly full
+- a malformed or tampered cursor is a 400, not a 500
+
+    cd backend
+    python -m pytest test_ats_history.py     (or: python test_ats_history.py)
+"""
+import asyncio
+import base64
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+_workdir = tempfile.mkdtemp(prefix="hiremind-ats-history-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "ats-history-test")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+os.environ["LOG_FILE"] = os.path.join(_workdir, "app.log")
+os.environ["SWEEPER_ENABLED"] = "false"
+os.environ["ARCHIVE_ENABLED"] = "false"
+
+import httpx
+
+from auth import create_access_token
+from database import async_session_maker, init_db
+from main import app
+from models import ATSAnalysis, User, UserRole
+
+STUDENT_EMAIL = "history-student@example.com"
+OTHER_EMAIL = "history-other@example.com"
+HEADERS = {"Authorization": "Bearer " + create_access_token({"sub": STUDENT_EMAIL, "role": "student"})}
+TIE = datetime(2026, 3, 1, 12, 0, 0)
+
+
+async def seed() -> list:
+    """(created_at, id) of the student's analyses, newest first"""
+    async with async_session_maker() as session:
+        student = User(email=STUDENT_EMAIL, hashed_password="x", full_name="Student", role=UserRole.STUDENT, is_verified=True)
+        other = User(email=OTHER_EMAIL, hashed_password="x", full_name="Other", role=UserRole.STUDENT, is_verified=True)
+        session.add_all([student, other])
+        await session.commit()
+        # Five analyses share one timestamp, between two older and two newer ones
+        stamps = [TIE - timedelta(days=2), TIE - timedelta(days=1)] + [TIE] * 5 + [TIE + timedelta(days=1), TIE + timedelta(days=2)]
+        analyses = [ATSAnalysis(user_id=student.id, job_title=f"Job {i}", score=i, created_at=at) for i, at in enumerate(stamps)]
+        analyses.append(ATSAnalysis(user_id=other.id, job_title="Not mine", score=1, created_at=TIE))
+        session.add_all(analyses)
+        await session.commit()
+        mine = [(a.created_at, a.id) for a in analyses if a.user_id == student.id]
+    return sorted(mine, reverse=True)
+
+
+async def walk(client: httpx.AsyncClient, limit: int) -> list:
+    """Every page at `limit`; asserts only the last one has no next_cursor"""
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/ats/history", headers=HEADERS, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        pages.append([(datetime.fromisoformat(item["created_at"]), item["id"]) for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+        assert len(page["items"]) == limit, page
+
+
+def cursor_of(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+async def run():
+    await init_db()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        expected = await seed()
+        assert len(expected) == 9
+
+        # limit 2 splits the five tied analyses over three pages
+        pages = await walk(client, limit=2)
+        assert [len(page) for page in pages] == [2, 2, 2, 2, 1], pages
+        assert [row for page in pages for row in page] == expected
+
+        # Exactly full last page: no trailing empty page
+        pages = await walk(client, limit=3)
+        assert [len(page) for page in pages] == [3, 3, 3], pages
+        assert [row for page in pages for row in page] == expected
+
+        # Everything on one page
+        pages = await walk(client, limit=100)
+        assert pages == [expected]
+
+        malformed = [
+            "not-a-cursor",
+            "!!!",
+            cursor_of("2026-03-01T12:00:00"),  # no id
+            cursor_of("2026-03-01T12:00:00|1|2"),
+            cursor_of("yesterday|1"),
+            cursor_of("2026-03-01T12:00:00|one"),
+            cursor_of("2026-03-01T12:00:00+05:00|1"),  # the column is naive UTC
+            cursor_of(f"2026-03-01T12:00:00|{2 ** 64}"),  # overflows BIGINT
+            cursor_of("2026-03-01T12:00:00|-1"),
+            base64.urlsafe_b64encode(b"\xff\xfe|1").decode(),  # not UTF-8
+        ]
+        for cursor in malformed:
+            response = await client.get("/ats/history", headers=HEADERS, params={"cursor": cursor})
+            assert response.status_code == 400, (cursor, response.status_code, response.text)
+            assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_ats_history_pagination():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_ats_history_pagination()
+    print("✅ GET /ats/history pages through ties, ends with next_cursor None and rejects bad cursors")
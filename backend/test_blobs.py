@@ -0,0 +1,127 @@
+"""
+Reference counting of content-addressed resumes (blobs.py), against a
+throwaway SQLite database and upload directory:
+
+- the same file uploaded twice is stored and parsed once; storing does not
+  count a reference, pointing a resume_path at it does
+- replace_ref, release_refs and the set-based release in delete_applications
+  / delete_jobs keep StoredBlob.ref_count equal to the resume_path columns
+  that point at the blob (checked against recount_refs)
+- legacy, non content-addressed paths are never counted
+
+    cd backend
+    python -m pytest test_blobs.py     (or: python test_blobs.py)
+"""
+import asyncio
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="hiremind-blobs-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "blobs-test")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+os.environ["LOG_FILE"] = os.path.join(_workdir, "app.log")
+
+from sqlalchemy.future import select
+
+from blobs import add_ref, blob_path, recount_refs, release_refs, replace_ref, store_resume
+from database import async_session_maker, init_db
+from job_deletion import delete_applications, delete_jobs
+from models import Application, Job, StoredBlob, User, UserRole
+from storage import storage
+
+RESUME = open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_resume.pdf"), "rb").read()
+OTHER_RESUME = RESUME + b"\n% second revision\n"
+LEGACY_PATH = "uploads/resumes_legacy/cv.pdf"
+
+
+async def ref_counts() -> dict:
+    async with async_session_maker() as session:
+        return dict((await session.execute(select(StoredBlob.sha256, StoredBlob.ref_count))).all())
+
+
+async def assert_consistent():
+    """The incremental counts match a full recount from the resume_path columns"""
+    before = await ref_counts()
+    async with async_session_maker() as session:
+        await recount_refs(session)
+        await session.commit()
+    assert await ref_counts() == before, (before, await ref_counts())
+
+
+async def run():
+    # Set on the storage object rather than via env: another test may have imported it already
+    storage.root = os.path.join(_workdir, "uploads")
+    os.makedirs(storage.root, exist_ok=True)
+    await init_db()
+
+    first, again = await asyncio.gather(store_resume(RESUME), store_resume(RESUME))
+    assert first.sha256 == again.sha256
+    other = await store_resume(OTHER_RESUME)
+    path, other_path = blob_path(first), blob_path(other)
+    assert await ref_counts() == {first.sha256: 0, other.sha256: 0}
+    assert len([name for _, _, files in os.walk(storage.root) for name in files]) == 2
+
+    async with async_session_maker() as session:
+        student = User(email="blob-student@example.com", hashed_password="x", full_name="Student",
+                       role=UserRole.STUDENT, is_verified=True, resume_path=path)
+        hr = User(email="blob-hr@example.com", hashed_password="x", full_name="HR", role=UserRole.HR, is_verified=True)
+        session.add_all([student, hr])
+        await session.flush()
+        await add_ref(session, path)
+        jobs = [Job(title=f"Job {i}", company="Corp", description="d", location="x", salary_range="1", hr_id=hr.id)
+                for i in range(2)]
+        session.add_all(jobs)
+        await session.flush()
+        # Three applications with the profile resume, one with the other file, one legacy
+        for job_id, resume_path in [(jobs[0].id, path), (jobs[0].id, path), (jobs[1].id, path),
+                                    (jobs[1].id, other_path), (jobs[1].id, LEGACY_PATH)]:
+            session.add(Application(job_id=job_id, student_id=student.id, resume_path=resume_path))
+            await add_ref(session, resume_path)
+        await session.commit()
+        student_id, job_ids = student.id, [job.id for job in jobs]
+    assert await ref_counts() == {first.sha256: 4, other.sha256: 1}
+    await assert_consistent()
+
+    # A new profile resume moves the user's reference
+    async with async_session_maker() as session:
+        student = await session.get(User, student_id)
+        await replace_ref(session, student.resume_path, other_path)
+        student.resume_path = other_path
+        await session.commit()
+    assert await ref_counts() == {first.sha256: 3, other.sha256: 2}
+    await assert_consistent()
+
+    # Set-based release: one job's applications (two references to the same blob)
+    async with async_session_maker() as session:
+        assert await delete_applications(session, Application.job_id == job_ids[0]) == 2
+        await session.commit()
+    assert await ref_counts() == {first.sha256: 1, other.sha256: 2}
+    await assert_consistent()
+
+    # Whole jobs, including the legacy path, which is not counted
+    async with async_session_maker() as session:
+        assert await delete_jobs(session, Job.id == job_ids[1]) == 1
+        await session.commit()
+    assert await ref_counts() == {first.sha256: 0, other.sha256: 1}
+    await assert_consistent()
+
+    async with async_session_maker() as session:
+        student = await session.get(User, student_id)
+        await release_refs(session, [student.resume_path, None, LEGACY_PATH])
+        student.resume_path = None
+        await session.commit()
+    assert await ref_counts() == {first.sha256: 0, other.sha256: 0}
+    await assert_consistent()
+
+    # Unreferenced blobs stay stored (the orphan sweeper removes them later)
+    assert await storage.exists(first.key) and await storage.exists(other.key)
+
+
+def test_blob_ref_count_lifecycle():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_blob_ref_count_lifecycle()
+    print("✅ Resume blob ref_count follows every resume_path that points at it")
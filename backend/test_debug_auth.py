@@ -0,0 +1,69 @@
+"""
+The X-Debug-Token gate (auth.require_debug_token) on the /debug/* endpoints,
+driven in-process through httpx's ASGITransport (no server needed):
+
+- DEBUG_TOKEN unset: every endpoint answers 404, token or not
+- DEBUG_TOKEN set: no or a wrong X-Debug-Token is a 403, the right one a 200
+
+    cd backend
+    python -m pytest test_debug_auth.py     (or: python test_debug_auth.py)
+"""
+import asyncio
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="hiremind-debug-auth-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "debug-auth-test")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+os.environ["LOG_FILE"] = os.path.join(_workdir, "app.log")
+os.environ["SWEEPER_ENABLED"] = "false"
+os.environ["ARCHIVE_ENABLED"] = "false"
+
+import httpx
+
+import auth
+from database import init_db
+from main import app
+
+DEBUG_ENDPOINTS = ["/debug/llm-cache", "/debug/storage", "/debug/archive", "/debug/llm-scheduler"]
+TOKEN = "debug-auth-test-token"
+
+
+async def statuses(client: httpx.AsyncClient, headers: dict) -> dict:
+    return {path: (await client.get(path, headers=headers)).status_code for path in DEBUG_ENDPOINTS}
+
+
+async def run():
+    await init_db()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # Every token-gated route is covered
+        gated = {
+            route.path for route in app.routes if hasattr(route, "dependant")
+            and any(dependency.call is auth.require_debug_token for dependency in route.dependant.dependencies)
+        }
+        assert gated == set(DEBUG_ENDPOINTS), gated
+
+        original = auth.DEBUG_TOKEN
+        try:
+            auth.DEBUG_TOKEN = None
+            for headers in ({}, {"X-Debug-Token": TOKEN}, {"X-Debug-Token": ""}):
+                assert set((await statuses(client, headers)).values()) == {404}, headers
+
+            auth.DEBUG_TOKEN = TOKEN
+            assert set((await statuses(client, {})).values()) == {403}
+            assert set((await statuses(client, {"X-Debug-Token": ""})).values()) == {403}
+            assert set((await statuses(client, {"X-Debug-Token": TOKEN + "x"})).values()) == {403}
+            assert set((await statuses(client, {"X-Debug-Token": TOKEN.upper()})).values()) == {403}
+            assert set((await statuses(client, {"X-Debug-Token": TOKEN})).values()) == {200}
+        finally:
+            auth.DEBUG_TOKEN = original
+
+
+def test_debug_endpoints_require_token():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_debug_endpoints_require_token()
+    print("✅ /debug/* endpoints are hidden without DEBUG_TOKEN and need the right X-Debug-Token")
@@ -0,0 +1,175 @@
+"""
+Background job deletion (job_deletion.py), driven in-process through httpx's
+ASGITransport against a throwaway SQLite database, with a tiny threshold and
+batch size so a handful of applications exercises the background path:
+
+- DELETE /jobs/{id} above DELETE_ASYNC_THRESHOLD answers 202, hides the job at
+  once and purges it in DELETE_BATCH_SIZE batches, advancing the progress
+  after each one; below the threshold it answers 204
+- a failed deletion stays hidden and is retried by resume_stale_deletions,
+  which also takes over deletions whose worker stopped heartbeating and drops
+  finished rows after DELETE_STATUS_TTL
+
+    cd backend
+    python -m pytest test_job_deletion.py     (or: python test_job_deletion.py)
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+_workdir = tempfile.mkdtemp(prefix="hiremind-job-deletion-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "job-deletion-test")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+os.environ["LOG_FILE"] = os.path.join(_workdir, "app.log")
+os.environ["SWEEPER_ENABLED"] = "false"
+os.environ["ARCHIVE_ENABLED"] = "false"
+
+import httpx
+from sqlalchemy import func, update
+from sqlalchemy.future import select
+
+import job_deletion
+from routers import jobs
+from auth import create_access_token
+from database import async_session_maker, init_db
+from main import app
+from models import AnswerEvaluation, Application, Job, JobDeletion, User, UserRole
+
+HR_EMAIL = "deletion-hr@example.com"
+HEADERS = {"Authorization": "Bearer " + create_access_token({"sub": HR_EMAIL, "role": "hr"})}
+
+
+async def seed_job(applications: int) -> int:
+    async with async_session_maker() as session:
+        hr_id = (await session.execute(select(User.id).where(User.email == HR_EMAIL))).scalar()
+        if hr_id is None:
+            user = User(email=HR_EMAIL, hashed_password="x", full_name="Deletion HR", role=UserRole.HR, is_verified=True)
+            session.add(user)
+            await session.commit()
+            hr_id = user.id
+        job = Job(title="Job", company="Corp", description="Python", location="Remote", salary_range="1", hr_id=hr_id)
+        session.add(job)
+        await session.flush()
+        for _ in range(applications):
+            application = Application(job_id=job.id, student_id=hr_id)
+            session.add(application)
+            await session.flush()
+            session.add(AnswerEvaluation(application_id=application.id, question_index=0, question="q", answer="a"))
+        await session.commit()
+        return job.id
+
+
+async def count(model, *criteria) -> int:
+    async with async_session_maker() as session:
+        return (await session.execute(select(func.count()).select_from(model).where(*criteria))).scalar_one()
+
+
+async def my_job_ids(client: httpx.AsyncClient) -> set:
+    response = await client.get("/jobs/my", headers=HEADERS)
+    assert response.status_code == 200, response.text
+    return {job["id"] for job in response.json()}
+
+
+async def backdate(job_id: int, seconds: float):
+    async with async_session_maker() as session:
+        await session.execute(
+            update(JobDeletion).where(JobDeletion.job_id == job_id)
+            .values(updated_at=datetime.utcnow() - timedelta(seconds=seconds))
+        )
+        await session.commit()
+
+
+def record_batches(fail_on_batch: int = 0):
+    """Wrap delete_applications: (batch sizes, committed progress before each batch)"""
+    real = job_deletion.delete_applications
+    batches, progress = [], []
+
+    async def wrapper(session, *criteria):
+        async with async_session_maker() as other:
+            deletion = (await other.execute(select(JobDeletion.deleted))).scalars().all()
+            progress.append(max(deletion, default=0))
+        if fail_on_batch and len(batches) + 1 == fail_on_batch:
+            raise RuntimeError("storage unavailable")
+        deleted = await real(session, *criteria)
+        batches.append(deleted)
+        return deleted
+
+    job_deletion.delete_applications = wrapper
+    return real, batches, progress
+
+
+async def run():
+    # Set on the modules rather than via env: another test may have imported them already
+    jobs.DELETE_ASYNC_THRESHOLD = 5
+    job_deletion.DELETE_BATCH_SIZE = 2
+    await init_db()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # All up front: SQLite hands a deleted job's id to the next new job
+        big, small, failing, orphaned = [await seed_job(n) for n in (7, 3, 6, 4)]
+
+        # Above the threshold: 202 now, purged in batches by the background task
+        real, batches, progress = record_batches()
+        try:
+            response = await client.delete(f"/jobs/{big}", headers=HEADERS)
+        finally:
+            job_deletion.delete_applications = real
+        assert response.status_code == 202, response.text
+        assert response.json()["total"] == 7 and response.json()["status"] == "running"
+        # ASGITransport returns after the app call, background task included
+        assert batches == [2, 2, 2, 1], batches
+        assert progress == [0, 2, 4, 6], progress
+        status = (await client.get(f"/jobs/{big}/deletion", headers=HEADERS)).json()
+        assert (status["status"], status["deleted"]) == ("done", 7), status
+        assert await count(Application, Application.job_id == big) == 0
+        assert await count(AnswerEvaluation) == 3 + 6 + 4
+        assert await count(Job, Job.id == big) == 0
+        assert await my_job_ids(client) == {small, failing, orphaned}
+
+        # Below the threshold: deleted in the request
+        response = await client.delete(f"/jobs/{small}", headers=HEADERS)
+        assert response.status_code == 204, response.text
+        assert await count(Application, Application.job_id == small) == 0
+
+        # A failed deletion keeps the job hidden and is retried after the heartbeat timeout
+        real, batches, _ = record_batches(fail_on_batch=2)
+        try:
+            assert (await client.delete(f"/jobs/{failing}", headers=HEADERS)).status_code == 202
+        finally:
+            job_deletion.delete_applications = real
+        status = (await client.get(f"/jobs/{failing}/deletion", headers=HEADERS)).json()
+        assert (status["status"], status["deleted"]) == ("failed", 2), status
+        assert failing not in await my_job_ids(client)
+        assert await job_deletion.resume_stale_deletions() == 0  # not due yet
+        await backdate(failing, job_deletion.DELETE_HEARTBEAT_TIMEOUT + 1)
+        assert await job_deletion.resume_stale_deletions() == 1
+        status = (await client.get(f"/jobs/{failing}/deletion", headers=HEADERS)).json()
+        assert (status["status"], status["deleted"], status["error"]) == ("done", 6, None), status
+
+        # A running deletion is taken over only once its owner stops heartbeating
+        async with async_session_maker() as session:
+            session.add(JobDeletion(job_id=orphaned, hr_id=1, total=4, owner="other-worker"))
+            await session.commit()
+        assert orphaned not in await my_job_ids(client)
+        assert await job_deletion.resume_stale_deletions() == 0
+        await backdate(orphaned, job_deletion.DELETE_HEARTBEAT_TIMEOUT + 1)
+        assert await job_deletion.resume_stale_deletions() == 1
+        assert await count(Application, Application.job_id == orphaned) == 0
+        assert await count(Job, Job.id == orphaned) == 0
+
+        # Finished rows are dropped after DELETE_STATUS_TTL
+        for job_id in (big, failing, orphaned):
+            await backdate(job_id, job_deletion.DELETE_STATUS_TTL + 1)
+        await job_deletion.resume_stale_deletions()
+        assert await count(JobDeletion) == 0
+        assert (await client.get(f"/jobs/{big}/deletion", headers=HEADERS)).status_code == 404
+
+
+def test_background_job_deletion():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_background_job_deletion()
+    print("✅ Background job deletion: 202 path, batch progress, retry, takeover and cleanup")
@@ -0,0 +1,96 @@
+"""
+Query budget for GET /jobs/my, driven in-process through httpx's ASGITransport
+against a throwaway SQLite database (no server needed):
+
+- the sql_profiler hooks see the statements the async engine runs for a request
+- the dashboard stays a fixed number of queries however many jobs and
+  applications the HR has (no N+1)
+
+    cd backend
+    python -m pytest test_query_budget.py     (or: python test_query_budget.py)
+"""
+import asyncio
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="hiremind-query-budget-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "query-budget-test")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+os.environ["LOG_FILE"] = os.path.join(_workdir, "app.log")
+os.environ["SWEEPER_ENABLED"] = "false"
+os.environ["ARCHIVE_ENABLED"] = "false"
+
+import httpx
+from sqlalchemy.future import select
+
+from auth import create_access_token
+from database import async_session_maker, init_db
+from main import app
+from models import Application, Job, User, UserRole
+from sql_profiler import QueryBudgetExceeded, query_budget
+
+HR_EMAIL = "budget-hr@example.com"
+# get_current_user + active jobs + one grouped count of their applications
+MY_JOBS_QUERIES = 3
+
+
+async def seed(jobs: int, applications_per_job: int):
+    async with async_session_maker() as session:
+        hr_id = (await session.execute(select(User.id).where(User.email == HR_EMAIL))).scalar()
+        if hr_id is None:
+            user = User(email=HR_EMAIL, hashed_password="x", full_name="Budget HR", role=UserRole.HR, is_verified=True)
+            session.add(user)
+            await session.commit()
+            hr_id = user.id
+        for i in range(jobs):
+            job = Job(title=f"Job {i}", company="Corp", description="Python", location="Remote",
+                      salary_range="1", hr_id=hr_id)
+            session.add(job)
+            await session.flush()
+            for j in range(applications_per_job):
+                session.add(Application(job_id=job.id, student_id=hr_id, viewed=j % 2 == 0))
+        await session.commit()
+
+
+async def my_jobs(client: httpx.AsyncClient) -> list:
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": HR_EMAIL, "role": "hr"})}
+    response = await client.get("/jobs/my", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def run():
+    await init_db()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await seed(jobs=3, applications_per_job=4)
+        with query_budget(MY_JOBS_QUERIES, max_repeats=1) as small:
+            jobs = await my_jobs(client)
+        assert len(jobs) == 3
+        assert {job["total_applications"] for job in jobs} == {4}
+        assert {job["unviewed_count"] for job in jobs} == {2}
+        # The hooks saw the async engine's statements, not an empty capture
+        assert small.queries == MY_JOBS_QUERIES, small.summary()
+
+        await seed(jobs=20, applications_per_job=10)
+        with query_budget(MY_JOBS_QUERIES, max_repeats=1) as large:
+            jobs = await my_jobs(client)
+        assert len(jobs) == 23
+        assert large.queries == small.queries, large.summary()
+
+        try:
+            with query_budget(MY_JOBS_QUERIES - 1):
+                await my_jobs(client)
+        except QueryBudgetExceeded:
+            pass
+        else:
+            raise AssertionError("query_budget did not fail a request over budget")
+
+
+def test_my_jobs_query_budget():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_my_jobs_query_budget()
+    print("✅ GET /jobs/my stays within its query budget")
@@ -0,0 +1,77 @@
+"""
+Token-bucket pruning (rate_limit.py) against a throwaway SQLite database:
+
+- a bucket idle for its policy's refill window is full again and is deleted;
+  a bucket still refilling is kept, with its tokens
+- a pruned key behaves like a fresh, full bucket
+- the per-process memory store prunes the same way
+
+    cd backend
+    python -m pytest test_rate_limit.py     (or: python test_rate_limit.py)
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="hiremind-rate-limit-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "rate-limit-test")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+os.environ["LOG_FILE"] = os.path.join(_workdir, "app.log")
+
+from sqlalchemy.future import select
+
+from database import async_session_maker, init_db
+from models import RateLimitBucket
+from rate_limit import POLICIES, DatabaseBucketStore, MemoryBucketStore
+
+LOGIN = POLICIES["auth_login"]
+LLM = POLICIES["llm"]
+
+
+async def stored_keys() -> set:
+    async with async_session_maker() as session:
+        return set((await session.execute(select(RateLimitBucket.key))).scalars().all())
+
+
+async def run():
+    await init_db()
+    now = time.time()
+    async with async_session_maker() as session:
+        session.add_all([
+            # Empty, but idle for longer than it takes to refill
+            RateLimitBucket(key="auth_login:ip:1.2.3.4", tokens=0, updated_at=now - LOGIN.refill_window - 1),
+            # Idle as long, but the llm window is much longer: still refilling
+            RateLimitBucket(key="llm:user:a@example.com", tokens=0, updated_at=now - LOGIN.refill_window - 1),
+            RateLimitBucket(key="llm:user:b@example.com", tokens=3, updated_at=now - LLM.refill_window - 1),
+            RateLimitBucket(key="auth_login:ip:5.6.7.8", tokens=1, updated_at=now),
+        ])
+        await session.commit()
+
+    store = DatabaseBucketStore()
+    assert await store.prune() == 2
+    assert await stored_keys() == {"llm:user:a@example.com", "auth_login:ip:5.6.7.8"}
+    assert await store.prune() == 0
+
+    # A pruned key starts over as a full bucket; a kept one still has its tokens
+    allowed, remaining = await store.take("auth_login:ip:1.2.3.4", LOGIN, 1)
+    assert allowed and remaining == LOGIN.capacity - 1
+    allowed, _ = await store.take("auth_login:ip:5.6.7.8", LOGIN, 2)
+    assert not allowed
+
+    memory = MemoryBucketStore()
+    await memory.take("auth_login:ip:1.2.3.4", LOGIN, 1)
+    await memory.take("llm:user:a@example.com", LLM, 1)
+    memory._buckets["auth_login:ip:1.2.3.4"] = (0, now - LOGIN.refill_window - 1)
+    assert await memory.prune() == 1
+    assert set(memory._buckets) == {"llm:user:a@example.com"}
+
+
+def test_prune_idle_buckets():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_prune_idle_buckets()
+    print("✅ Idle full rate limit buckets are pruned, refilling ones are kept")
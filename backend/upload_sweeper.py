@@ -0,0 +1,267 @@
+"""
+Upload Sweeper
+Background reconciliation of stored files against the rows that reference them.
+delete_job / delete_account and replaced profile photos, resumes and policies
+leave files behind; the sweeper finds them and deletes them.
+
+- Walks storage keys in lexical order, SWEEP_BATCH_SIZE keys per step. One
+  walk (storage.scan) is kept open across the steps of a pass, so a pass reads
+  every directory once; after an error it restarts from the cursor. Each step
+  is one page plus one indexed IN lookup per referencing column (no table
+  scans, no long transactions)
+- A file is orphaned when no User.profile_picture / resume_path /
+  company_policy_path, Job.policy_path or Application.resume_path points at it.
+  It is deleted once it is older than SWEEP_GRACE_HOURS, because uploads are
+  written before the row referencing them is committed
+- Content-addressed resumes also need their StoredBlob row untouched for the
+  grace period (a duplicate upload may be about to reference it); the row is
+  deleted together with the file
+- Derived variants ("<key>@<suffix>", e.g. avatar sizes) live and die with
+  their original
+- Only keys the API generates are considered (pfp_, resume_, policy_, resumes/),
+  so bundled sample files are never removed
+- Every complete pass stores usage per owner (profile files, policies of the
+  HR's jobs, resumes of the candidate's applications) in StorageUsage, so every
+  worker reports the same numbers, plus totals
+- One worker sweeps at a time: each step renews the "upload_sweeper" lease
+  (leases.py), which the sweeper keeps through the pause after a pass; the
+  other workers only retry the lease
+
+  SWEEPER_ENABLED=true, SWEEP_GRACE_HOURS=24, SWEEP_BATCH_SIZE=200,
+  SWEEP_BATCH_INTERVAL=1 (seconds between steps), SWEEP_PASS_INTERVAL=3600,
+  SWEEP_DRY_RUN=false (report orphans without deleting them)
+"""
+import asyncio
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.future import select
+
+from database import async_session_maker
+from models import Application, Job, ResumePreview, StorageUsage, StoredBlob, User
+from leases import LEASE_TTL, acquire
+from storage import storage, to_path, BlobInfo
+from blobs import RESUME_PREFIX
+from images import variant_base
+from metrics import UPLOAD_STORAGE_BYTES, UPLOAD_STORAGE_FILES, UPLOAD_SWEEP_DELETED
+
+SWEEPER_ENABLED = os.getenv("SWEEPER_ENABLED", "true").lower() == "true"
+SWEEP_GRACE_HOURS = float(os.getenv("SWEEP_GRACE_HOURS", "24"))
+SWEEP_BATCH_SIZE = int(os.getenv("SWEEP_BATCH_SIZE", "200"))
+SWEEP_BATCH_INTERVAL = float(os.getenv("SWEEP_BATCH_INTERVAL", "1"))
+SWEEP_PASS_INTERVAL = float(os.getenv("SWEEP_PASS_INTERVAL", "3600"))
+SWEEP_DRY_RUN = os.getenv("SWEEP_DRY_RUN", "false").lower() == "true"
+
+SWEEPABLE_PREFIXES = ("pfp_", "resume_", "policy_", RESUME_PREFIX)
+
+# (path column, owner column) pairs that keep a stored file alive
+REFERENCES = [
+    (User.profile_picture, User.id),
+    (User.resume_path, User.id),
+    (User.company_policy_path, User.id),
+    (Job.policy_path, Job.hr_id),
+    (Application.resume_path, Application.student_id),
+]
+
+TOP_OWNERS = 20
+LEASE_NAME = "upload_sweeper"
+
+
+class UploadSweeper:
+    def __init__(self, batch_size: int = SWEEP_BATCH_SIZE, grace: timedelta = timedelta(hours=SWEEP_GRACE_HOURS),
+                 dry_run: bool = SWEEP_DRY_RUN):
+        self.batch_size = batch_size
+        self.grace = grace
+        self.dry_run = dry_run
+        self.cursor: Optional[str] = None
+        self._pages: Optional[AsyncIterator[List[BlobInfo]]] = None
+        self.passes = 0
+        self.last_pass: Optional[dict] = None
+        self.leader = False
+        self._reset_pass()
+
+    def _reset_pass(self):
+        self._started = time.time()
+        self._owners: Dict[int, Dict[str, int]] = defaultdict(lambda: {"bytes": 0, "files": 0})
+        self._totals = {state: {"bytes": 0, "files": 0} for state in ("referenced", "grace", "orphaned")}
+        self._deleted = {"files": 0, "bytes": 0}
+
+    async def _references(self, paths: List[str]) -> Dict[str, Set[int]]:
+        """path -> owner ids, one indexed IN query per referencing column"""
+        owners: Dict[str, Set[int]] = defaultdict(set)
+        async with async_session_maker() as session:
+            for column, owner in REFERENCES:
+                result = await session.execute(select(column, owner).where(column.in_(paths)))
+                for path, owner_id in result.all():
+                    owners[path].add(owner_id)
+        return owners
+
+    async def _delete_orphans(self, orphans: List[BlobInfo], cutoff: datetime) -> List[BlobInfo]:
+        """Drop StoredBlob rows for orphaned resumes (unless recently touched); returns what may be deleted"""
+        blob_keys = [info.key for info in orphans if info.key.startswith(RESUME_PREFIX)]
+        if not blob_keys:
+            return orphans
+
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(StoredBlob.key).where(StoredBlob.key.in_(blob_keys), StoredBlob.updated_at >= cutoff)
+            )
+            recent = set(result.scalars().all())
+            stale = [key for key in blob_keys if key not in recent]
+            if stale and not self.dry_run:
+                stale_hashes = (await session.execute(select(StoredBlob.sha256).where(StoredBlob.key.in_(stale)))).scalars().all()
+                await session.execute(delete(ResumePreview).where(ResumePreview.sha256.in_(stale_hashes)))
+                await session.execute(delete(StoredBlob).where(StoredBlob.key.in_(stale)))
+                await session.commit()
+        return [info for info in orphans if info.key not in recent]
+
+    async def step(self) -> bool:
+        """Reconcile one batch of keys; returns True when a full pass just completed"""
+        if self._pages is None:
+            self._pages = storage.scan(start_after=self.cursor, page_size=self.batch_size)
+        try:
+            batch = await self._pages.__anext__()
+        except StopAsyncIteration:
+            batch = []
+        except Exception:
+            self._pages = None  # a failed walk can't continue; the next step resumes from the cursor
+            raise
+        if not batch:
+            await self._finish_pass()
+            return True
+        self.cursor = batch[-1].key
+
+        batch = [info for info in batch if info.key.startswith(SWEEPABLE_PREFIXES)]
+        if batch:
+            references = await self._references(list({to_path(variant_base(info.key)) for info in batch}))
+            cutoff = datetime.now(timezone.utc) - self.grace
+            orphans = []
+            for info in batch:
+                owners = references.get(to_path(variant_base(info.key)))
+                if owners:
+                    self._count("referenced", info)
+                    for owner_id in owners:
+                        self._owners[owner_id]["bytes"] += info.size
+                        self._owners[owner_id]["files"] += 1
+                elif info.modified > cutoff:
+                    self._count("grace", info)
+                else:
+                    self._count("orphaned", info)
+                    orphans.append(info)
+
+            if orphans:
+                deletable = await self._delete_orphans(orphans, cutoff.replace(tzinfo=None))
+                for info in deletable:
+                    if self.dry_run:
+                        continue
+                    await storage.delete(info.key)
+                    self._deleted["files"] += 1
+                    self._deleted["bytes"] += info.size
+                    UPLOAD_SWEEP_DELETED.inc()
+                if deletable and not self.dry_run:
+                    print(f"🧹 Upload sweeper deleted {len(deletable)} orphaned files")
+
+        return False
+
+    def _count(self, state: str, info: BlobInfo):
+        self._totals[state]["bytes"] += info.size
+        self._totals[state]["files"] += 1
+
+    async def _finish_pass(self):
+        now = datetime.utcnow()
+        async with async_session_maker() as session:
+            await session.execute(delete(StorageUsage))
+            if self._owners:
+                await session.execute(insert(StorageUsage), [
+                    {"user_id": owner_id, "bytes": usage["bytes"], "files": usage["files"], "updated_at": now}
+                    for owner_id, usage in self._owners.items()
+                ])
+            await session.commit()
+
+        top = sorted(self._owners.items(), key=lambda item: item[1]["bytes"], reverse=True)[:TOP_OWNERS]
+        self.last_pass = {
+            "finished_at": now.isoformat(),
+            "duration_s": round(time.time() - self._started, 2),
+            "dry_run": self.dry_run,
+            "totals": self._totals,
+            "deleted": self._deleted,
+            "owners": len(self._owners),
+            "top_owners": [{"user_id": owner_id, **usage} for owner_id, usage in top],
+        }
+        for state, usage in self._totals.items():
+            UPLOAD_STORAGE_BYTES.set(usage["bytes"], state=state)
+            UPLOAD_STORAGE_FILES.set(usage["files"], state=state)
+        self.passes += 1
+        self.cursor = None
+        self._pages = None
+        self._reset_pass()
+
+    async def run_pass(self) -> dict:
+        """Sweep everything now (tests / manual runs)"""
+        while not await self.step():
+            pass
+        return self.last_pass
+
+    def _abandon_pass(self):
+        """Another worker took over: its pass replaces the one this worker had started"""
+        self.cursor = None
+        self._pages = None
+        self._reset_pass()
+
+    async def owner_usage(self, user_id: int) -> dict:
+        """Bytes/files attributed to one user in the last complete pass (by any worker)"""
+        async with async_session_maker() as session:
+            usage = await session.get(StorageUsage, user_id)
+        if usage is None:
+            return {"bytes": 0, "files": 0, "as_of": None}
+        return {"bytes": usage.bytes, "files": usage.files, "as_of": usage.updated_at.isoformat()}
+
+    async def snapshot(self) -> dict:
+        async with async_session_maker() as session:
+            owners, total, as_of = (await session.execute(
+                select(func.count(), func.coalesce(func.sum(StorageUsage.bytes), 0), func.max(StorageUsage.updated_at))
+            )).one()
+            top = (await session.execute(
+                select(StorageUsage.user_id, StorageUsage.bytes, StorageUsage.files)
+                .order_by(StorageUsage.bytes.desc()).limit(TOP_OWNERS)
+            )).all()
+        return {
+            "enabled": SWEEPER_ENABLED,
+            "leader": self.leader,
+            "passes": self.passes,
+            "cursor": self.cursor,
+            "last_pass": self.last_pass,
+            "usage": {
+                "owners": owners,
+                "bytes": int(total),
+                "as_of": as_of.isoformat() if isinstance(as_of, datetime) else as_of,
+                "top_owners": [{"user_id": user_id, "bytes": size, "files": files} for user_id, size, files in top],
+            },
+        }
+
+    async def run_forever(self):
+        while True:
+            try:
+                self.leader = await acquire(LEASE_NAME)
+                if not self.leader:
+                    self._abandon_pass()
+                    await asyncio.sleep(LEASE_TTL)
+                    continue
+                finished = await self.step()
+                if finished:
+                    # Hold the lease through the pause so no other worker starts a pass early
+                    await acquire(LEASE_NAME, SWEEP_PASS_INTERVAL + LEASE_TTL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Back off for a full pass interval, then resume from the same cursor
+                print(f"❌ Upload sweeper error: {e}")
+                finished = True
+            await asyncio.sleep(SWEEP_PASS_INTERVAL if finished else SWEEP_BATCH_INTERVAL)
+
+
+upload_sweeper = UploadSweeper()
@@ -1,16 +1,22 @@
 import io
+import time
 from pypdf import PdfReader
 from typing import Tuple
 
+from metrics import PDF_PARSE_SECONDS
+
 def extract_text_from_pdf(file_content: bytes) -> str:
+    start = time.perf_counter()
     try:
         pdf_file = io.BytesIO(file_content)
         reader = PdfReader(pdf_file)
         text = ""
         for page in reader.pages:
             text += page.extract_text()
+        PDF_PARSE_SECONDS.observe(time.perf_counter() - start, result="ok")
         return text
     except Exception as e:
+        PDF_PARSE_SECONDS.observe(time.perf_counter() - start, result="error")
         print(f"Error reading PDF: {e}")
         return ""
 
@@ -14,11 +14,12 @@ import Profile from './components/dashboard/Profile';
 import InterviewChat from './components/dashboard/InterviewChat';
 import Settings from './components/dashboard/Settings';
 
+const ATS_HISTORY_PAGE_SIZE = 20;
+
 const CandidateDashboard = () => {
     const navigate = useNavigate();
     const { addNotification } = useNotification();
     const [activeTab, setActiveTab] = useState('jobs'); // 'jobs' | 'chat' | 'ats' | 'profile' | 'applications'
-    const [jobs, setJobs] = useState([]);
     const [selectedJob, setSelectedJob] = useState(null);
     const [applicationId, setApplicationId] = useState(null);
     const [hasResume, setHasResume] = useState(false);
@@ -32,6 +33,7 @@ const CandidateDashboard = () => {
     const [atsJd, setAtsJd] = useState('');
     const [atsJobTitle, setAtsJobTitle] = useState('');
     const [atsHistory, setAtsHistory] = useState([]);
+    const [atsHistoryCursor, setAtsHistoryCursor] = useState(null);
     const [pdfPreviewUrl, setPdfPreviewUrl] = useState(null);
 
     // Applications State
@@ -57,29 +59,35 @@ const CandidateDashboard = () => {
         scrollToBottom();
     }, [messages]);
 
-    useEffect(() => {
-        fetchJobs();
-    }, []);
-
-    const fetchJobs = async () => {
+    // First page replaces the list; passing the last page's cursor appends older entries
+    const fetchAtsHistory = async (cursor = null) => {
         try {
-            const response = await axios.get(`${API_URL}/jobs/`);
-            setJobs(response.data);
+            const token = localStorage.getItem('token');
+            if (!token) return;
+            const response = await axios.get(`${API_URL}/ats/history`, {
+                headers: { Authorization: `Bearer ${token}` },
+                params: { limit: ATS_HISTORY_PAGE_SIZE, cursor: cursor || undefined }
+            });
+            setAtsHistory(prev => cursor ? [...prev, ...response.data.items] : response.data.items);
+            setAtsHistoryCursor(response.data.next_cursor);
         } catch (error) {
-            console.error("Failed to fetch jobs", error);
+            console.error("Failed to fetch ATS history", error);
         }
     };
 
-    const fetchAtsHistory = async () => {
+    // Past analyses are loaded on demand and shown in the result panel
+    const handleViewAtsAnalysis = async (analysisId) => {
         try {
             const token = localStorage.getItem('token');
-            if (!token) return;
-            const response = await axios.get(`${API_URL}/ats/history`, {
+            const response = await axios.get(`${API_URL}/ats/history/${analysisId}`, {
                 headers: { Authorization: `Bearer ${token}` }
             });
-            setAtsHistory(response.data);
+            setPdfPreviewUrl(null);
+            setAtsJobTitle(response.data.job_title);
+            setAtsResult({ ...response.data.analysis, score: response.data.score });
         } catch (error) {
-            console.error("Failed to fetch ATS history", error);
+            console.error("Failed to load ATS analysis", error);
+            addNotification('error', "Failed to load this analysis. Please try again.");
         }
     };
 
@@ -148,7 +156,6 @@ const CandidateDashboard = () => {
     };
 
     useEffect(() => {
-        fetchJobs();
         fetchAtsHistory();
         fetchMyApplications();
         fetchProfile();
@@ -503,7 +510,6 @@ const CandidateDashboard = () => {
                     {/* JOB BOARD VIEW */}
                     {activeTab === 'jobs' && (
                         <JobBoard
-                            jobs={jobs}
                             searchQuery={searchQuery}
                             myApplications={myApplications}
                             handleApply={handleApply}
@@ -523,6 +529,9 @@ const CandidateDashboard = () => {
                             atsResult={atsResult}
                             pdfPreviewUrl={pdfPreviewUrl}
                             atsHistory={atsHistory}
+                            hasMoreAtsHistory={Boolean(atsHistoryCursor)}
+                            onLoadMoreAtsHistory={() => fetchAtsHistory(atsHistoryCursor)}
+                            onViewAtsAnalysis={handleViewAtsAnalysis}
                         />
                     )}
 
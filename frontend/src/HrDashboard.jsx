@@ -38,6 +38,9 @@ const HrDashboard = () => {
     const [myJobs, setMyJobs] = useState([]);
     const [selectedJob, setSelectedJob] = useState(null);
     const [applications, setApplications] = useState([]);
+    const [applicationsTotal, setApplicationsTotal] = useState(0);
+    const [applicationsPage, setApplicationsPage] = useState(1);
+    const [applicantSort, setApplicantSort] = useState('ats_score');
     const [user, setUser] = useState(null);
     const [isMobileMenuOpen, setIsMobileMenuOpen] = useState(false);
 
@@ -126,13 +129,20 @@ const HrDashboard = () => {
         }
     };
 
-    const fetchApplications = async (jobId) => {
+    const APPLICANTS_PAGE_SIZE = 50;
+
+    // Server-side paging: page 1 replaces the list, later pages append ("Load more")
+    const fetchApplications = async (jobId, page = 1, sort = applicantSort) => {
         const token = localStorage.getItem('token');
         try {
             const response = await axios.get(`${API_URL}/jobs/${jobId}/applications`, {
-                headers: { Authorization: `Bearer ${token}` }
+                headers: { Authorization: `Bearer ${token}` },
+                params: { page, page_size: APPLICANTS_PAGE_SIZE, sort, order: 'desc' }
             });
-            setApplications(response.data);
+            const { applications: pageItems, total } = response.data;
+            setApplications(prevApps => page === 1 ? pageItems : [...prevApps, ...pageItems]);
+            setApplicationsTotal(total);
+            setApplicationsPage(page);
         } catch (error) {
             console.error("Failed to fetch applications", error);
         }
@@ -177,6 +187,7 @@ const HrDashboard = () => {
     const handleBackToJobs = () => {
         setSelectedJob(null);
         setApplications([]);
+        setApplicationsTotal(0);
         setSelectedAppId(null);
     };
 
@@ -185,6 +196,15 @@ const HrDashboard = () => {
         fetchApplications(job.id);
     };
 
+    const handleLoadMoreApplicants = () => {
+        if (selectedJob) fetchApplications(selectedJob.id, applicationsPage + 1);
+    };
+
+    const handleApplicantSortChange = (sort) => {
+        setApplicantSort(sort);
+        if (selectedJob) fetchApplications(selectedJob.id, 1, sort);
+    };
+
     const handleInputChange = (e) => {
         setFormData({ ...formData, [e.target.name]: e.target.value });
     };
@@ -320,10 +340,16 @@ const HrDashboard = () => {
     const handleDeleteJob = async (jobId) => {
         const token = localStorage.getItem('token');
         try {
-            await axios.delete(`${API_URL}/jobs/${jobId}`, {
+            const response = await axios.delete(`${API_URL}/jobs/${jobId}`, {
                 headers: { Authorization: `Bearer ${token}` }
             });
-            showNotification("Job deleted successfully.", 'success');
+            // 202: very large jobs are hidden right away and their applicants removed in the background
+            showNotification(
+                response.status === 202
+                    ? `Job removed. Deleting ${response.data.total} applications in the background.`
+                    : "Job deleted successfully.",
+                'success'
+            );
             fetchMyJobs(); // Refresh list
         } catch (error) {
             console.error(error);
@@ -346,6 +372,19 @@ const HrDashboard = () => {
         }
     };
 
+    // Resume excerpt with the ATS-matched keywords marked (offsets come from the backend)
+    const renderHighlightedExcerpt = ({ excerpt = '', highlights = [] }) => {
+        const parts = [];
+        let pos = 0;
+        highlights.forEach((h, i) => {
+            if (h.start > pos) parts.push(excerpt.slice(pos, h.start));
+            parts.push(<mark key={i} className="bg-yellow-100 text-gray-900 rounded px-0.5">{excerpt.slice(h.start, h.end)}</mark>);
+            pos = h.end;
+        });
+        parts.push(excerpt.slice(pos));
+        return parts;
+    };
+
     // Render detailed view using a clean slide-over or modal style
     const renderApplicationDetail = () => {
         if (!selectedAppDetail) return null;
@@ -534,16 +573,30 @@ const HrDashboard = () => {
                         </div>
                     </div>
 
-                    {/* 3. Resume Text Dump (Collapsed or Scrollable) */}
-                    {/* <div>
-                        <h3 className="text-lg font-bold text-gray-800 mb-4 flex items-center gap-2">
-                            <FileText size={20} className="text-gray-600" />
-                            Parsed Resume Content
-                        </h3>
-                        <div className="bg-gray-50 rounded-xl p-4 border border-gray-200 max-h-[200px] overflow-y-auto text-xs text-gray-600 font-mono whitespace-pre-wrap">
-                            {selectedAppDetail.resume_text || "No text content available."}
+                    {/* 3. Resume Preview (first page + highlighted excerpt, no PDF download) */}
+                    {selectedAppDetail.resume_preview?.status === 'ready' && (
+                        <div>
+                            <h3 className="text-lg font-bold text-gray-800 mb-4 flex items-center gap-2">
+                                <FileText size={20} className="text-gray-600" />
+                                Resume Preview
+                            </h3>
+                            <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
+                                {selectedAppDetail.resume_preview.image && (
+                                    <img
+                                        src={`${API_URL}/${selectedAppDetail.resume_preview.image}`}
+                                        width={selectedAppDetail.resume_preview.width}
+                                        height={selectedAppDetail.resume_preview.height}
+                                        alt="Resume first page"
+                                        loading="lazy"
+                                        className="w-full h-auto rounded-xl border border-gray-200 shadow-sm"
+                                    />
+                                )}
+                                <div className="bg-gray-50 rounded-xl p-4 border border-gray-200 max-h-[400px] overflow-y-auto text-xs text-gray-600 whitespace-pre-wrap">
+                                    {renderHighlightedExcerpt(selectedAppDetail.resume_preview)}
+                                </div>
+                            </div>
                         </div>
-                     </div> */}
+                    )}
                 </div>
             </div>
         );
@@ -623,6 +676,10 @@ const HrDashboard = () => {
                                     selectedJob={selectedJob}
                                     handleBackToJobs={handleBackToJobs}
                                     applications={applications}
+                                    applicationsTotal={applicationsTotal}
+                                    handleLoadMoreApplicants={handleLoadMoreApplicants}
+                                    applicantSort={applicantSort}
+                                    handleApplicantSortChange={handleApplicantSortChange}
                                     handleUpdateStatus={handleUpdateStatus}
                                     fetchApplicationDetail={fetchApplicationDetail}
                                     handleUpdateJob={handleUpdateJob}
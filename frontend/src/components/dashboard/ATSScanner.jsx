@@ -11,7 +11,10 @@ const ATSScanner = ({
     atsLoading,
     atsResult,
     pdfPreviewUrl,
-    atsHistory
+    atsHistory,
+    hasMoreAtsHistory,
+    onLoadMoreAtsHistory,
+    onViewAtsAnalysis
 }) => {
     return (
         <div className="h-full overflow-y-auto p-8">
@@ -164,7 +167,7 @@ const ATSScanner = ({
                                         </tr>
                                     ) : (
                                         atsHistory.map((item) => (
-                                            <tr key={item.id} className="border-b hover:bg-gray-50">
+                                            <tr key={item.id} onClick={() => onViewAtsAnalysis(item.id)} className="border-b hover:bg-gray-50 cursor-pointer">
                                                 <td className="px-6 py-4 font-medium text-gray-900">{item.job_title}</td>
                                                 <td className="px-6 py-4">
                                                     <span className={`px-2 py-1 rounded-full text-xs font-bold ${item.score > 70 ? 'bg-green-100 text-green-700' : item.score > 40 ? 'bg-yellow-100 text-yellow-700' : 'bg-red-100 text-red-700'}`}>
@@ -186,7 +189,7 @@ const ATSScanner = ({
                             ) : (
                                 <div className="divide-y divide-gray-100">
                                     {atsHistory.map((item) => (
-                                        <div key={item.id} className="p-4 flex justify-between items-center">
+                                        <div key={item.id} onClick={() => onViewAtsAnalysis(item.id)} className="p-4 flex justify-between items-center cursor-pointer hover:bg-gray-50">
                                             <div>
                                                 <h4 className="font-bold text-gray-900 text-sm">{item.job_title}</h4>
                                                 <p className="text-xs text-gray-500">{new Date(item.created_at).toLocaleDateString()}</p>
@@ -199,6 +202,17 @@ const ATSScanner = ({
                                 </div>
                             )}
                         </div>
+
+                        {hasMoreAtsHistory && (
+                            <div className="p-4 text-center border-t border-gray-100">
+                                <button
+                                    onClick={onLoadMoreAtsHistory}
+                                    className="px-5 py-2 text-sm font-bold text-indigo-600 hover:bg-indigo-50 rounded-xl transition"
+                                >
+                                    Load older analyses
+                                </button>
+                            </div>
+                        )}
                     </div>
                 </div>
             </div>
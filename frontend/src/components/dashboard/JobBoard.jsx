@@ -1,98 +1,177 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
+import axios from 'axios';
 import { Search, Briefcase, Filter } from 'lucide-react';
 import JobCard from './JobCard';
+import { API_URL } from '../../config';
 
-const JobBoard = ({ jobs, searchQuery, myApplications, handleApply }) => {
+const PAGE_SIZE = 30;
+
+const EXPERIENCE_LABELS = { '0': 'Freshers', '1-2': '1-2 Years', '3-5': '3-5 Years', '6+': '6+ Years' };
+
+// Facet dropdown: options come from the server's facet counts for the current search
+const FacetSelect = ({ label, value, counts, onChange, formatOption = (v) => v }) => (
+    <select
+        value={value}
+        onChange={(e) => onChange(e.target.value)}
+        className="appearance-none w-full md:w-auto bg-white border border-gray-200 text-gray-700 py-2 pl-4 pr-8 rounded-xl focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent font-medium text-sm cursor-pointer shadow-sm hover:border-gray-300 transition-colors"
+    >
+        <option value="">{label}</option>
+        {Object.entries(counts || {}).map(([option, count]) => (
+            <option key={option} value={option}>{formatOption(option)} ({count})</option>
+        ))}
+    </select>
+);
+
+const JobBoard = ({ searchQuery, myApplications, handleApply }) => {
     const [filterStatus, setFilterStatus] = useState('all'); // 'all' | 'applied' | 'unapplied'
+    const [facetFilters, setFacetFilters] = useState({ job_type: '', work_location: '', experience: '' });
+    const [jobs, setJobs] = useState([]);
+    const [total, setTotal] = useState(0);
+    const [page, setPage] = useState(1);
+    const [facets, setFacets] = useState({});
+    const [corrections, setCorrections] = useState({});
+    const [loading, setLoading] = useState(true);
+
     // Coerce IDs to strings to avoid mismatched types (e.g. string vs number)
     const appliedJobIds = new Set(myApplications.map(app => String(app.job_id)));
 
-    const filteredJobs = jobs.filter(job => {
-        // 1. Search Filter
-        const matchesSearch =
-            job.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
-            job.company.toLowerCase().includes(searchQuery.toLowerCase()) ||
-            job.location.toLowerCase().includes(searchQuery.toLowerCase()) ||
-            job.job_type.toLowerCase().includes(searchQuery.toLowerCase());
-
-        // 2. Status Filter
-        const isApplied = appliedJobIds.has(String(job.id));
-        let matchesStatus = true;
-
-        if (filterStatus === 'applied') {
-            matchesStatus = isApplied;
-        } else if (filterStatus === 'unapplied') {
-            matchesStatus = !isApplied;
+    const fetchJobs = async (pageToLoad) => {
+        setLoading(true);
+        try {
+            const params = { q: searchQuery, page: pageToLoad, page_size: PAGE_SIZE };
+            Object.entries(facetFilters).forEach(([name, value]) => { if (value) params[name] = value; });
+            const response = await axios.get(`${API_URL}/jobs/search`, { params });
+            setJobs(prevJobs => pageToLoad === 1 ? response.data.results : [...prevJobs, ...response.data.results]);
+            setTotal(response.data.total);
+            setFacets(response.data.facets);
+            setCorrections(response.data.corrections);
+            setPage(pageToLoad);
+        } catch (error) {
+            console.error("Failed to search jobs", error);
+        } finally {
+            setLoading(false);
         }
+    };
+
+    // Search server-side; debounce so typing doesn't send a request per keystroke
+    useEffect(() => {
+        const timer = setTimeout(() => fetchJobs(1), 250);
+        return () => clearTimeout(timer);
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [searchQuery, facetFilters]);
 
-        return matchesSearch && matchesStatus;
+    const setFacet = (name) => (value) => setFacetFilters(prev => ({ ...prev, [name]: value }));
+
+    // Applied / not applied is per candidate, so it stays a client-side filter on the loaded results
+    const filteredJobs = jobs.filter(job => {
+        const isApplied = appliedJobIds.has(String(job.id));
+        if (filterStatus === 'applied') return isApplied;
+        if (filterStatus === 'unapplied') return !isApplied;
+        return true;
     }).sort((a, b) => {
         const isAppliedA = appliedJobIds.has(String(a.id));
         const isAppliedB = appliedJobIds.has(String(b.id));
         if (isAppliedA === isAppliedB) return 0;
-        return isAppliedA ? 1 : -1; // Unapplied (false) comes first
+        return isAppliedA ? 1 : -1; // Unapplied (false) comes first; the server's ranking is kept otherwise
     });
 
-    if (filteredJobs.length === 0 && searchQuery) {
-        return (
-            <div className="h-full overflow-y-auto p-8 text-center text-gray-500">
-                <Search size={48} className="mx-auto mb-4 opacity-20" />
-                <h3 className="text-xl font-bold text-gray-700">No Jobs Found</h3>
-                <p>Try adjusting your search terms</p>
-            </div>
-        );
-    }
+    const correctedWords = Object.entries(corrections);
 
-    if (filteredJobs.length === 0 && filterStatus !== 'all') {
-        return (
-            <div className="h-full overflow-y-auto p-8 text-center text-gray-500">
-                <Filter size={48} className="mx-auto mb-4 opacity-20" />
-                <h3 className="text-xl font-bold text-gray-700">No Jobs Match Filter</h3>
-                <p>Try changing your filter to "All Jobs"</p>
-            </div>
-        );
-    }
-
-    if (filteredJobs.length === 0) {
+    const renderEmptyState = () => {
+        if (loading) {
+            return <div className="p-8 text-center text-gray-400">Searching...</div>;
+        }
+        if (searchQuery || Object.values(facetFilters).some(Boolean)) {
+            return (
+                <div className="p-8 text-center text-gray-500">
+                    <Search size={48} className="mx-auto mb-4 opacity-20" />
+                    <h3 className="text-xl font-bold text-gray-700">No Jobs Found</h3>
+                    <p>Try adjusting your search terms or filters</p>
+                </div>
+            );
+        }
+        if (filterStatus !== 'all') {
+            return (
+                <div className="p-8 text-center text-gray-500">
+                    <Filter size={48} className="mx-auto mb-4 opacity-20" />
+                    <h3 className="text-xl font-bold text-gray-700">No Jobs Match Filter</h3>
+                    <p>Try changing your filter to "All Jobs"</p>
+                </div>
+            );
+        }
         return (
-            <div className="h-full overflow-y-auto p-8 text-center text-gray-500">
+            <div className="p-8 text-center text-gray-500">
                 <Briefcase size={48} className="mx-auto mb-4 opacity-20" />
                 <h3 className="text-xl font-bold text-gray-700">No Openings Found</h3>
                 <p>Check back later for new opportunities.</p>
             </div>
         );
-    }
+    };
 
     return (
         <div className="h-full overflow-y-auto p-8">
             <div className="flex flex-col md:flex-row justify-between items-start md:items-center mb-6 gap-4">
-                <h2 className="text-2xl font-bold text-gray-800 font-sans">Available Opportunities</h2>
-
-                {/* Filter Dropdown */}
-                <div className="relative w-full md:w-auto">
-                    <select
-                        value={filterStatus}
-                        onChange={(e) => setFilterStatus(e.target.value)}
-                        className="appearance-none w-full md:w-auto bg-white border border-gray-200 text-gray-700 py-2 pl-4 pr-10 rounded-xl focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent font-medium text-sm cursor-pointer shadow-sm hover:border-gray-300 transition-colors"
-                    >
-                        <option value="all">All Jobs</option>
-                        <option value="applied">Applied</option>
-                        <option value="unapplied">Not Applied</option>
-                    </select>
-                    <Filter size={16} className="absolute right-3 top-1/2 -translate-y-1/2 text-gray-400 pointer-events-none" />
+                <div>
+                    <h2 className="text-2xl font-bold text-gray-800 font-sans">Available Opportunities</h2>
+                    {correctedWords.length > 0 && (
+                        <p className="text-sm text-gray-500 mt-1">
+                            Showing results for {correctedWords.map(([typed, corrected]) => (
+                                <span key={typed} className="font-semibold text-indigo-600 mr-1">{corrected}</span>
+                            ))}
+                        </p>
+                    )}
                 </div>
-            </div>
 
-            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                {filteredJobs.map(job => (
-                    <JobCard
-                        key={job.id}
-                        job={job}
-                        myApplications={myApplications}
-                        handleApply={handleApply}
+                {/* Filters */}
+                <div className="flex flex-wrap gap-2 w-full md:w-auto">
+                    <FacetSelect label="All Types" value={facetFilters.job_type} counts={facets.job_type} onChange={setFacet('job_type')} />
+                    <FacetSelect label="Any Location" value={facetFilters.work_location} counts={facets.work_location} onChange={setFacet('work_location')} />
+                    <FacetSelect
+                        label="Any Experience"
+                        value={facetFilters.experience}
+                        counts={facets.experience}
+                        onChange={setFacet('experience')}
+                        formatOption={(bucket) => EXPERIENCE_LABELS[bucket] || bucket}
                     />
-                ))}
+                    <div className="relative w-full md:w-auto">
+                        <select
+                            value={filterStatus}
+                            onChange={(e) => setFilterStatus(e.target.value)}
+                            className="appearance-none w-full md:w-auto bg-white border border-gray-200 text-gray-700 py-2 pl-4 pr-10 rounded-xl focus:outline-none focus:ring-2 focus:ring-indigo-500 focus:border-transparent font-medium text-sm cursor-pointer shadow-sm hover:border-gray-300 transition-colors"
+                        >
+                            <option value="all">All Jobs</option>
+                            <option value="applied">Applied</option>
+                            <option value="unapplied">Not Applied</option>
+                        </select>
+                        <Filter size={16} className="absolute right-3 top-1/2 -translate-y-1/2 text-gray-400 pointer-events-none" />
+                    </div>
+                </div>
             </div>
+
+            {filteredJobs.length === 0 ? renderEmptyState() : (
+                <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+                    {filteredJobs.map(job => (
+                        <JobCard
+                            key={job.id}
+                            job={job}
+                            myApplications={myApplications}
+                            handleApply={handleApply}
+                        />
+                    ))}
+                </div>
+            )}
+
+            {jobs.length < total && (
+                <div className="mt-8 text-center">
+                    <button
+                        onClick={() => fetchJobs(page + 1)}
+                        disabled={loading}
+                        className="px-5 py-2.5 text-sm font-bold text-indigo-600 bg-white border border-gray-200 hover:bg-indigo-50 rounded-xl shadow-sm transition disabled:opacity-50"
+                    >
+                        {loading ? 'Loading...' : `Load more (${total - jobs.length} remaining)`}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
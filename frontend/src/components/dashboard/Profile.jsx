@@ -1,6 +1,6 @@
 import React from 'react';
 import { User, UploadCloud, FileText } from 'lucide-react';
-import { API_URL } from '../../config';
+import { API_URL, avatarUrl } from '../../config';
 
 const Profile = ({
     profile,
@@ -33,7 +33,7 @@ const Profile = ({
                                 <img src={previewUrl} alt="Preview" className="w-full h-full object-cover" />
                             ) : profile.profile_picture ? (
                                 <img
-                                    src={profile.profile_picture.startsWith('http') ? profile.profile_picture : `${API_URL}/${profile.profile_picture}`}
+                                    src={avatarUrl(profile, 256)}
                                     alt="Profile"
                                     className="w-full h-full object-cover"
                                     onError={(e) => { e.target.onerror = null; e.target.src = 'https://via.placeholder.com/150'; }}
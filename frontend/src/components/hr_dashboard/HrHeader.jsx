@@ -1,6 +1,6 @@
 import React from 'react';
 import { Search, User, ChevronRight, ArrowLeft, Menu } from 'lucide-react';
-import { API_URL } from '../../config';
+import { avatarUrl } from '../../config';
 
 const HrHeader = ({
     activeTab,
@@ -66,7 +66,7 @@ const HrHeader = ({
                     <div className="w-10 h-10 rounded-xl overflow-hidden bg-indigo-100 flex items-center justify-center text-indigo-600">
                         {user?.profile_picture ? (
                             <img
-                                src={user.profile_picture.startsWith('http') ? user.profile_picture : `${API_URL}/${user.profile_picture}`}
+                                src={avatarUrl(user, 64)}
                                 alt="Profile"
                                 className="w-full h-full object-cover"
                                 onError={(e) => { e.target.onerror = null; e.target.src = 'https://via.placeholder.com/150' }}
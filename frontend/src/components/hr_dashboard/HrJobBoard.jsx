@@ -10,6 +10,10 @@ const HrJobBoard = ({
     selectedJob,
     handleBackToJobs,
     applications,
+    applicationsTotal,
+    handleLoadMoreApplicants,
+    applicantSort,
+    handleApplicantSortChange,
     handleUpdateStatus, // We might need to pass this down or handle it in a parent/sub-component
     fetchApplicationDetail, // Or this
     renderApplicationDetail, // This is a function that returns JSX
@@ -180,6 +184,22 @@ const HrJobBoard = ({
             <div>
                 {/* Header for Applicant List is handled by HrHeader now */}
 
+                <div className="flex justify-between items-center mb-3 text-sm text-gray-500">
+                    <span>{applicationsTotal} Applicants</span>
+                    <label className="flex items-center gap-2">
+                        Sort by
+                        <select
+                            value={applicantSort}
+                            onChange={(e) => handleApplicantSortChange(e.target.value)}
+                            className="px-3 py-1.5 bg-white border border-gray-200 rounded-lg text-gray-700 font-medium focus:outline-none focus:ring-2 focus:ring-indigo-500"
+                        >
+                            <option value="ats_score">ATS Score</option>
+                            <option value="created_at">Newest</option>
+                            <option value="experience_years">Experience</option>
+                        </select>
+                    </label>
+                </div>
+
                 <div className="bg-white rounded-3xl shadow-sm border border-gray-100 overflow-hidden">
                     {/* Table Header - Hidden on Mobile */}
                     <div className="hidden md:grid grid-cols-12 gap-4 p-4 bg-gray-50/50 border-b border-gray-100 text-xs font-bold text-gray-500 uppercase tracking-wider">
@@ -262,6 +282,17 @@ const HrJobBoard = ({
                             ))
                         )}
                     </div>
+
+                    {applications.length < applicationsTotal && (
+                        <div className="p-4 border-t border-gray-100 text-center">
+                            <button
+                                onClick={handleLoadMoreApplicants}
+                                className="px-4 py-2 text-sm font-bold text-indigo-600 hover:text-indigo-800 hover:bg-indigo-50 rounded-xl transition"
+                            >
+                                Load more ({applicationsTotal - applications.length} remaining)
+                            </button>
+                        </div>
+                    )}
                 </div>
             </div>
         );
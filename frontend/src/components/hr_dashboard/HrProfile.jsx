@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
-import { API_URL } from '../../config';
+import { API_URL, avatarUrl } from '../../config';
 import { User, Upload, Save, FileText, CheckCircle, AlertCircle, Building, Info } from 'lucide-react';
 
 const HrProfile = ({ user, setUser }) => {
@@ -121,7 +121,7 @@ const HrProfile = ({ user, setUser }) => {
                             <div className="w-full h-full rounded-full overflow-hidden border-4 border-indigo-50">
                                 {user?.profile_picture ? (
                                     <img
-                                        src={user.profile_picture.startsWith('http') ? user.profile_picture : `${API_URL}/${user.profile_picture}`}
+                                        src={avatarUrl(user, 256)}
                                         alt="Profile"
                                         className="w-full h-full object-cover"
                                         onError={(e) => { e.target.onerror = null; e.target.src = 'https://via.placeholder.com/150' }}
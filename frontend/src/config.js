@@ -3,3 +3,11 @@ export const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 // Google reCAPTCHA Site Key (get from Google reCAPTCHA admin console)
 // Leave empty in development mode - backend will skip verification
 export const RECAPTCHA_SITE_KEY = import.meta.env.VITE_RECAPTCHA_SITE_KEY || '';
+
+// Profile picture URL for a display size: the stored 64/256 px variant when the
+// backend generated one, otherwise the original upload
+export const avatarUrl = (user, size = 64) => {
+    const path = user?.profile_picture_variants?.[String(size)]?.webp || user?.profile_picture;
+    if (!path) return null;
+    return path.startsWith('http') ? path : `${API_URL}/${path}`;
+};